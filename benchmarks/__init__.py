@@ -0,0 +1,11 @@
+import time
+from typing import Any, Callable
+
+def best_of(function: Callable[[], Any], repeat: int) -> float:
+    """Returns the fastest of repeat runs in seconds, which is the least noisy estimate."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,95 @@
+import argparse
+import json
+import re
+import sys
+from typing import Dict, Any, List, Optional
+
+from benchmarks import best_of
+from modules.text_preprocessor import clean_text
+
+# Benchmark of the fused cleaner against the original multi-pass
+# implementation on realistic Korean exam pages. The unit tests only check
+# that the two produce the same text; whether the fused cleaner is still
+# faster depends on the machine and is checked here.
+
+DEFAULT_PAGES = 200
+DEFAULT_REPEAT = 5
+# The fused cleaner must be at least this many times faster.
+DEFAULT_MIN_SPEEDUP = 2.0
+
+def reference_clean_text(text: str) -> str:
+    """The original multi-pass implementation, kept as the output reference."""
+    for lig, ascii_equiv in {"ﬁ": "fi", "ﬂ": "fl", "ﬃ": "ffi", "ﬄ": "ffl", "ﬅ": "ft", "ﬆ": "st"}.items():
+        text = text.replace(lig, ascii_equiv)
+    lines = (re.sub(r'[ \t]+', ' ', line).strip() for line in text.strip().split('\n'))
+    normalized_lines = []
+    last_line_was_blank = False
+    for line in lines:
+        if line:
+            normalized_lines.append(line)
+            last_line_was_blank = False
+        elif not last_line_was_blank:
+            normalized_lines.append("")
+            last_line_was_blank = True
+    result = '\n'.join(normalized_lines)
+    if text.endswith('\n\n'):
+        if not result.endswith('\n\n'):
+            result += '\n'
+    return result
+
+KOREAN_EXAM_PAGE = """01 생물의 특성 
+석회 동굴에서 발견되는 석순, 석주, 종유석은 탄산 칼슘 성분이
+쌓여 만들어진 지형이므로 생물이 아니다.  
+ㄱ. 물질대사는 생물이 갖는 특성이므로 종유석이 만들어질 때는
+물질대사가 일어나지 않는다.
+
+ㄴ. 식물은 빛에너지를 이용한 광합성을 통해 필요한 양분을 만든 
+다. 따라서 '광합성을 통해 양분을 합성한다.'는 튤립이 갖는 특징
+이다.
+ㄷ
+.
+세균과 바이러스는 모두 유전 물질인 핵산을 가지고 있으므
+로, '돌연변이가 일어날 수 있다.'는 세균(A)과 바이러스(X)가 모
+두 갖는 특징이다.
+""" * 3
+
+def run_clean_benchmark(pages: int = DEFAULT_PAGES, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """
+    Cleans pages copies of KOREAN_EXAM_PAGE with both cleaners.
+
+    Returns:
+        'reference' and 'fused' (seconds of the fastest run) and 'speedup'.
+    """
+    texts = [KOREAN_EXAM_PAGE] * pages
+    reference = best_of(lambda: [reference_clean_text(text) for text in texts], repeat)
+    fused = best_of(lambda: [clean_text(text) for text in texts], repeat)
+    return {
+        'reference': round(reference, 6),
+        'fused': round(fused, 6),
+        'speedup': round(reference / fused, 2) if fused > 0 else None,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the fused text cleaner against the original one.")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help=f"Pages cleaned per run (default: {DEFAULT_PAGES}).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"Runs per cleaner, the fastest is kept (default: {DEFAULT_REPEAT}).")
+    parser.add_argument("--min-speedup", type=float, default=DEFAULT_MIN_SPEEDUP,
+                        help=f"Required speedup of the fused cleaner (default: {DEFAULT_MIN_SPEEDUP:g}).")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    result = run_clean_benchmark(args.pages, args.repeat)
+    print(f"reference {result['reference'] * 1000:8.1f} ms  fused {result['fused'] * 1000:8.1f} ms  "
+          f"speedup {result['speedup']:.2f}x")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'pages': args.pages, 'result': result}, f, indent=2)
+
+    if result['speedup'] is not None and result['speedup'] < args.min_speedup:
+        print(f"fused cleaner is only {result['speedup']:.2f}x faster, expected {args.min_speedup:g}x")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
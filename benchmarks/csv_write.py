@@ -0,0 +1,103 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, Any, List, Optional
+
+from benchmarks import best_of
+from benchmarks.synthetic import BookSpec, generate_pages
+from modules.config_loader import load_config
+from modules.csv_generator import save_to_csv, CSV_FIELDNAMES, _flatten_item_for_csv
+from modules.items import Item
+from modules.text_analyzer import analyze_text
+
+# Output benchmark of the CSV writer. The items of a synthetic book are
+# analyzed once and then written repeatedly in every mode; the report holds
+# rows/s and MB/s of the fastest run and the size of the written file.
+# 'rowwise' is the former writer (csv.DictWriter, one writerow per item),
+# kept as the reference the batched writer is compared against.
+
+DEFAULT_REPEAT = 5
+DEFAULT_SPEC = BookSpec(pages=2000, items_per_page=3, explanation_lines=4, sub_item_ratio=0.5)
+# Output file name per mode; the suffix selects the compression.
+MODES = {
+    'rowwise': 'rowwise.csv',
+    'csv': 'items.csv',
+    'gzip': 'items.csv.gz',
+    'zstd': 'items.csv.zst',
+}
+
+def _save_rowwise(items: List[Item], output_path: str):
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+        writer.writeheader()
+        for item in items:
+            writer.writerow(_flatten_item_for_csv(item))
+
+def measure_mode(mode: str, items: List[Item], work_dir: str, text_bytes: int,
+                 repeat: int = DEFAULT_REPEAT) -> Optional[Dict[str, Any]]:
+    """
+    Writes the items repeat times in one of MODES. text_bytes is the size of
+    the items as plain CSV.
+
+    Returns:
+        'seconds' (fastest run), 'rows_per_second', 'mb_per_second' (of the
+        uncompressed CSV text) and 'file_bytes', or None when the mode is not
+        available here (zstd without zstandard).
+    """
+    output_path = os.path.join(work_dir, MODES[mode])
+    if mode == 'rowwise':
+        write = lambda: _save_rowwise(items, output_path)
+    else:
+        write = lambda: save_to_csv(iter(items), output_path)
+    try:
+        write()
+    except ImportError:
+        return None
+    seconds = best_of(write, repeat)
+    return {
+        'seconds': round(seconds, 6),
+        'rows_per_second': round(len(items) / seconds) if seconds > 0 else None,
+        'mb_per_second': round(text_bytes / seconds / 1e6, 2) if seconds > 0 else None,
+        'file_bytes': os.path.getsize(output_path),
+    }
+
+def run_csv_benchmark(spec: BookSpec = DEFAULT_SPEC, modes: Optional[List[str]] = None,
+                      repeat: int = DEFAULT_REPEAT) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Benchmarks the given MODES (default: all) on the items of one synthetic book."""
+    items = list(analyze_text(iter(generate_pages(spec)), load_config()))
+    modes = modes or list(MODES)
+    with tempfile.TemporaryDirectory(prefix='csv_bench_') as work_dir:
+        text_path = os.path.join(work_dir, 'text.csv')
+        save_to_csv(iter(items), text_path)
+        text_bytes = os.path.getsize(text_path)
+        return {mode: measure_mode(mode, items, work_dir, text_bytes, repeat) for mode in modes}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark CSV output rows/s, plain and compressed.")
+    parser.add_argument("--mode", action="append", choices=list(MODES),
+                        help="Output mode to run (repeatable, default: all).")
+    parser.add_argument("--pages", type=int, default=DEFAULT_SPEC.pages, help=f"Pages of the synthetic book (default: {DEFAULT_SPEC.pages}).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"Runs per mode, the fastest is kept (default: {DEFAULT_REPEAT}).")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    spec = BookSpec(pages=args.pages, items_per_page=DEFAULT_SPEC.items_per_page,
+                    explanation_lines=DEFAULT_SPEC.explanation_lines, sub_item_ratio=DEFAULT_SPEC.sub_item_ratio)
+    results = run_csv_benchmark(spec, args.mode, args.repeat)
+    for mode, result in results.items():
+        if result is None:
+            print(f"{mode:8s} not available")
+            continue
+        print(f"{mode:8s} {result['rows_per_second']:10d} rows/s {result['mb_per_second']:8.2f} MB/s "
+              f"{result['file_bytes'] / 1e6:8.2f} MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'pages': args.pages, 'results': results}, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
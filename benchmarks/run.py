@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from typing import Dict, Any, List, Optional
+
+from benchmarks import best_of
+from benchmarks.synthetic import BookSpec, generate_pages, count_items, write_pdf
+from modules.config_loader import load_config
+from modules.csv_generator import save_to_csv, _flatten_item_for_csv
+from modules.pdf_extractor import extract_pages
+from modules.text_analyzer import analyze_text
+from modules.text_preprocessor import clean_text
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEAT = 5
+
+SCENARIOS = {
+    'standard': BookSpec(pages=200, items_per_page=3, explanation_lines=4, sub_item_ratio=0.5),
+    'long_explanations': BookSpec(pages=200, items_per_page=1, explanation_lines=30, sub_item_ratio=0.2),
+    'dense_sub_items': BookSpec(pages=200, items_per_page=4, explanation_lines=2, sub_item_ratio=1.0),
+    # Items whose explanation runs over ten pages without an item start.
+    'spanning': BookSpec(pages=200, items_per_page=2, explanation_lines=4, spanning_items=8, span_pages=10),
+}
+
+def _result(seconds: float, pages: int, items: int, size: int) -> Dict[str, Any]:
+    return {
+        'seconds': round(seconds, 6),
+        'pages': pages,
+        'items': items,
+        'pages_per_second': round(pages / seconds, 1) if seconds > 0 else None,
+        'mb_per_second': round(size / seconds / 1e6, 3) if seconds > 0 else None,
+    }
+
+def run_scenario(name: str, spec: BookSpec, config, work_dir: str, repeat: int = DEFAULT_REPEAT) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmarks every stage on its own and the whole pipeline end to end for
+    one synthetic book.
+
+    Raises:
+        AssertionError: If the analyzer does not find every generated item.
+    """
+    pages = generate_pages(spec)
+    expected_items = count_items(pages)
+    size = sum(len(page.encode('utf-8')) for page in pages)
+    pdf_path = os.path.join(work_dir, f"{name}.pdf")
+    csv_path = os.path.join(work_dir, f"{name}.csv")
+    write_pdf(pages, pdf_path)
+
+    items = list(analyze_text(iter(pages), config))
+    assert len(items) == expected_items, f"{name}: found {len(items)} of {expected_items} items"
+
+    def end_to_end():
+        page_stream = (clean_text(page, config) for page in extract_pages(pdf_path))
+        save_to_csv(analyze_text(page_stream, config), csv_path)
+
+    stages = {
+        'extract_pages': lambda: list(extract_pages(pdf_path)),
+        'clean_text': lambda: [clean_text(page, config) for page in pages],
+        'analyze_text': lambda: list(analyze_text(iter(pages), config)),
+        'flatten_item_for_csv': lambda: [_flatten_item_for_csv(item) for item in items],
+        'save_to_csv': lambda: save_to_csv(iter(items), csv_path),
+        'end_to_end': end_to_end,
+    }
+    return {f"{name}/{stage}": _result(best_of(function, repeat), len(pages), len(items), size)
+            for stage, function in stages.items()}
+
+def run_benchmarks(scenarios: Dict[str, BookSpec], repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """Runs the given scenarios and returns the report written to JSON."""
+    config = load_config()
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix='pdf_exam_bench_') as work_dir:
+        for name, spec in scenarios.items():
+            results.update(run_scenario(name, spec, config, work_dir, repeat))
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'scenarios': {name: spec.to_dict() for name, spec in scenarios.items()},
+        'results': results,
+    }
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compares two reports benchmark by benchmark.
+
+    Returns:
+        One entry per benchmark present in both reports and run on the same
+        book (e.g. not a --quick run against a full baseline), with the time
+        ratio (current / baseline) and whether it exceeds 1 + threshold.
+    """
+    comparison = []
+    for key, result in current['results'].items():
+        reference = baseline.get('results', {}).get(key)
+        if reference is None or not reference['seconds']:
+            continue
+        scenario = key.split('/')[0]
+        if current.get('scenarios', {}).get(scenario) != baseline.get('scenarios', {}).get(scenario):
+            continue
+        ratio = result['seconds'] / reference['seconds']
+        comparison.append({
+            'benchmark': key,
+            'baseline_seconds': reference['seconds'],
+            'seconds': result['seconds'],
+            'ratio': round(ratio, 3),
+            'regression': ratio > 1 + threshold,
+        })
+    return comparison
+
+def _scaled(spec: BookSpec, factor: float) -> BookSpec:
+    values = spec.to_dict()
+    values['pages'] = max(int(values['pages'] * factor), values['span_pages'] * values['spanning_items'] + 2)
+    return BookSpec(**values)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline on synthetic exam books.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all).")
+    parser.add_argument("--quick", action="store_true", help="Run every scenario with a fifth of the pages.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"Runs per benchmark, the fastest is kept (default: {DEFAULT_REPEAT}).")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline JSON to compare against (default: benchmarks/baseline.json).")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown against the baseline before failing (default: {DEFAULT_THRESHOLD:g} = 25%%).")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline.")
+    args = parser.parse_args(argv)
+
+    scenarios = {name: SCENARIOS[name] for name in (args.scenario or SCENARIOS)}
+    if args.quick:
+        scenarios = {name: _scaled(spec, 0.2) for name, spec in scenarios.items()}
+
+    report = run_benchmarks(scenarios, args.repeat)
+    for key, result in report['results'].items():
+        print(f"{key:40s} {result['seconds'] * 1000:10.2f} ms {result['pages_per_second']:>12} pages/s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    comparison = compare_results(report, baseline, args.threshold)
+    regressions = [entry for entry in comparison if entry['regression']]
+    for entry in comparison:
+        marker = 'REGRESSION' if entry['regression'] else 'ok'
+        print(f"{entry['benchmark']:40s} {entry['ratio']:6.2f}x baseline  {marker}")
+    if regressions:
+        print(f"{len(regressions)} benchmarks are more than {args.threshold:.0%} slower than the baseline.")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import argparse
+import json
+import math
+import sys
+from typing import Dict, Any, List, Optional
+
+from benchmarks import best_of
+from modules.config_loader import load_config
+from modules.text_analyzer import analyze_text
+
+# Scaling benchmark of analyze_text on one explanation running over many
+# pages, the case where rescanning the pending text on every page is
+# quadratic. It runs with the default config ('item_start' probe) and with
+# 'item_start' removed (probe derived from the stream lookahead), and fails
+# when the time grows faster than the page count to the given exponent.
+# The unit tests only count the characters scanned, which does not depend
+# on the machine.
+
+DEFAULT_PAGE_COUNTS = (200, 800, 3200)
+DEFAULT_REPEAT = 3
+# Linear is 1.0, quadratic 2.0; the margin absorbs timing noise.
+DEFAULT_MAX_EXPONENT = 1.3
+
+SPANNING_PAGE = "해설이 다음 페이지로 계속 이어지는 긴 본문입니다. ㄱ과 ㄴ을 비교한다.\n" * 20
+
+def _configs() -> Dict[str, Dict[str, Any]]:
+    with_item_start = load_config().to_dict()
+    lookahead_only = load_config().to_dict()
+    lookahead_only['problem_patterns'].pop('item_start', None)
+    return {'item_start': with_item_start, 'lookahead': lookahead_only}
+
+def spanning_pages(page_count: int) -> List[str]:
+    """One item whose explanation spans page_count pages, then a last item."""
+    return ["01 긴 해설 문제\n"] + [SPANNING_PAGE] * page_count + ["02 마지막 문제\n끝.\n"]
+
+def run_scaling_benchmark(page_counts=DEFAULT_PAGE_COUNTS, repeat: int = DEFAULT_REPEAT) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyzes spanning_pages(count) for every page count with both configs.
+
+    Returns:
+        Per config: 'seconds' (fastest run per page count) and 'exponent',
+        the growth of the time with the page count between the smallest and
+        the largest count (1 is linear).
+
+    Raises:
+        AssertionError: If an analysis does not find both items.
+    """
+    results = {}
+    for name, config in _configs().items():
+        seconds = {}
+        for count in page_counts:
+            pages = spanning_pages(count)
+            items = list(analyze_text(iter(pages), config))
+            assert [item['number'] for item in items] == ['01', '02'], f"{name}: wrong items for {count} pages"
+            seconds[count] = round(best_of(lambda: list(analyze_text(iter(pages), config)), repeat), 6)
+        small, large = min(page_counts), max(page_counts)
+        exponent = None
+        if large > small and seconds[small] > 0:
+            exponent = round(math.log(seconds[large] / seconds[small]) / math.log(large / small), 2)
+        results[name] = {'seconds': seconds, 'exponent': exponent}
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check that analyze_text scales linearly with a long explanation.")
+    parser.add_argument("--pages", type=int, action="append",
+                        help=f"Page count to run (repeatable, default: {', '.join(map(str, DEFAULT_PAGE_COUNTS))}).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"Runs per page count, the fastest is kept (default: {DEFAULT_REPEAT}).")
+    parser.add_argument("--max-exponent", type=float, default=DEFAULT_MAX_EXPONENT,
+                        help=f"Largest allowed growth exponent of the time with the page count (default: {DEFAULT_MAX_EXPONENT:g}).")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = run_scaling_benchmark(tuple(args.pages or DEFAULT_PAGE_COUNTS), args.repeat)
+    failed = False
+    for name, result in results.items():
+        times = "  ".join(f"{count} pages {seconds * 1000:8.1f} ms" for count, seconds in result['seconds'].items())
+        print(f"{name:10s} {times}  exponent {result['exponent']}")
+        if result['exponent'] is not None and result['exponent'] > args.max_exponent:
+            print(f"{name}: time grows with exponent {result['exponent']}, expected at most {args.max_exponent:g}")
+            failed = True
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
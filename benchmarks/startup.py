@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List, Optional, Sequence
+
+# Startup benchmark of the CLI. Every run is a fresh interpreter started with
+# -X importtime, which logs the time spent importing each module to stderr.
+# The report holds the fastest wall time and the import table of that run,
+# and fails when a heavy dependency is imported at startup or the wall time
+# exceeds the budget.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_REPEAT = 5
+# Wall time of `extract_tool.py --help`, interpreter start included. Loading
+# PyMuPDF alone takes longer than this.
+DEFAULT_BUDGET_MS = 350.0
+# Modules that must only be loaded by the stage that needs them.
+HEAVY_MODULES = ('pymupdf', 'yaml', 'multiprocessing', 'concurrent.futures', 'sqlite3', 'pandas', 'pyarrow')
+
+SCENARIOS = {
+    'help': ['extract_tool.py', '--help'],
+    'import': ['-c', 'import extract_tool'],
+}
+
+def parse_importtime(stderr: str) -> Dict[str, Any]:
+    """
+    Parses -X importtime output.
+
+    Returns:
+        'modules': {module: cumulative microseconds} of every import, and
+        'total': the microseconds of all top-level imports (nested imports
+        are included in their parent's cumulative time).
+    """
+    modules: Dict[str, int] = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        cumulative = int(fields[1])
+        # The name is indented by two spaces per nesting level.
+        if not name[1:].startswith(' '):
+            total += cumulative
+        modules.setdefault(name.strip(), cumulative)
+    return {'modules': modules, 'total': total}
+
+def _run_once(args: Sequence[str]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=REPO_ROOT,
+                               capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {completed.returncode}: {completed.stderr[-500:]}")
+    return {'seconds': seconds, 'imports': parse_importtime(completed.stderr)}
+
+def measure_startup(args: Sequence[str], repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """
+    Starts the interpreter with args repeat times.
+
+    Returns:
+        'seconds' (fastest wall time), 'import_seconds' (summed top-level
+        import time of that run), 'slowest_imports' (the ten largest
+        cumulative import times, in ms) and 'heavy_modules' (the HEAVY_MODULES
+        that were imported).
+    """
+    best = min((_run_once(args) for _ in range(repeat)), key=lambda run: run['seconds'])
+    imports = best['imports']['modules']
+    heavy = [name for name in HEAVY_MODULES if name in imports]
+    slowest = sorted(imports.items(), key=lambda entry: entry[1], reverse=True)[:10]
+    return {
+        'seconds': round(best['seconds'], 6),
+        'import_seconds': round(best['imports']['total'] / 1e6, 6),
+        'slowest_imports': {name: round(micros / 1000, 2) for name, micros in slowest},
+        'heavy_modules': heavy,
+    }
+
+def check_startup(results: Dict[str, Dict[str, Any]], budget_ms: float = DEFAULT_BUDGET_MS) -> List[str]:
+    """Returns one message per scenario over the budget or importing a heavy module."""
+    problems = []
+    for name, result in results.items():
+        if result['heavy_modules']:
+            problems.append(f"{name}: imports {', '.join(result['heavy_modules'])} at startup")
+        if result['seconds'] * 1000 > budget_ms:
+            problems.append(f"{name}: {result['seconds'] * 1000:.0f} ms exceeds the {budget_ms:.0f} ms budget")
+    return problems
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of extract_tool.py.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"Runs per scenario, the fastest is kept (default: {DEFAULT_REPEAT}).")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Allowed wall time per scenario (default: {DEFAULT_BUDGET_MS:g} ms).")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = {name: measure_startup(SCENARIOS[name], args.repeat) for name in (args.scenario or SCENARIOS)}
+    for name, result in results.items():
+        print(f"{name:10s} {result['seconds'] * 1000:8.1f} ms wall {result['import_seconds'] * 1000:8.1f} ms imports")
+        for module, ms in result['slowest_imports'].items():
+            print(f"    {module:40s} {ms:8.2f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'budget_ms': args.budget_ms, 'results': results}, f, indent=2)
+
+    problems = check_startup(results, args.budget_ms)
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
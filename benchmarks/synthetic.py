@@ -0,0 +1,118 @@
+import random
+from typing import List
+
+# Synthetic Korean exam books in the layout the default config expects:
+#
+#   01 <problem title>
+#   <explanation body lines>
+#   ㄱ. <sub-item text>
+#   ㄴ. <sub-item text>
+#   02 <problem title>
+#   ...
+#
+# Explanation lines never start with a number, so the only item starts are
+# the generated ones and the expected item count is known exactly.
+
+_WORDS = [
+    '생물', '세포', '물질대사', '광합성', '호흡', '효소', '단백질', '유전자', '염색체', '세균',
+    '바이러스', '항체', '항원', '면역', '호르몬', '신경', '근육', '혈액', '산소', '이산화 탄소',
+    '에너지', '양분', '생장', '발생', '생식', '적응', '진화', '생태계', '개체군', '군집',
+    '따라서', '그러므로', '하지만', '또한', '이다.', '아니다.', '일어난다.', '증가한다.', '감소한다.', '해당한다.',
+]
+_SUB_ITEM_LABELS = 'ㄱㄴㄷㄹ'
+_LINE_WORDS = (4, 9)
+
+class BookSpec:
+    """
+    Parameters of a synthetic exam book.
+
+    Args:
+        pages: Number of pages to generate.
+        items_per_page: Items started on every regular page.
+        explanation_lines: Body lines of every explanation.
+        sub_item_ratio: Share of items with ㄱ/ㄴ/ㄷ sub-items (0.0 - 1.0).
+        spanning_items: Number of items whose explanation continues over
+                        span_pages extra pages without any item start.
+        span_pages: Length of the continuation of a spanning item.
+        seed: Seed of the random text, so a spec always builds the same book.
+    """
+    __slots__ = ('pages', 'items_per_page', 'explanation_lines', 'sub_item_ratio',
+                 'spanning_items', 'span_pages', 'seed')
+
+    def __init__(self, pages: int = 100, items_per_page: int = 3, explanation_lines: int = 4,
+                 sub_item_ratio: float = 0.5, spanning_items: int = 0, span_pages: int = 10, seed: int = 0):
+        if pages < 1 or items_per_page < 1:
+            raise ValueError("pages and items_per_page must be at least 1")
+        if not 0.0 <= sub_item_ratio <= 1.0:
+            raise ValueError("sub_item_ratio must be between 0 and 1")
+        self.pages = pages
+        self.items_per_page = items_per_page
+        self.explanation_lines = explanation_lines
+        self.sub_item_ratio = sub_item_ratio
+        self.spanning_items = spanning_items
+        self.span_pages = span_pages
+        self.seed = seed
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def _line(rng: random.Random) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(*_LINE_WORDS)))
+
+def _item_lines(number: int, spec: BookSpec, rng: random.Random) -> List[str]:
+    lines = [f"{number:02d} {_line(rng)[:30]}"]
+    lines.extend(_line(rng) for _ in range(spec.explanation_lines))
+    if rng.random() < spec.sub_item_ratio:
+        for label in _SUB_ITEM_LABELS[:rng.randint(2, len(_SUB_ITEM_LABELS))]:
+            lines.append(f"{label}. {_line(rng)}")
+            if rng.random() < 0.5:
+                lines.append(_line(rng))
+    return lines
+
+def generate_pages(spec: BookSpec) -> List[str]:
+    """
+    Builds the page texts of a synthetic book, each ending with a newline
+    like the text extracted from a PDF page.
+    """
+    rng = random.Random(spec.seed)
+    # Regular pages after which a spanning item's continuation is inserted,
+    # spread evenly over the book.
+    span_starts = set()
+    if spec.spanning_items:
+        regular_pages = max(spec.pages - spec.spanning_items * spec.span_pages, 1)
+        step = max(regular_pages // (spec.spanning_items + 1), 1)
+        span_starts = {step * (index + 1) for index in range(spec.spanning_items)}
+
+    pages: List[str] = []
+    regular_pages_done = 0
+    number = 1
+    while len(pages) < spec.pages:
+        lines = []
+        for _ in range(spec.items_per_page):
+            lines.extend(_item_lines(number, spec, rng))
+            number += 1
+        pages.append('\n'.join(lines) + '\n')
+        regular_pages_done += 1
+
+        if regular_pages_done in span_starts:
+            for _ in range(min(spec.span_pages, spec.pages - len(pages))):
+                lines = [_line(rng) for _ in range(spec.explanation_lines + 4)]
+                pages.append('\n'.join(lines) + '\n')
+    return pages
+
+def count_items(pages: List[str]) -> int:
+    """Counts the item start lines in generated pages."""
+    return sum(1 for page in pages for line in page.split('\n') if line[:2].isdigit())
+
+def write_pdf(pages: List[str], pdf_path: str, fontsize: float = 9):
+    """Writes generated pages to a PDF with a built-in Korean font."""
+    import fitz
+    doc = fitz.open()
+    try:
+        for page_text in pages:
+            line_count = page_text.count('\n')
+            page = doc.new_page(width=842, height=max(842, 100 + line_count * fontsize * 1.5))
+            page.insert_text((40, 50), page_text.rstrip('\n'), fontname='korea', fontsize=fontsize)
+        doc.save(pdf_path)
+    finally:
+        doc.close()
@@ -0,0 +1,52 @@
+import argparse
+import logging
+from modules.page_cache import default_cache_dir
+from modules.server import (ExtractionService, make_unix_server, make_http_server,
+                            DEFAULT_WORKERS, DEFAULT_MAX_PENDING, DEFAULT_JOB_TIMEOUT, DEFAULT_HTTP_PORT)
+
+def main():
+    """
+    Runs the resident extraction service: configs are compiled and worker
+    processes started once, then jobs are served until interrupted.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+    )
+
+    parser = argparse.ArgumentParser(description="Serve PDF extraction jobs over a Unix socket or localhost HTTP.")
+    parser.add_argument("--socket", default=None, help="Listen on this Unix socket path instead of HTTP.")
+    parser.add_argument("--port", type=int, default=DEFAULT_HTTP_PORT, help=f"Localhost HTTP port (default: {DEFAULT_HTTP_PORT}).")
+    parser.add_argument("--config", help="Path to the default YAML configuration file.", default=None)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Jobs run concurrently, one warm process each (default: {DEFAULT_WORKERS}).")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING, help=f"Jobs allowed to wait for a worker before new ones are rejected (default: {DEFAULT_MAX_PENDING}).")
+    parser.add_argument("--job-timeout", type=float, default=DEFAULT_JOB_TIMEOUT, help=f"Seconds a job may run before it is aborted (default: {DEFAULT_JOB_TIMEOUT:g}).")
+    parser.add_argument("--cache-dir", default=None, help="Directory of the extracted page text cache (default: ~/.cache/pdf_exam_parser/pages).")
+    parser.add_argument("--no-cache", action="store_true", help="Always extract text from the PDF, bypassing the page text cache.")
+    args = parser.parse_args()
+
+    cache_dir = None if args.no_cache else (args.cache_dir or default_cache_dir())
+    try:
+        logging.info(f"Starting {args.workers} workers...")
+        service = ExtractionService(args.config, workers=args.workers, max_pending=args.max_pending,
+                                    job_timeout=args.job_timeout, cache_dir=cache_dir)
+    except Exception as e:
+        logging.error(f"Could not start the service: {e}")
+        return
+
+    try:
+        if args.socket:
+            server = make_unix_server(service, args.socket)
+            logging.info(f"Listening on unix socket {args.socket}")
+        else:
+            server = make_http_server(service, args.port)
+            logging.info(f"Listening on http://127.0.0.1:{args.port}")
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Shutting down...")
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    main()
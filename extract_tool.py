@@ -1,10 +1,107 @@
 import argparse
 import logging
-from modules.pdf_extractor import extract_pages
+import os
+from modules.pdf_extractor import extract_pages, get_page_count, parse_page_ranges, sample_pages, find_answer_section
 from modules.text_analyzer import analyze_text
-from modules.csv_generator import save_to_csv
+from modules.sharded_analyzer import analyze_text_sharded
+from modules.output_writers import save_items, resolve_output_format, OUTPUT_FORMATS
 from modules.text_preprocessor import clean_text
 from modules.config_loader import load_config
+from modules.batch_processor import collect_pdf_paths, run_batch, format_summary
+from modules.page_cache import default_cache_dir
+from modules.incremental import run_incremental
+from modules.metrics import PipelineMetrics, instrument, measure_sink, text_size, item_size
+from modules.layout_extractor import extract_lines, clean_lines, analyze_lines
+from modules.dedup_index import DedupIndex, deduplicate
+from modules.checkpoint import run_checkpointed, CHECKPOINT_FORMATS
+from modules.triage import triage_pdf, format_triage, pages_with_text, write_triage_reports
+
+def _cache_dir(args):
+    """Resolves the page text cache directory, or None when caching is disabled."""
+    if args.no_cache:
+        return None
+    return args.cache_dir or default_cache_dir()
+
+def _page_selection(args):
+    """
+    Resolves --answer-section, --pages and --sample into the 0-based pages
+    to extract, or None to extract the whole document.
+    """
+    if not (args.pages or args.sample or args.answer_section):
+        return None
+    page_count = get_page_count(args.pdf_path)
+    pages = parse_page_ranges(args.pages, page_count) if args.pages else list(range(page_count))
+
+    if args.answer_section:
+        start = find_answer_section(args.pdf_path)
+        if start is None:
+            logging.warning("No answer section found in the PDF outline; using the selected pages.")
+        else:
+            logging.info(f"Answer section starts on page {start + 1}.")
+            pages = [page for page in pages if page >= start]
+
+    if args.sample:
+        pages = sample_pages(pages, args.sample)
+    if not pages:
+        raise ValueError("The page selection is empty")
+    logging.info(f"Extracting {len(pages)} of {page_count} pages.")
+    return pages
+
+def _triage_selection(args, pages):
+    """
+    With --triage, classifies the selected pages from their metadata before
+    any text is extracted, logs (and optionally writes) the report, and with
+    'skip' drops the pages without a text layer.
+    """
+    if not args.triage:
+        return pages
+    report = triage_pdf(args.pdf_path, pages)
+    for line in format_triage(report):
+        logging.info(line)
+    if args.triage_report:
+        write_triage_reports([report], args.triage_report)
+    if not report['pages_without_text']:
+        return pages
+    logging.warning(f"{len(report['pages_without_text'])} page(s) have no text layer (scanned or blank) "
+                    f"and yield no items without OCR.")
+    if args.triage == 'flag':
+        return pages
+    text_pages = pages_with_text(report)
+    if not text_pages:
+        raise ValueError("No selected page has a text layer; the PDF looks scanned and needs OCR")
+    logging.info(f"Skipping {len(report['pages_without_text'])} page(s) without text.")
+    return text_pages
+
+def _run_triage_only(args):
+    """Writes the triage report of one PDF (or, with --batch, of every PDF) as JSON Lines."""
+    pdf_paths = collect_pdf_paths(args.pdf_path) if args.batch else [args.pdf_path]
+    reports = []
+    for pdf_path in pdf_paths:
+        report = triage_pdf(pdf_path)
+        for line in format_triage(report):
+            logging.info(line)
+        reports.append(report)
+    write_triage_reports(reports, args.output_path)
+    logging.info(f"Triage report of {len(reports)} file(s) written to {args.output_path}")
+
+def _run_batch(args, config):
+    """
+    Runs batch mode: every PDF shares the loaded config and the files are
+    spread over a process pool. Failures are reported per file.
+    """
+    pdf_paths = collect_pdf_paths(args.pdf_path)
+    logging.info(f"Batch mode: processing {len(pdf_paths)} files...")
+    results = run_batch(pdf_paths, args.output_path, config,
+                        jobs=args.jobs, preprocess=args.preprocess, combine=args.combine,
+                        cache_dir=_cache_dir(args), output_format=args.format or 'csv',
+                        dedup_index=args.dedup_index)
+
+    for line in format_summary(results):
+        logging.info(line)
+    failures = [result for result in results if result['error'] is not None]
+    if failures:
+        logging.error(f"{len(failures)} of {len(results)} files failed.")
+    logging.info("Batch processing complete!")
 
 def main():
     """
@@ -20,10 +117,50 @@ def main():
     )
 
     parser = argparse.ArgumentParser(description="Extract problems and explanations from a PDF file.")
-    parser.add_argument("pdf_path", help="The path to the input PDF file.")
-    parser.add_argument("output_path", help="The path to the output CSV file.")
+    parser.add_argument("pdf_path", help="The path to the input PDF file (or, with --batch, a directory, glob pattern or manifest file).")
+    parser.add_argument("output_path", help="The path to the output file (or, with --batch, the output directory).")
     parser.add_argument("--config", help="Path to a custom YAML configuration file.", default=None)
     parser.add_argument("--preprocess", action="store_true", help="Enable text preprocessing.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes used to extract pages (default: 1).")
+    parser.add_argument("--batch", action="store_true", help="Process many PDFs with a shared config and a process pool.")
+    parser.add_argument("--jobs", type=int, default=None, help="In batch mode, number of PDFs processed in parallel (default: CPU count).")
+    parser.add_argument("--combine", action="store_true", help="In batch mode, write all items to the single CSV file given as output_path.")
+    parser.add_argument("--cache-dir", default=None, help="Directory of the extracted page text cache (default: ~/.cache/pdf_exam_parser/pages).")
+    parser.add_argument("--no-cache", action="store_true", help="Always extract text from the PDF, bypassing the page text cache.")
+    parser.add_argument("--incremental", action="store_true", help="Update an existing output CSV, re-analyzing only the pages that changed since the last run.")
+    parser.add_argument("--metrics", action="store_true", help="Log wall time, CPU time and throughput of every pipeline stage.")
+    parser.add_argument("--metrics-json", default=None, help="Write the per-stage metrics report to this JSON file (implies --metrics).")
+    parser.add_argument("--layout", action="store_true",
+                        help="Read text lines with their position and font: two-column pages are read column by column "
+                             "and problem headers are found by position and font instead of the stream patterns.")
+    parser.add_argument("--pages", default=None,
+                        help="Only extract these pages, e.g. '120-340' or '1-10,55,300-' (1-based, inclusive).")
+    parser.add_argument("--sample", type=int, default=None,
+                        help="Only extract N pages picked at random (reproducibly), e.g. to validate a config.")
+    parser.add_argument("--answer-section", action="store_true",
+                        help="Start at the answer/explanation section found in the PDF outline (table of contents).")
+    parser.add_argument("--dedup-index", default=None,
+                        help="SQLite index of items seen in earlier runs; repeated items are written as references "
+                             "to their canonical ID (item_id / duplicate_of columns) instead of again in full.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None,
+                        help="Output format (default: chosen from the output extension, CSV if unknown). "
+                             "jsonl, parquet and arrow keep explanation sub-items as a nested list; parquet and arrow need pyarrow.")
+    parser.add_argument("--triage", choices=('flag', 'skip'), default=None,
+                        help="Classify pages as text, mixed, image-only (scanned) or blank from their fonts and images "
+                             "before extracting text; 'flag' reports pages without text, 'skip' also leaves them out.")
+    parser.add_argument("--triage-report", default=None,
+                        help="With --triage, also write the triage report to this JSON Lines file.")
+    parser.add_argument("--triage-only", action="store_true",
+                        help="Only triage the PDF (or, with --batch, every PDF) and write the reports to output_path "
+                             "as JSON Lines, e.g. to route scanned books to OCR.")
+    parser.add_argument("--checkpoint-every", type=int, default=None,
+                        help="Write a checkpoint next to the output every N pages, so an interrupted run can be resumed "
+                             "with --resume (CSV and JSONL output).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted checkpointed run from its checkpoint, appending to the output.")
+    parser.add_argument("--analysis-workers", type=int, default=1,
+                        help="Number of processes used to analyze the page text, in shards of consecutive pages "
+                             "(default: 1). The items are the same as with one process.")
     args = parser.parse_args()
 
     logging.info(f"Processing {args.pdf_path}...")
@@ -33,22 +170,125 @@ def main():
         logging.info("Step 1/4: Loading configuration...")
         config = load_config(args.config) # Pass custom path if provided
 
+        if args.layout and (args.batch or args.incremental):
+            raise ValueError("--layout cannot be combined with --batch or --incremental")
+        if (args.pages or args.sample or args.answer_section) and (args.batch or args.incremental):
+            raise ValueError("--pages, --sample and --answer-section cannot be combined with --batch or --incremental")
+        if args.triage and (args.batch or args.incremental):
+            raise ValueError("--triage cannot be combined with --batch or --incremental; use --triage-only to triage a batch")
+
+        if args.triage_only:
+            logging.info("Step 2/4: Triaging pages...")
+            _run_triage_only(args)
+            logging.info("Processing complete!")
+            return
+        if args.analysis_workers < 1:
+            raise ValueError("--analysis-workers must be at least 1")
+        if args.analysis_workers > 1 and (args.batch or args.incremental or args.layout):
+            raise ValueError("--analysis-workers cannot be combined with --batch, --incremental or --layout")
+        checkpointed = args.checkpoint_every is not None or args.resume
+        if checkpointed and args.analysis_workers > 1:
+            raise ValueError("--analysis-workers cannot be combined with --checkpoint-every or --resume")
+        if checkpointed and (args.batch or args.incremental or args.layout or args.dedup_index
+                             or args.metrics or args.metrics_json):
+            raise ValueError("--checkpoint-every and --resume cannot be combined with --batch, --incremental, "
+                             "--layout, --dedup-index or --metrics")
+
+        if args.batch:
+            _run_batch(args, config)
+            return
+
+        if args.incremental:
+            if args.dedup_index:
+                raise ValueError("--dedup-index cannot be combined with --incremental")
+            if resolve_output_format(args.output_path, args.format) != 'csv':
+                raise ValueError("--incremental only supports CSV output")
+            logging.info("Step 2/4: Comparing pages with the previous run...")
+            stats = run_incremental(args.pdf_path, args.output_path, config, preprocess=args.preprocess,
+                                    workers=args.workers, cache_dir=_cache_dir(args))
+            logging.info(f"Incremental run ({stats['mode']}): extracted {stats['pages_extracted']} of {stats['pages']} pages, "
+                         f"re-parsed {stats['items_reparsed']} of {stats['items']} items.")
+            logging.info("Processing complete!")
+            return
+
+        if checkpointed:
+            if args.checkpoint_every is not None and args.checkpoint_every < 1:
+                raise ValueError("--checkpoint-every must be at least 1")
+            if resolve_output_format(args.output_path, args.format) not in CHECKPOINT_FORMATS:
+                raise ValueError("--checkpoint-every and --resume only support CSV and JSONL output")
+            logging.info("Step 2/4: Creating text stream from PDF...")
+            pages = _triage_selection(args, _page_selection(args))
+            # Steps 3 and 4 run page by page, with a checkpoint between pages.
+            logging.info(f"Step 3/4: Analyzing and saving items to {args.output_path} with checkpoints...")
+            stats = run_checkpointed(args.pdf_path, args.output_path, config, preprocess=args.preprocess,
+                                     output_format=args.format, pages=pages, workers=args.workers,
+                                     cache_dir=_cache_dir(args), every=args.checkpoint_every, resume=args.resume)
+            if stats['resumed_at']:
+                logging.info(f"Resumed after {stats['resumed_at']} pages; analyzed the remaining {stats['pages']}.")
+            logging.info(f"Step 4/4: Wrote {stats['items']} items ({stats['checkpoints']} checkpoints).")
+            logging.info("Processing complete!")
+            return
+
+        # Stage metrics are only collected on request; otherwise the stages
+        # run unwrapped.
+        metrics = PipelineMetrics() if args.metrics or args.metrics_json else None
+
         # Step 1: Extract text from PDF page by page
         logging.info("Step 2/4: Creating text stream from PDF...")
-        page_stream = extract_pages(args.pdf_path)
+        pages = _triage_selection(args, _page_selection(args))
+        if args.layout:
+            # Pages of line records; read directly from the PDF, not cached.
+            page_stream = extract_lines(args.pdf_path, pages)
+            page_size = lambda lines: sum(text_size(line.text) + 1 for line in lines)
+        else:
+            page_stream = extract_pages(args.pdf_path, workers=args.workers, cache_dir=_cache_dir(args), pages=pages)
+            page_size = text_size
+        page_stream = instrument(metrics, 'extract', page_stream, 'pages', page_size)
 
         # Optional Step: Preprocess the text stream
         if args.preprocess:
             logging.info("Applying text preprocessing...")
-            page_stream = (clean_text(page) for page in page_stream)
+            if args.layout:
+                page_stream = (clean_lines(lines, config) for lines in page_stream)
+            else:
+                page_stream = (clean_text(page, config) for page in page_stream)
+            page_stream = instrument(metrics, 'preprocess', page_stream, 'pages', page_size)
 
         # Step 2: Analyze the stream to find items
         logging.info("Step 3/4: Analyzing text stream...")
-        extracted_items_stream = analyze_text(page_stream, config)
+        analyzer_stats = {} if metrics is not None else None
+        if args.layout:
+            extracted_items_stream = analyze_lines(page_stream, config, stats=analyzer_stats)
+        elif args.analysis_workers > 1:
+            extracted_items_stream = analyze_text_sharded(page_stream, config, workers=args.analysis_workers,
+                                                          stats=analyzer_stats)
+        else:
+            extracted_items_stream = analyze_text(page_stream, config, stats=analyzer_stats)
+        extracted_items_stream = instrument(metrics, 'analyze', extracted_items_stream, 'items', item_size, analyzer_stats)
 
-        # Step 3: Save the stream of items to CSV
+        # Optional Step: Replace items seen before by references
+        dedup_index = DedupIndex(args.dedup_index) if args.dedup_index else None
+        if dedup_index is not None:
+            dedup_stats = {} if metrics is not None else None
+            extracted_items_stream = deduplicate(extracted_items_stream, dedup_index,
+                                                 os.path.basename(args.pdf_path), config, dedup_stats)
+            extracted_items_stream = instrument(metrics, 'dedup', extracted_items_stream, 'items', item_size, dedup_stats)
+
+        # Step 3: Save the stream of items (CSV, JSONL, Parquet or Arrow)
         logging.info(f"Step 4/4: Saving items to {args.output_path}...")
-        save_to_csv(extracted_items_stream, args.output_path)
+        try:
+            with measure_sink(metrics, 'write'):
+                save_items(extracted_items_stream, args.output_path, args.format)
+        finally:
+            if dedup_index is not None:
+                dedup_index.close()
+
+        if metrics is not None:
+            for line in metrics.summary_lines():
+                logging.info(line)
+            if args.metrics_json:
+                metrics.write_json(args.metrics_json)
+                logging.info(f"Metrics written to {args.metrics_json}")
 
     except Exception as e:
         logging.error(f"An error occurred during processing: {e}")
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import os
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Any, List, Optional, Sequence, Union
+
+from modules.config_loader import compile_patterns, PatternSet
+from modules.csv_generator import (CSV_FIELDNAMES, DEDUP_FIELDNAMES, _item_csv_values, csv_output_path,
+                                   open_csv_output, write_csv_rows)
+from modules.output_writers import resolve_output_format, _with_extension, _structured_item
+from modules.pdf_extractor import get_page_count, _extract_page_list, DEFAULT_CHUNK_SIZE
+from modules.items import Item
+from modules.text_analyzer import _StreamScanner, _build_item
+from modules.text_preprocessor import clean_text
+
+# Async counterparts of the pipeline stages for use inside an asyncio
+# service. One event loop can drive many documents at once:
+#
+# - PyMuPDF runs in a bounded process pool (fitz is not thread-safe), a chunk
+#   of pages per task, with one chunk prefetched per document.
+# - Only extraction is offloaded. Cleaning and analysis are cheap per page
+#   and run on the loop itself; the analyzer is fed page by page, so no
+#   thread is blocked per document. A page whose patterns backtrack would
+#   stall every document on the loop, so the async path quarantines a page
+#   after DEFAULT_ASYNC_PAGE_TIME_BUDGET instead of the config's budget
+#   (10s by default) when that is longer.
+# - Stages are async generators; buffered() decouples two stages with a
+#   bounded queue, so a slow consumer stops the producer instead of letting
+#   pages pile up.
+# - Writers format rows on the loop and hand batches to a thread for the
+#   file I/O. Output goes to a temporary file that only replaces the target
+#   when the stream completes, so a cancelled job leaves nothing behind.
+
+DEFAULT_EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_QUEUE_SIZE = 8
+DEFAULT_WRITE_BATCH = 256
+# Seconds the analysis may block the event loop on one page.
+DEFAULT_ASYNC_PAGE_TIME_BUDGET = 0.5
+ASYNC_OUTPUT_FORMATS = ('csv', 'jsonl')
+
+_default_executor: Optional[ProcessPoolExecutor] = None
+
+def default_executor() -> ProcessPoolExecutor:
+    """Returns the shared extraction pool, created on first use."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = ProcessPoolExecutor(max_workers=DEFAULT_EXTRACT_WORKERS)
+    return _default_executor
+
+def shutdown_default_executor():
+    """Stops the shared extraction pool, e.g. when the service shuts down."""
+    global _default_executor
+    if _default_executor is not None:
+        _default_executor.shutdown(wait=True, cancel_futures=True)
+        _default_executor = None
+
+async def aextract_pages(pdf_path: str, executor: Optional[Executor] = None,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE, mode: str = 'text',
+                         pages: Optional[Sequence[int]] = None) -> AsyncIterator[str]:
+    """
+    Extracts the text of a PDF page by page without blocking the event loop.
+
+    Args:
+        pdf_path: The path to the PDF file.
+        executor: Executor running the PyMuPDF work (default: a shared
+                  process pool of DEFAULT_EXTRACT_WORKERS processes). Its
+                  size bounds the extraction work across all documents.
+        chunk_size: Number of pages extracted per task. While one chunk is
+                    consumed, the next one is being extracted.
+        mode: 'text' or 'layout', as in extract_pages.
+        pages: Optional 0-based page numbers to extract, in the order given.
+
+    Yields:
+        The text content of each page as a string.
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or default_executor()
+    if pages is None:
+        pages = range(await loop.run_in_executor(executor, get_page_count, pdf_path))
+
+    chunks = [list(pages[start:start + chunk_size]) for start in range(0, len(pages), chunk_size)]
+    pending = None
+    try:
+        for index, chunk in enumerate(chunks):
+            if pending is None:
+                pending = loop.run_in_executor(executor, _extract_page_list, pdf_path, chunk, mode)
+            texts = await pending
+            pending = None
+            if index + 1 < len(chunks):
+                pending = loop.run_in_executor(executor, _extract_page_list, pdf_path, chunks[index + 1], mode)
+            for text in texts:
+                yield text
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+async def aclean_pages(pages: AsyncIterator[str], config) -> AsyncIterator[str]:
+    """Applies clean_text to every page of an async page stream."""
+    async with aclosing(pages):
+        async for page in pages:
+            yield clean_text(page, config)
+
+async def aanalyze_text(pages: AsyncIterator[str], config: Union[PatternSet, Dict[str, Any]],
+                        stats: Optional[Dict[str, Any]] = None,
+                        page_time_budget: Optional[float] = None) -> AsyncIterator[Item]:
+    """
+    Async counterpart of analyze_text: finds the items in an async page
+    stream, yielding each as soon as the page completing it arrives.
+    Takes the same config and stats as analyze_text.
+
+    The matching runs on the event loop. page_time_budget defaults to the
+    config's budget capped at DEFAULT_ASYNC_PAGE_TIME_BUDGET, which bounds
+    how long one page can block the loop; as with analyze_text, it is only
+    enforced when the loop runs in the main thread.
+    """
+    patterns = compile_patterns(config)
+    budget = page_time_budget
+    if budget is None:
+        budget = min(patterns.page_time_budget or DEFAULT_ASYNC_PAGE_TIME_BUDGET, DEFAULT_ASYNC_PAGE_TIME_BUDGET)
+    scanner = _StreamScanner(patterns, stats, budget)
+    async with aclosing(pages):
+        async for page in pages:
+            for match, _ in scanner.feed(page):
+                yield _build_item(match, patterns)
+    for match, _ in scanner.finish():
+        yield _build_item(match, patterns)
+
+async def buffered(stage: AsyncIterator[Any], maxsize: int = DEFAULT_QUEUE_SIZE) -> AsyncIterator[Any]:
+    """
+    Runs an async stage ahead of its consumer in its own task, holding at
+    most maxsize values in between. Errors in the stage are re-raised to the
+    consumer; closing or cancelling the consumer cancels the stage.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+    done = object()
+
+    async def produce():
+        try:
+            async with aclosing(stage):
+                async for value in stage:
+                    await queue.put((value, None))
+            await queue.put((done, None))
+        except Exception as e:
+            await queue.put((done, e))
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            value, error = await queue.get()
+            if value is done:
+                if error is not None:
+                    raise error
+                return
+            yield value
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+
+def _csv_header(item: Union[Item, Dict[str, Any]]) -> List[str]:
+    """The CSV columns for a stream starting with item (with dedup IDs if it has them)."""
+    with_ids = item.item_id is not None if isinstance(item, Item) else 'item_id' in item
+    return CSV_FIELDNAMES + DEDUP_FIELDNAMES if with_ids else CSV_FIELDNAMES
+
+def _write_text(f, text: str):
+    f.write(text)
+
+async def asave_items(items: AsyncIterator[Dict[str, Any]], output_path: str,
+                      output_format: Optional[str] = None,
+                      batch_size: int = DEFAULT_WRITE_BATCH) -> int:
+    """
+    Writes an async item stream as CSV or JSON Lines. A CSV path ending in
+    .csv.gz or .csv.zst is written compressed, as by save_to_csv.
+
+    Rows are built on the event loop and formatted and written by a thread
+    batch_size items at a time (CSV through write_csv_rows). The file is
+    written under a temporary name and moved to output_path once the stream
+    is complete; if the task is cancelled or the stream fails, the
+    temporary file is removed and output_path is left untouched.
+
+    Returns:
+        The number of items written.
+
+    Raises:
+        ValueError: For formats other than ASYNC_OUTPUT_FORMATS.
+        ImportError: For .csv.zst output without zstd support.
+    """
+    output_format = resolve_output_format(output_path, output_format)
+    if output_format not in ASYNC_OUTPUT_FORMATS:
+        raise ValueError(f"The async pipeline writes {' and '.join(ASYNC_OUTPUT_FORMATS)}, not {output_format}")
+    if output_format == 'csv':
+        output_path = csv_output_path(output_path)
+        # The temporary name keeps the suffix that selects the compression.
+        suffix = '.tmp' + output_path[output_path.lower().rindex('.csv'):]
+    else:
+        output_path = _with_extension(output_path, output_format)
+        suffix = '.tmp'
+    loop = asyncio.get_running_loop()
+    with_ids = False
+
+    def write(f, batch: List[Dict[str, Any]], first: bool):
+        """Builds the rows of a batch and hands them to a thread to format and write."""
+        nonlocal with_ids
+        if output_format == 'jsonl':
+            text = ''.join(json.dumps(_structured_item(item), ensure_ascii=False) + '\n' for item in batch)
+            return loop.run_in_executor(None, _write_text, f, text)
+        rows = []
+        if first:
+            header = _csv_header(batch[0]) if batch else CSV_FIELDNAMES
+            with_ids = len(header) > len(CSV_FIELDNAMES)
+            rows.append(header)
+        rows.extend(_item_csv_values(item, with_ids) for item in batch)
+        return loop.run_in_executor(None, write_csv_rows, f, rows)
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=suffix)
+    committed = False
+    count = 0
+    try:
+        if output_format == 'csv':
+            os.close(fd)
+            output = open_csv_output(temp_path)
+        else:
+            output = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        with output as f:
+            batch: List[Dict[str, Any]] = []
+            first = True
+            async with aclosing(items):
+                async for item in items:
+                    batch.append(item)
+                    if len(batch) >= batch_size:
+                        await write(f, batch, first)
+                        count += len(batch)
+                        batch, first = [], False
+            if batch or first:
+                await write(f, batch, first)
+                count += len(batch)
+        os.replace(temp_path, output_path)
+        committed = True
+    finally:
+        if not committed:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+    return count
+
+async def arun_pipeline(pdf_path: str, output_path: str, config: Union[PatternSet, Dict[str, Any]],
+                        preprocess: bool = False, output_format: Optional[str] = None,
+                        executor: Optional[Executor] = None, pages: Optional[Sequence[int]] = None,
+                        queue_size: int = DEFAULT_QUEUE_SIZE, stats: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Runs extract -> (clean) -> analyze -> write for one document on the
+    running event loop, with a bounded queue between extraction and the
+    rest. Cancelling the task stops every stage and discards the partial
+    output.
+
+    Returns:
+        The number of items written.
+    """
+    page_stream = buffered(aextract_pages(pdf_path, executor, pages=pages), queue_size)
+    if preprocess:
+        page_stream = aclean_pages(page_stream, config)
+    items = aanalyze_text(page_stream, config, stats=stats)
+    return await asave_items(items, output_path, output_format)
@@ -0,0 +1,275 @@
+import csv
+import glob
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Iterator, Any, List, Optional
+
+from modules.pdf_extractor import extract_pages
+from modules.text_analyzer import analyze_text
+from modules.output_writers import save_items, FORMAT_EXTENSIONS
+from modules.text_preprocessor import clean_text
+from modules.config_loader import PatternSet
+from modules.csv_generator import CSV_FIELDNAMES, DEDUP_FIELDNAMES, csv_output_path, open_csv_output, write_csv_rows
+from modules.dedup_index import DedupIndex, deduplicate
+
+MANIFEST_EXTENSIONS = ('.txt', '.lst')
+
+# Set once per worker process by _init_worker, so the config is shipped to
+# each worker a single time instead of with every file.
+_worker_config: Optional[PatternSet] = None
+_worker_preprocess = False
+_worker_cache_dir: Optional[str] = None
+_worker_output_format = 'csv'
+_worker_dedup_index: Optional[str] = None
+
+def collect_pdf_paths(source: str) -> List[str]:
+    """
+    Resolves a batch source into a list of PDF paths.
+
+    Args:
+        source: A directory (all *.pdf files in it), a glob pattern, or a
+                manifest file with one PDF path per line. Blank lines and lines
+                starting with '#' in a manifest are ignored, and relative paths
+                are resolved against the manifest's directory.
+
+    Returns:
+        The PDF paths in a stable order.
+
+    Raises:
+        FileNotFoundError: If the source matches no PDF files.
+    """
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, '*.pdf')) + glob.glob(os.path.join(source, '*.PDF')))
+    elif os.path.isfile(source) and source.lower().endswith(MANIFEST_EXTENSIONS):
+        base_dir = os.path.dirname(source)
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+        paths = [os.path.join(base_dir, line) for line in lines if line and not line.startswith('#')]
+    else:
+        paths = sorted(glob.glob(source))
+
+    if not paths:
+        raise FileNotFoundError(f"No PDF files found for batch source: {source}")
+    return paths
+
+def _output_paths(pdf_paths: List[str], output_dir: str, extension: str = '.csv') -> List[str]:
+    """Maps each input PDF to an output path in output_dir, keeping names unique."""
+    seen: Dict[str, int] = {}
+    output_paths = []
+    for pdf_path in pdf_paths:
+        stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        count = seen.get(stem, 0) + 1
+        seen[stem] = count
+        name = stem if count == 1 else f"{stem}_{count}"
+        output_paths.append(os.path.join(output_dir, name + extension))
+    return output_paths
+
+def _counted(items: Iterator[Dict[str, Any]], counter: List[int]) -> Iterator[Dict[str, Any]]:
+    """Passes items through while counting them in counter[0]."""
+    for item in items:
+        counter[0] += 1
+        yield item
+
+def process_pdf(pdf_path: str, output_path: str, config: PatternSet, preprocess: bool = False,
+                cache_dir: Optional[str] = None, output_format: str = 'csv',
+                dedup_index: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs the full pipeline for a single PDF and reports the outcome.
+    Errors are captured in the result instead of being raised, so one bad
+    file never aborts a batch. cache_dir enables the page text cache,
+    output_format selects the writer (see output_writers.save_items) and
+    dedup_index the path of a shared DedupIndex that replaces repeated items
+    by references.
+
+    Returns:
+        A dictionary with 'pdf_path', 'output_path', 'items', 'seconds' and
+        'error' (None on success).
+    """
+    start = time.perf_counter()
+    counter = [0]
+    error = None
+    try:
+        page_stream = extract_pages(pdf_path, cache_dir=cache_dir)
+        if preprocess:
+            page_stream = (clean_text(page, config) for page in page_stream)
+        items = analyze_text(page_stream, config)
+        if dedup_index is not None:
+            with DedupIndex(dedup_index) as index:
+                items = deduplicate(items, index, os.path.basename(pdf_path), config)
+                save_items(_counted(items, counter), output_path, output_format)
+        else:
+            save_items(_counted(items, counter), output_path, output_format)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return _result(pdf_path, output_path, counter[0], time.perf_counter() - start, error)
+
+def _result(pdf_path: str, output_path: str, items: int, seconds: float, error: Optional[str]) -> Dict[str, Any]:
+    return {
+        'pdf_path': pdf_path,
+        'output_path': output_path,
+        'items': items,
+        'seconds': seconds,
+        'error': error,
+    }
+
+def _init_worker(config: PatternSet, preprocess: bool, cache_dir: Optional[str], output_format: str,
+                 dedup_index: Optional[str] = None):
+    global _worker_config, _worker_preprocess, _worker_cache_dir, _worker_output_format, _worker_dedup_index
+    _worker_config = config
+    _worker_preprocess = preprocess
+    _worker_cache_dir = cache_dir
+    _worker_output_format = output_format
+    _worker_dedup_index = dedup_index
+
+def _process_in_worker(pdf_path: str, output_path: str) -> Dict[str, Any]:
+    return process_pdf(pdf_path, output_path, _worker_config, _worker_preprocess, _worker_cache_dir,
+                       _worker_output_format, _worker_dedup_index)
+
+def _run_pool(indices: List[int], pdf_paths: List[str], output_paths: List[str], results: List[Any],
+              jobs: Optional[int], initargs: tuple) -> List[int]:
+    """
+    Processes the given files on a fresh process pool, storing each result
+    in results as soon as it completes.
+
+    Returns:
+        The files that were lost because a worker process died (crashed,
+        was killed or ran out of memory), which breaks the whole pool.
+    """
+    # Imported here so single-file runs of the CLI do not load multiprocessing.
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+
+    lost = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+        futures = {executor.submit(_process_in_worker, pdf_paths[index], output_paths[index]): index
+                   for index in indices}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except BrokenProcessPool:
+                lost.append(index)
+            except Exception as e:
+                results[index] = _result(pdf_paths[index], output_paths[index], 0, 0.0, f"{type(e).__name__}: {e}")
+    return sorted(lost)
+
+def _process_all(pdf_paths: List[str], output_paths: List[str], jobs: Optional[int],
+                 initargs: tuple) -> List[Dict[str, Any]]:
+    """
+    Processes every file, surviving worker processes that die.
+
+    A dying worker breaks the pool, failing every file that had not finished
+    yet, not only the one that killed it. Those files are run again on a
+    fresh pool. When a round completes no file at all, the remaining files
+    are run one per pool, so the ones that kill their worker are told apart
+    and get an error result while the others complete.
+    """
+    results: List[Any] = [None] * len(pdf_paths)
+    remaining = list(range(len(pdf_paths)))
+    while remaining:
+        lost = _run_pool(remaining, pdf_paths, output_paths, results, jobs, initargs)
+        if len(lost) < len(remaining):
+            remaining = lost
+            continue
+        # Not a single file completed: isolate them.
+        for index in lost:
+            if len(lost) == 1 or _run_pool([index], pdf_paths, output_paths, results, 1, initargs):
+                results[index] = _result(pdf_paths[index], output_paths[index], 0, 0.0,
+                                         "BrokenProcessPool: the worker process died")
+        remaining = []
+    return results
+
+def _combine_csv_files(results: List[Dict[str, Any]], output_path: str, with_ids: bool = False):
+    """
+    Concatenates per-file CSVs into one CSV with an extra 'source' column.
+    A .csv.gz or .csv.zst output path is written compressed.
+
+    The header is the run's columns, with the dedup ID columns when with_ids
+    is set, and not taken from a part: a part without items has no ID
+    columns even when the rows of the others do.
+    """
+    output_path = csv_output_path(output_path)
+    header = CSV_FIELDNAMES + DEDUP_FIELDNAMES if with_ids else CSV_FIELDNAMES
+
+    with open_csv_output(output_path) as combined:
+        write_csv_rows(combined, [['source'] + header])
+        for result in results:
+            if result['error'] is not None:
+                continue
+            source = os.path.basename(result['pdf_path'])
+            with open(result['output_path'], 'r', newline='', encoding='utf-8-sig') as part:
+                reader = csv.reader(part)
+                next(reader, None)
+                write_csv_rows(combined, ([source] + row for row in reader))
+
+def run_batch(pdf_paths: List[str], output_path: str, config: PatternSet,
+              jobs: Optional[int] = None, preprocess: bool = False, combine: bool = False,
+              cache_dir: Optional[str] = None, output_format: str = 'csv',
+              dedup_index: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Processes many PDFs with a process pool, sharing one loaded config.
+
+    Args:
+        pdf_paths: The PDF files to process.
+        output_path: A directory that receives one CSV per input, or the path
+                     of a single combined CSV when combine is True.
+        config: The PatternSet from load_config. It is sent once to each
+                worker and compiled there a single time.
+        jobs: Number of worker processes (defaults to the CPU count).
+        preprocess: Whether to apply clean_text to every page.
+        combine: Write a single CSV with a 'source' column instead of one
+                 CSV per input.
+        cache_dir: Optional directory of the page text cache.
+        output_format: Format of the per-file outputs (see
+                       output_writers.OUTPUT_FORMATS).
+        dedup_index: Optional path of a DedupIndex shared by all workers;
+                     which copy of a repeated item is kept depends on the
+                     order the workers reach it.
+
+    Returns:
+        One result dictionary per input, in input order (see process_pdf).
+        A file whose worker process dies (e.g. a crash in MuPDF or the OOM
+        killer) gets an error result; the other files are still processed.
+
+    Raises:
+        ValueError: If combine is used with a format other than CSV.
+    """
+    if combine and output_format != 'csv':
+        raise ValueError("Combined batch output is only supported for CSV")
+
+    if combine:
+        parts_dir = tempfile.mkdtemp(prefix='batch_parts_', dir=os.path.dirname(os.path.abspath(output_path)))
+    else:
+        os.makedirs(output_path, exist_ok=True)
+        parts_dir = output_path
+
+    try:
+        output_paths = _output_paths(pdf_paths, parts_dir, FORMAT_EXTENSIONS[output_format][0])
+        results = _process_all(pdf_paths, output_paths, jobs,
+                               (config, preprocess, cache_dir, output_format, dedup_index))
+
+        if combine:
+            _combine_csv_files(results, output_path, with_ids=dedup_index is not None)
+            for result in results:
+                result['output_path'] = output_path
+    finally:
+        if combine:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+
+    return results
+
+def format_summary(results: List[Dict[str, Any]]) -> List[str]:
+    """Formats batch results as summary lines: one per file plus a total."""
+    lines = []
+    for result in results:
+        status = 'OK' if result['error'] is None else f"FAILED ({result['error']})"
+        lines.append(f"{result['pdf_path']}: {result['items']} items in {result['seconds']:.2f}s - {status}")
+
+    failures = sum(1 for result in results if result['error'] is not None)
+    total_items = sum(result['items'] for result in results)
+    total_seconds = sum(result['seconds'] for result in results)
+    lines.append(f"Total: {len(results)} files, {total_items} items, {failures} failed, {total_seconds:.2f}s of work")
+    return lines
@@ -0,0 +1,202 @@
+import csv
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+from modules.config_loader import compile_patterns, PatternSet
+from modules.csv_generator import CSV_FIELDNAMES, _flatten_item_for_csv, csv_compression
+from modules.output_writers import resolve_output_format, _with_extension, _structured_item
+from modules.page_cache import _file_digest
+from modules.pdf_extractor import extract_pages, get_page_count
+from modules.text_analyzer import _StreamScanner, _build_item
+from modules.text_preprocessor import clean_text
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+DEFAULT_CHECKPOINT_EVERY = 50
+CHECKPOINT_FORMATS = ('csv', 'jsonl')
+
+# A checkpointed run writes, every few pages, a checkpoint file next to the
+# output recording:
+#
+# - how many pages (of the selected ones, in order) the analyzer has consumed,
+# - the analyzer's state at that page boundary (its pending, unmatched text),
+# - the size of the output file once every item completed by those pages was
+#   written and synced to disk.
+#
+# A resumed run truncates the output to that size (dropping rows written
+# after the checkpoint), restores the analyzer and continues with the next
+# page, appending to the output. The pages are cut at the same boundaries as
+# in an uninterrupted run, so the output is byte-for-byte identical. The
+# checkpoint is removed when the run completes.
+
+def checkpoint_path_for(output_path: str) -> str:
+    """Returns the path of the checkpoint that belongs to an output file."""
+    return output_path + CHECKPOINT_SUFFIX
+
+def _write_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    """Replaces the checkpoint atomically, so a crash leaves the old or the new one."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def load_checkpoint(output_path: str) -> Optional[Dict[str, Any]]:
+    """Returns the checkpoint of an output file, or None if there is none."""
+    try:
+        with open(checkpoint_path_for(output_path), 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        return None
+    return checkpoint
+
+class _ItemWriter:
+    """Writes items as CSV rows or JSON lines and reports the synced file size."""
+
+    def __init__(self, output_path: str, output_format: str, append: bool):
+        self.output_format = output_format
+        encoding = 'utf-8-sig' if output_format == 'csv' else 'utf-8'
+        # Appending at a non-zero position does not repeat the UTF-8 BOM.
+        self.file = open(output_path, 'a' if append else 'w', encoding=encoding, newline='')
+        if output_format == 'csv':
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDNAMES)
+            if not append:
+                self.csv_writer.writeheader()
+
+    def write(self, item):
+        if self.output_format == 'csv':
+            self.csv_writer.writerow(_flatten_item_for_csv(item))
+        else:
+            self.file.write(json.dumps(_structured_item(item), ensure_ascii=False))
+            self.file.write('\n')
+
+    def sync(self) -> int:
+        """Flushes everything written so far to disk and returns the file size."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.buffer.tell()
+
+    def close(self):
+        self.file.close()
+
+def run_checkpointed(pdf_path: str, output_path: str, config: Union[PatternSet, Dict[str, Any]],
+                     preprocess: bool = False, output_format: Optional[str] = None,
+                     pages: Optional[Sequence[int]] = None, workers: int = 1,
+                     cache_dir: Optional[str] = None, every: Optional[int] = DEFAULT_CHECKPOINT_EVERY,
+                     resume: bool = False) -> Dict[str, Any]:
+    """
+    Extracts, analyzes and writes one PDF like the regular pipeline, writing
+    a checkpoint every `every` pages so an interrupted run can be resumed.
+
+    Args:
+        pdf_path: The path to the PDF file.
+        output_path: The output file (CSV or JSON Lines).
+        config: The PatternSet or config dictionary.
+        preprocess: Apply clean_text to every page.
+        output_format: 'csv' or 'jsonl' (default: from the output extension).
+        pages: Optional 0-based pages to extract, as in extract_pages.
+        workers, cache_dir: As in extract_pages.
+        every: Pages between two checkpoints. None when resuming keeps the
+               interval of the interrupted run.
+        resume: Continue from the output's checkpoint instead of starting over.
+
+    Returns:
+        A dictionary with 'pages' (pages analyzed), 'items' (items in the
+        output), 'resumed_at' (pages skipped thanks to the checkpoint) and
+        'checkpoints' (checkpoints written by this run).
+
+    Raises:
+        ValueError: For output formats other than CHECKPOINT_FORMATS or
+                    compressed output, or when resuming without a
+                    checkpoint, or with a checkpoint made for another PDF,
+                    config or options.
+    """
+    patterns = compile_patterns(config)
+    output_format = resolve_output_format(output_path, output_format)
+    if output_format not in CHECKPOINT_FORMATS:
+        raise ValueError(f"Checkpointed runs write {' and '.join(CHECKPOINT_FORMATS)}, not {output_format}")
+    if csv_compression(output_path):
+        # A compressed stream can be neither truncated nor appended to.
+        raise ValueError("Checkpointed runs cannot write compressed (.csv.gz / .csv.zst) output")
+    output_path = _with_extension(output_path, output_format)
+    checkpoint_path = checkpoint_path_for(output_path)
+
+    selection: List[int] = list(pages) if pages is not None else list(range(get_page_count(pdf_path)))
+    identity = {
+        'pdf': _file_digest(pdf_path),
+        'config': patterns.digest,
+        'preprocess': preprocess,
+        'format': output_format,
+        'pages': None if pages is None else selection,
+    }
+
+    scanner = _StreamScanner(patterns, page_time_budget=patterns.page_time_budget)
+    pages_done = items_written = 0
+    if resume:
+        checkpoint = load_checkpoint(output_path)
+        if checkpoint is None:
+            raise ValueError(f"No checkpoint to resume from for {output_path}")
+        if checkpoint['identity'] != identity:
+            changed = ', '.join(key for key in identity if checkpoint['identity'].get(key) != identity[key])
+            raise ValueError(f"The checkpoint of {output_path} was made for a different run (changed: {changed})")
+        if not os.path.exists(output_path) or os.path.getsize(output_path) < checkpoint['output_bytes']:
+            raise ValueError(f"{output_path} is shorter than its checkpoint records; it cannot be resumed")
+        with open(output_path, 'r+b') as f:
+            f.truncate(checkpoint['output_bytes'])
+        scanner.restore(checkpoint['analyzer'])
+        pages_done = checkpoint['pages_done']
+        items_written = checkpoint['items']
+        if every is None:
+            every = checkpoint['every']
+        logging.info(f"Resuming {output_path} after page {pages_done} of {len(selection)} "
+                     f"({items_written} items already written).")
+    elif every is None:
+        every = DEFAULT_CHECKPOINT_EVERY
+
+    resumed_at = pages_done
+    checkpoints = 0
+    writer = _ItemWriter(output_path, output_format, append=resume)
+    try:
+        # The whole document goes through extract_pages unchanged, so it is
+        # cached as usual; a resumed run only extracts the remaining pages.
+        remaining = None if pages is None and pages_done == 0 else selection[pages_done:]
+        page_stream = extract_pages(pdf_path, workers=workers, cache_dir=cache_dir, pages=remaining)
+        for page_text in page_stream:
+            if preprocess:
+                page_text = clean_text(page_text, patterns)
+            for match, _ in scanner.feed(page_text):
+                writer.write(_build_item(match, patterns))
+                items_written += 1
+            pages_done += 1
+            if every and pages_done % every == 0 and pages_done < len(selection):
+                _write_checkpoint(checkpoint_path, {
+                    'version': CHECKPOINT_VERSION,
+                    'identity': identity,
+                    'every': every,
+                    'pages_done': pages_done,
+                    'items': items_written,
+                    'output_bytes': writer.sync(),
+                    'analyzer': scanner.state(),
+                })
+                checkpoints += 1
+        for match, _ in scanner.finish():
+            writer.write(_build_item(match, patterns))
+            items_written += 1
+    finally:
+        writer.close()
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return {'pages': pages_done - resumed_at, 'items': items_written,
+            'resumed_at': resumed_at, 'checkpoints': checkpoints}
@@ -1,9 +1,52 @@
-import yaml
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 import os
+import logging
+from modules.lazy_import import lazy_import
+from modules.text_preprocessor import compile_cleaning_rules
+from modules.regex_lint import lint_pattern
+from modules.prefilter import anchored_scanner, literal_prefilter
+
+yaml = lazy_import('yaml')  # loaded by the first load_config
 
 DEFAULT_CONFIG_PATH = 'config/default_config.yaml'
 
+# (section, key, flags, required named groups, required) for every regex the
+# analyzer uses. Optional patterns may be missing or empty.
+_PATTERN_SPECS = [
+    ('problem_patterns', 'stream', re.MULTILINE | re.DOTALL, ('number', 'problem', 'explanation'), True),
+    ('problem_patterns', 'final', re.MULTILINE | re.DOTALL, ('number', 'problem', 'explanation'), True),
+    ('problem_patterns', 'item_start', re.MULTILINE, (), False),
+    ('explanation_patterns', 'sub_item', re.MULTILINE | re.DOTALL, ('label', 'text'), False),
+    ('explanation_patterns', 'first_item_delimiter', 0, (), False),
+    ('explanation_patterns', 'item_split_delimiter', 0, (), False),
+]
+
+# Seconds the patterns may spend on one page before analyze_text quarantines
+# the pending text (see the optional 'matching' section).
+DEFAULT_PAGE_TIME_BUDGET = 10.0
+
+# Ceiling on the unmatched text analyze_text holds while waiting for the next
+# item start, and what it does with that text when the ceiling is reached:
+# 'flush' emits it as an unterminated item, 'spill' moves it to a file in
+# spill_dir, 'skip' drops it.
+DEFAULT_MAX_BUFFER_CHARS = 4_000_000
+OVERFLOW_POLICIES = ('flush', 'spill', 'skip')
+
+# Compiled pattern sets keyed by the digest of their config content, so the
+# same config is only compiled once per process no matter how often it is loaded.
+# The least recently used set is dropped beyond MAX_CACHED_PATTERN_SETS, so a
+# long-running process that reloads edited configs does not keep every version.
+MAX_CACHED_PATTERN_SETS = 32
+_PATTERN_SET_CACHE: 'OrderedDict[str, PatternSet]' = OrderedDict()
+_PATTERN_SET_CACHE_LOCK = threading.Lock()
+
 def _validate_config(config: Dict[str, Any], path: str):
     """
     Validates that the loaded configuration contains the required keys.
@@ -24,9 +67,186 @@ def _validate_config(config: Dict[str, Any], path: str):
             if sub_key not in config[main_key]:
                 raise ValueError(f"Missing required key '{sub_key}' in section '{main_key}' in config file: {path}")
 
-def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+def _freeze(value: Any) -> Any:
+    """Recursively wraps dictionaries and lists in read-only equivalents."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _thaw(value: Any) -> Any:
+    """Turns a frozen config value back into plain dictionaries and lists."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+def _positive_or_null(section: Dict[str, Any], key: str, default, source: str, kind: type = float):
+    value = section.get(key, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0 or (kind is int and value != int(value)):
+        noun = 'number' if kind is float else 'integer'
+        raise ValueError(f"'matching.{key}' must be a positive {noun} or null in config file: {source}")
+    return kind(value)
+
+def _config_digest(config: Dict[str, Any]) -> str:
+    canonical = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class PatternSet(Mapping):
     """
-    Loads a YAML configuration file.
+    An immutable, validated configuration with every regex compiled once.
+
+    It still behaves like the loaded YAML mapping (e.g.
+    config['problem_patterns']['stream'] returns the pattern string), and
+    exposes the compiled patterns as attributes: stream, final, item_start,
+    sub_item, first_item_delimiter and item_split_delimiter. Optional
+    patterns that are missing or empty are None. cleaning_rules holds the
+    compiled rules of the optional 'preprocessing' section.
+
+    Patterns are linted for catastrophic backtracking when compiled:
+    exponential risks are rejected unless 'matching.allow_risky_patterns' is
+    true, polynomial risks are logged. lint_issues lists every finding and
+    page_time_budget the per-page matching budget in seconds (None = off).
+    max_buffer_chars and max_buffer_pages bound the pending text (None = no
+    bound) and overflow_policy (one of OVERFLOW_POLICIES) says what happens
+    when a bound is exceeded; spilled text goes to spill_dir (None = the
+    system temp directory).
+
+    Unless 'matching.prefilter' is false, two prefilters derived from the
+    patterns skip regex work on text that cannot match (see
+    modules.prefilter): stream_scanner runs the stream pattern only at line
+    starts that can begin an item, and explanation_prefilter (or None)
+    rejects explanations lacking a literal the first_item_delimiter needs.
+    Without prefilters stream_scanner is the stream pattern itself.
+    """
+    __slots__ = ('_data', 'digest', 'stream', 'final', 'item_start',
+                 'sub_item', 'first_item_delimiter', 'item_split_delimiter', 'cleaning_rules',
+                 'lint_issues', 'page_time_budget',
+                 'max_buffer_chars', 'max_buffer_pages', 'overflow_policy', 'spill_dir',
+                 'stream_scanner', 'explanation_prefilter')
+
+    def __init__(self, config: Dict[str, Any], source: str = '<dict>'):
+        _validate_config(config, source)
+        object.__setattr__(self, '_data', _freeze(config))
+        object.__setattr__(self, 'digest', _config_digest(config))
+
+        matching = config.get('matching') or {}
+        if not isinstance(matching, dict):
+            raise ValueError(f"Section 'matching' must be a dictionary in config file: {source}")
+        budget = matching.get('page_time_budget', DEFAULT_PAGE_TIME_BUDGET)
+        if budget is not None and (isinstance(budget, bool) or not isinstance(budget, (int, float)) or budget <= 0):
+            raise ValueError(f"'matching.page_time_budget' must be a positive number of seconds or null in config file: {source}")
+        object.__setattr__(self, 'max_buffer_chars', _positive_or_null(matching, 'max_buffer_chars', DEFAULT_MAX_BUFFER_CHARS, source, int))
+        object.__setattr__(self, 'max_buffer_pages', _positive_or_null(matching, 'max_buffer_pages', None, source, int))
+        overflow_policy = matching.get('overflow_policy', 'flush')
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"'matching.overflow_policy' must be one of {', '.join(OVERFLOW_POLICIES)} in config file: {source}")
+        object.__setattr__(self, 'overflow_policy', overflow_policy)
+        spill_dir = matching.get('spill_dir')
+        if spill_dir is not None and not isinstance(spill_dir, str):
+            raise ValueError(f"'matching.spill_dir' must be a directory path or null in config file: {source}")
+        object.__setattr__(self, 'spill_dir', spill_dir)
+        allow_risky = matching.get('allow_risky_patterns', False)
+        if not isinstance(allow_risky, bool):
+            raise ValueError(f"'matching.allow_risky_patterns' must be true or false in config file: {source}")
+        use_prefilter = matching.get('prefilter', True)
+        if not isinstance(use_prefilter, bool):
+            raise ValueError(f"'matching.prefilter' must be true or false in config file: {source}")
+        object.__setattr__(self, 'page_time_budget', float(budget) if budget is not None else None)
+        lint_issues = []
+
+        for section, key, flags, groups, required in _PATTERN_SPECS:
+            pattern_str = config.get(section, {}).get(key)
+            if not pattern_str:
+                if required:
+                    raise ValueError(f"Pattern '{key}' in section '{section}' must not be empty in config file: {source}")
+                object.__setattr__(self, key, None)
+                continue
+            try:
+                compiled = re.compile(pattern_str, flags)
+            except (re.error, TypeError) as e:
+                raise ValueError(f"Invalid regular expression for '{key}' in section '{section}' in config file: {source}: {e}")
+            missing_groups = [group for group in groups if group not in compiled.groupindex]
+            if missing_groups:
+                raise ValueError(f"Pattern '{key}' in section '{section}' is missing named group(s) {missing_groups} in config file: {source}")
+
+            for issue in lint_pattern(pattern_str, flags):
+                lint_issues.append({'pattern': f"{section}.{key}", **issue})
+                message = f"Pattern '{key}' in section '{section}' in config file: {source}: {issue['message']}"
+                if issue['severity'] == 'exponential' and not allow_risky:
+                    raise ValueError(f"{message} (set 'matching.allow_risky_patterns: true' to accept it)")
+                logging.warning(message)
+            object.__setattr__(self, key, compiled)
+        object.__setattr__(self, 'lint_issues', _freeze(lint_issues))
+
+        stream_scanner = anchored_scanner(self.stream) if use_prefilter else None
+        object.__setattr__(self, 'stream_scanner', stream_scanner or self.stream)
+        explanation_prefilter = None
+        if use_prefilter and self.first_item_delimiter is not None:
+            explanation_prefilter = literal_prefilter(self.first_item_delimiter)
+        object.__setattr__(self, 'explanation_prefilter', explanation_prefilter)
+
+        try:
+            object.__setattr__(self, 'cleaning_rules', compile_cleaning_rules(config.get('preprocessing')))
+        except ValueError as e:
+            raise ValueError(f"{e} in config file: {source}")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PatternSet is immutable")
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __reduce__(self):
+        # Compiled patterns travel to worker processes as plain config and are
+        # recompiled (once per process) on the other side.
+        return (compile_patterns, (self.to_dict(),))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns a mutable copy of the underlying configuration."""
+        return _thaw(self._data)
+
+def compile_patterns(config: Mapping, source: str = '<dict>') -> PatternSet:
+    """
+    Returns the compiled, validated PatternSet for a configuration mapping.
+
+    A PatternSet is returned unchanged. Plain dictionaries are compiled once
+    and cached by the digest of their content (the MAX_CACHED_PATTERN_SETS
+    most recently used ones).
+
+    Raises:
+        ValueError: If a required key is missing, a regex does not compile, or
+                    a pattern lacks the named groups the analyzer reads.
+    """
+    if isinstance(config, PatternSet):
+        return config
+
+    digest = _config_digest(config)
+    with _PATTERN_SET_CACHE_LOCK:
+        pattern_set = _PATTERN_SET_CACHE.get(digest)
+        if pattern_set is not None:
+            _PATTERN_SET_CACHE.move_to_end(digest)
+            return pattern_set
+    pattern_set = PatternSet(config, source)
+    with _PATTERN_SET_CACHE_LOCK:
+        _PATTERN_SET_CACHE[digest] = pattern_set
+        while len(_PATTERN_SET_CACHE) > MAX_CACHED_PATTERN_SETS:
+            _PATTERN_SET_CACHE.popitem(last=False)
+    return pattern_set
+
+def load_config(config_path: Optional[str] = None) -> PatternSet:
+    """
+    Loads a YAML configuration file and compiles its patterns.
 
     If a custom path is provided, it attempts to load from there.
     If the custom path fails or is not provided, it falls back to the default path.
@@ -35,11 +255,13 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         config_path: Optional path to a custom YAML configuration file.
 
     Returns:
-        A dictionary containing the configuration.
+        An immutable PatternSet holding the configuration and its compiled
+        regexes. Loading the same content again returns the cached instance.
 
     Raises:
         FileNotFoundError: If neither the custom nor the default config file can be found.
         yaml.YAMLError: If there is an error parsing the YAML file.
+        ValueError: If the configuration is incomplete or a pattern is invalid.
     """
     path_to_load = config_path if config_path else DEFAULT_CONFIG_PATH
 
@@ -56,8 +278,10 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         if config_data is None:
             raise ValueError(f"Config file is empty or invalid: {path_to_load}")
             
-        _validate_config(config_data, path_to_load)
-        return config_data
+        if not isinstance(config_data, dict):
+            raise ValueError(f"Config file must contain a mapping at the top level: {path_to_load}")
+
+        return compile_patterns(config_data, path_to_load)
     except yaml.YAMLError as e:
         raise yaml.YAMLError(f"Error parsing YAML file at {path_to_load}: {e}")
     except FileNotFoundError:
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import re
+from typing import Dict, Iterator, Any, Optional, Tuple
+
+from modules.items import Item, as_item
+from modules.lazy_import import lazy_import
+from modules.text_preprocessor import clean_text
+
+sqlite3 = lazy_import('sqlite3')  # loaded when the first index is opened
+
+# A persistent index of every item seen across documents, keyed by a digest
+# of its normalized text. The number is left out of the digest, since the
+# same problem is renumbered between editions and series.
+#
+# The index is a SQLite table with an integer primary key (the canonical item
+# ID) and a unique index on the 16-byte digest, so a lookup is one B-tree
+# probe: well under a millisecond even with tens of millions of rows, as
+# long as the page cache holds the upper levels of the index.
+#
+# Batch workers share one index, so no connection may hold the write lock
+# for longer than one insert: the connection is in autocommit mode, and each
+# new digest is registered by a single INSERT ... ON CONFLICT DO NOTHING,
+# which is its own short transaction. In WAL mode with synchronous=NORMAL a
+# commit does not wait for an fsync, and readers never wait for the writer.
+
+# SQLite page cache per connection, in KiB (negative = KiB for cache_size).
+DEFAULT_CACHE_KIB = 65536
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    digest BLOB NOT NULL UNIQUE,
+    source TEXT,
+    number TEXT
+)
+"""
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_item(item: Dict[str, Any], config=None) -> str:
+    """
+    Builds the text an item is identified by: title, body and sub-items,
+    cleaned with clean_text (config's preprocessing rules), with all
+    whitespace collapsed and case folded, so layout differences between
+    editions do not matter.
+    """
+    parts = [item.get('title', ''), item.get('body', '')]
+    for sub_item in item.get('explanation_items', []):
+        parts.append(f"{sub_item.get('label', '')}. {sub_item.get('text', '')}")
+    text = clean_text('\n'.join(parts), config)
+    return _WHITESPACE.sub(' ', text).strip().casefold()
+
+def item_digest(item: Dict[str, Any], config=None) -> bytes:
+    """Returns the 16-byte digest of an item's normalized text."""
+    return hashlib.blake2b(normalize_item(item, config).encode('utf-8'), digest_size=16).digest()
+
+class DedupIndex:
+    """
+    Persistent digest -> canonical item ID index backed by SQLite.
+
+    Args:
+        path: The SQLite database file, created if missing.
+        timeout: Seconds to wait for another process holding the write lock.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # isolation_level=None: autocommit, no implicit transaction is opened.
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(f"PRAGMA cache_size=-{DEFAULT_CACHE_KIB}")
+        self.connection.execute(_SCHEMA)
+
+    def lookup(self, digest: bytes) -> Optional[int]:
+        """Returns the canonical ID of a digest, or None if it is new."""
+        row = self.connection.execute("SELECT id FROM items WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row is not None else None
+
+    def add(self, digest: bytes, source: Optional[str] = None, number: Optional[str] = None) -> Tuple[int, bool]:
+        """
+        Looks up a digest and registers it when it is new.
+
+        Returns:
+            (canonical ID, True if the digest was new).
+        """
+        item_id = self.lookup(digest)
+        if item_id is not None:
+            return item_id, False
+        row = self.connection.execute(
+            "INSERT INTO items (digest, source, number) VALUES (?, ?, ?) "
+            "ON CONFLICT (digest) DO NOTHING RETURNING id",
+            (digest, source, number)).fetchone()
+        if row is None:
+            # Another process registered it since the lookup.
+            return self.lookup(digest), False
+        return row[0], True
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def deduplicate(items: Iterator[Item], index: DedupIndex, source: Optional[str] = None,
+                config=None, stats: Optional[Dict[str, Any]] = None) -> Iterator[Item]:
+    """
+    Pipeline stage after analyze_text that replaces repeated items by
+    references to their canonical ID.
+
+    Every item gets an 'item_id'. The first occurrence of a text is emitted
+    with its content; later ones (in this or any earlier document in the index)
+    keep only their number plus 'duplicate_of', the canonical ID.
+
+    Args:
+        items: The item stream from analyze_text (Items or item dictionaries).
+        index: The DedupIndex to check and update.
+        source: Name recorded with new items, e.g. the PDF file name.
+        config: Config whose preprocessing rules normalize the text.
+        stats: Optional dictionary that receives 'unique_items' and
+               'duplicate_items' counts.
+    """
+    unique = duplicates = 0
+    for item in items:
+        item = as_item(item)
+        item_id, is_new = index.add(item_digest(item, config), source, item.number)
+        if is_new:
+            unique += 1
+            yield Item(item.number, item.title, item.body, item.explanation_items, item_id, None)
+        else:
+            duplicates += 1
+            yield Item(item.number, '', '', [], item_id, item_id)
+        if stats is not None:
+            stats['unique_items'] = unique
+            stats['duplicate_items'] = duplicates
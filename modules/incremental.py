@@ -0,0 +1,212 @@
+import bisect
+import csv
+import hashlib
+import json
+import os
+from typing import Dict, Iterator, Any, List, Optional, Tuple
+
+from modules.pdf_extractor import extract_pages, extract_selected_pages, page_fingerprints
+from modules.text_analyzer import analyze_text_with_spans
+from modules.csv_generator import save_rows_to_csv, _flatten_item_for_csv, csv_compression
+from modules.text_preprocessor import clean_text
+from modules.config_loader import compile_patterns, PatternSet
+
+MANIFEST_VERSION = 2
+MANIFEST_SUFFIX = '.manifest.json'
+
+# The manifest written next to the CSV records, per page, a fingerprint of the
+# PDF page, and per item (in CSV row order) the [page, offset] where its match
+# starts and ends plus a fingerprint of its source text and the patterns.
+# Offsets index the (optionally preprocessed) page text.
+
+def manifest_path_for(output_path: str) -> str:
+    """Returns the path of the manifest that belongs to an output CSV."""
+    return output_path + MANIFEST_SUFFIX
+
+def _tracked(pages: Iterator[str], page_starts: List[int]) -> Iterator[str]:
+    """Passes pages through while recording the stream offset each one starts at."""
+    total = 0
+    for page_text in pages:
+        page_starts.append(total)
+        total += len(page_text)
+        yield page_text
+
+def _locate(position: int, page_starts: List[int], first_page: int, first_offset: int) -> List[int]:
+    """
+    Converts a stream offset into [page, offset]. A position on a page
+    boundary is attributed to the end of the earlier page, so the result does
+    not depend on whether the next page has been read yet.
+    """
+    index = max(bisect.bisect_left(page_starts, position) - 1, 0)
+    offset = position - page_starts[index]
+    if index == 0:
+        offset += first_offset
+    return [first_page + index, offset]
+
+def _skip_prefix(pages: Iterator[str], offset: int) -> Iterator[str]:
+    """Drops the first offset characters of the first page."""
+    for index, page_text in enumerate(pages):
+        yield page_text[offset:] if index == 0 else page_text
+
+def _fingerprint(patterns: PatternSet, source: str) -> str:
+    return hashlib.sha256((patterns.digest + source).encode('utf-8')).hexdigest()[:16]
+
+def _analyze_window(pages: Iterator[str], patterns: PatternSet, first_page: int,
+                    first_offset: int, page_starts: List[int]) -> Iterator[Tuple[Dict[str, str], Dict[str, Any]]]:
+    """Yields (csv row, item record) for every item found in a window of pages."""
+    for item, start, end, source in analyze_text_with_spans(_tracked(pages, page_starts), patterns):
+        record = {
+            'start': _locate(start, page_starts, first_page, first_offset),
+            'end': _locate(end, page_starts, first_page, first_offset),
+            'fingerprint': _fingerprint(patterns, source),
+        }
+        yield _flatten_item_for_csv(item), record
+
+def _write_outputs(rows: Iterator[Dict[str, str]], output_path: str, manifest: Dict[str, Any]):
+    """Atomically replaces the CSV and then its manifest."""
+    temp_csv = output_path + '.tmp'
+    save_rows_to_csv(rows, temp_csv)
+    os.replace(temp_csv, output_path)
+
+    manifest_path = manifest_path_for(output_path)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+def _load_previous(output_path: str, patterns: PatternSet, preprocess: bool,
+                   page_count: int) -> Optional[Tuple[Dict[str, Any], List[Dict[str, str]]]]:
+    """
+    Returns the previous manifest and CSV rows if they can be reused for this
+    run, or None when a full run is required.
+    """
+    manifest_path = manifest_path_for(output_path)
+    if not (os.path.exists(manifest_path) and os.path.exists(output_path)):
+        return None
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        with open(output_path, 'r', newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+    except (OSError, ValueError):
+        return None
+
+    if (manifest.get('version') != MANIFEST_VERSION
+            or manifest.get('config_digest') != patterns.digest
+            or manifest.get('preprocess') != preprocess
+            or len(manifest.get('page_fingerprints', [])) != page_count
+            or len(manifest.get('items', [])) != len(rows)):
+        return None
+    return manifest, rows
+
+def _new_manifest(patterns: PatternSet, preprocess: bool, fingerprints: List[str],
+                  items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        'version': MANIFEST_VERSION,
+        'config_digest': patterns.digest,
+        'preprocess': preprocess,
+        'page_fingerprints': fingerprints,
+        'items': items,
+    }
+
+def _full_run(pdf_path: str, output_path: str, patterns: PatternSet, preprocess: bool,
+              fingerprints: List[str], workers: int, cache_dir: Optional[str]) -> Dict[str, Any]:
+    pages = extract_pages(pdf_path, workers=workers, cache_dir=cache_dir)
+    if preprocess:
+        pages = (clean_text(page, patterns) for page in pages)
+
+    records: List[Dict[str, Any]] = []
+    page_starts: List[int] = []
+
+    def rows():
+        for row, record in _analyze_window(pages, patterns, 0, 0, page_starts):
+            records.append(record)
+            yield row
+
+    manifest = _new_manifest(patterns, preprocess, fingerprints, records)
+    _write_outputs(rows(), output_path, manifest)
+    return {'mode': 'full', 'pages': len(fingerprints), 'pages_extracted': len(page_starts),
+            'items': len(records), 'items_reparsed': len(records)}
+
+def run_incremental(pdf_path: str, output_path: str, config: PatternSet, preprocess: bool = False,
+                    workers: int = 1, cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Updates an existing CSV for a new version of a PDF, re-extracting and
+    re-analyzing only the pages around the ones that changed.
+
+    Changed pages are found by comparing page fingerprints with the manifest
+    stored next to the CSV. Items that ended before the page preceding the
+    first change are kept. The analyzer restarts where the last kept item
+    ended and runs until, past the last changed page, it ends an item at the
+    same position as the previous run did. From there on the previous items
+    are spliced back in unchanged. Without a usable manifest (first run,
+    different config or preprocessing, different page count), a full run is
+    done and the manifest is created.
+
+    Args:
+        pdf_path: The path to the PDF file.
+        output_path: The CSV to create or update.
+        config: The PatternSet returned by load_config.
+        preprocess: Whether clean_text is applied to every page.
+        workers: Extraction processes used for a full run.
+        cache_dir: Optional page text cache directory used for a full run.
+
+    Returns:
+        A dictionary with 'mode' ('full', 'incremental' or 'unchanged'),
+        'pages', 'pages_extracted', 'items' and 'items_reparsed'.
+
+    Raises:
+        ValueError: For a compressed (.csv.gz / .csv.zst) output path.
+    """
+    if csv_compression(output_path):
+        raise ValueError("Incremental runs cannot update compressed (.csv.gz / .csv.zst) output")
+    if not output_path.lower().endswith('.csv'):
+        output_path += '.csv'
+
+    patterns = compile_patterns(config)
+    fingerprints = page_fingerprints(pdf_path)
+    previous = _load_previous(output_path, patterns, preprocess, len(fingerprints))
+    if previous is None:
+        return _full_run(pdf_path, output_path, patterns, preprocess, fingerprints, workers, cache_dir)
+
+    manifest, old_rows = previous
+    old_items = manifest['items']
+    changed = [page for page, (old, new) in enumerate(zip(manifest['page_fingerprints'], fingerprints)) if old != new]
+    if not changed:
+        return {'mode': 'unchanged', 'pages': len(fingerprints), 'pages_extracted': 0,
+                'items': len(old_rows), 'items_reparsed': 0}
+    first_changed, last_changed = changed[0], changed[-1]
+
+    # An item ending on the page just before a change may have been cut by a
+    # lookahead that peeked into the changed page, so keep one page of margin.
+    kept = 0
+    while kept < len(old_items) and old_items[kept]['end'][0] < first_changed - 1:
+        kept += 1
+    restart_page, restart_offset = old_items[kept - 1]['end'] if kept else (0, 0)
+
+    old_end_index = {tuple(record['end']): index for index, record in enumerate(old_items)}
+    pages = extract_selected_pages(pdf_path, range(restart_page, len(fingerprints)))
+    if preprocess:
+        pages = (clean_text(page, patterns) for page in pages)
+
+    new_rows: List[Dict[str, str]] = []
+    new_items: List[Dict[str, Any]] = []
+    page_starts: List[int] = []
+    resume_at = len(old_items)
+    window = _analyze_window(_skip_prefix(pages, restart_offset), patterns, restart_page, restart_offset, page_starts)
+    for row, record in window:
+        new_rows.append(row)
+        new_items.append(record)
+        if record['end'][0] > last_changed:
+            old_index = old_end_index.get(tuple(record['end']))
+            if old_index is not None and old_index >= kept:
+                # Same analyzer state and identical text from here on.
+                resume_at = old_index + 1
+                break
+    window.close()
+
+    rows = old_rows[:kept] + new_rows + old_rows[resume_at:]
+    items = old_items[:kept] + new_items + old_items[resume_at:]
+    _write_outputs(iter(rows), output_path, _new_manifest(patterns, preprocess, fingerprints, items))
+    return {'mode': 'incremental', 'pages': len(fingerprints), 'pages_extracted': len(page_starts),
+            'items': len(rows), 'items_reparsed': len(new_rows)}
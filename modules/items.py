@@ -0,0 +1,119 @@
+from collections.abc import Mapping
+from typing import Dict, Any, List, Optional, Union
+
+# The analyzers yield one Item per problem. Items are slotted objects rather
+# than dictionaries: at millions of items per batch run, a dict per item plus
+# a dict per sub-item shows up as allocation and GC time. A SubItem does not
+# copy its text out of the match either; it keeps the piece of explanation
+# it was matched in and the offsets of its text, and only slices it when the
+# text is read.
+#
+# Both types still behave like the read-only dictionaries the pipeline used
+# to pass around (item['number'], item.get('explanation_items'), comparison
+# with dicts), and as_dict() returns those plain dictionaries, e.g. for JSON.
+# Writers read the attributes directly.
+
+class SubItem(Mapping):
+    """
+    One labelled sub-item of an explanation (e.g. 'ㄱ. ...').
+
+    Args:
+        label: The label, e.g. 'ㄱ'.
+        source: The text the sub-item was matched in, or the text itself.
+        start, end: Offsets of the text within source (default: all of it).
+    """
+    __slots__ = ('label', 'source', 'start', 'end')
+    _KEYS = ('label', 'text')
+
+    def __init__(self, label: str, source: str, start: int = 0, end: Optional[int] = None):
+        self.label = label
+        self.source = source
+        self.start = start
+        self.end = len(source) if end is None else end
+
+    @property
+    def text(self) -> str:
+        if self.start == 0 and self.end == len(self.source):
+            return self.source
+        return self.source[self.start:self.end]
+
+    def as_dict(self) -> Dict[str, str]:
+        return {'label': self.label, 'text': self.text}
+
+    def __getitem__(self, key):
+        if key == 'label':
+            return self.label
+        if key == 'text':
+            return self.text
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return f"SubItem(label={self.label!r}, text={self.text!r})"
+
+class Item(Mapping):
+    """
+    One problem with its explanation.
+
+    item_id and duplicate_of are set by dedup_index.deduplicate; they are
+    None (and not among the mapping keys) for items that were not checked
+    against an index.
+    """
+    __slots__ = ('number', 'title', 'body', 'explanation_items', 'item_id', 'duplicate_of')
+    _KEYS = ('number', 'title', 'body', 'explanation_items')
+    _DEDUP_KEYS = _KEYS + ('item_id', 'duplicate_of')
+
+    def __init__(self, number: str, title: str, body: str, explanation_items: Optional[List[SubItem]] = None,
+                 item_id: Optional[int] = None, duplicate_of: Optional[int] = None):
+        self.number = number
+        self.title = title
+        self.body = body
+        self.explanation_items = explanation_items if explanation_items is not None else []
+        self.item_id = item_id
+        self.duplicate_of = duplicate_of
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the item as the plain dictionary the pipeline used to yield."""
+        data = {
+            'number': self.number,
+            'title': self.title,
+            'body': self.body,
+            'explanation_items': [sub_item.as_dict() for sub_item in self.explanation_items],
+        }
+        if self.item_id is not None:
+            data['item_id'] = self.item_id
+            data['duplicate_of'] = self.duplicate_of
+        return data
+
+    def _keys(self):
+        return self._KEYS if self.item_id is None else self._DEDUP_KEYS
+
+    def __getitem__(self, key):
+        if key in self._keys():
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __repr__(self):
+        return f"Item(number={self.number!r}, title={self.title!r}, sub_items={len(self.explanation_items)})"
+
+def as_item(item: Union[Item, Mapping]) -> Item:
+    """Returns an Item for an Item or an item dictionary, e.g. one read back from JSON."""
+    if isinstance(item, Item):
+        return item
+    explanation_items = [
+        sub_item if isinstance(sub_item, SubItem) else SubItem(sub_item.get('label', ''), sub_item.get('text', ''))
+        for sub_item in item.get('explanation_items', ())
+    ]
+    return Item(item.get('number', ''), item.get('title', ''), item.get('body', ''), explanation_items,
+                item.get('item_id'), item.get('duplicate_of'))
@@ -0,0 +1,327 @@
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, Any, List, Optional, Union
+
+from modules.config_loader import compile_patterns, PatternSet
+from modules.items import Item
+from modules.lazy_import import lazy_import
+from modules.text_analyzer import _parse_explanation, _PageTimer, _quarantine, _spill
+from modules.text_preprocessor import clean_text
+
+fitz = lazy_import('fitz')  # PyMuPDF, loaded on first use
+
+# Layout mode reads get_text("dict") instead of plain text. Every line keeps
+# its position and font, which gives two things plain text cannot:
+#
+# - Reading order. A page whose lines sit on both sides of the middle is read
+#   column by column; lines spanning the middle (titles, footers) separate
+#   the bands that are ordered this way.
+# - Problem headers by layout. A header is a numbered line at the left edge of
+#   its column that is set larger or bolder than the page's body text, so the
+#   items are delimited line by line instead of by DOTALL regex scans over
+#   the pending text. On a page set in one font only, a header must also
+#   read like one (number, delimiter, title), so a page number at the left
+#   edge is not taken for a problem.
+#
+# The pending explanation is capped and a page's matching is timed by the
+# same 'matching' settings as in analyze_text.
+
+# Minimum number of lines on each side of the middle for a band to be read as
+# two columns. A lone right-aligned line (a page number) stays in place.
+_MIN_COLUMN_LINES = 2
+# Points a header may be indented from the left edge of its column.
+_EDGE_TOLERANCE = 3.0
+# Points by which a header's font must exceed the body font.
+_SIZE_STEP = 0.5
+_HEADER_TEXT = re.compile(r'(?P<number>\d+)(?:(?:\.\s*|\s+)(?P<title>.*))?$')
+# The header shape required when the font tells nothing: a number, then a
+# period or whitespace, then the title.
+_NUMBERED_TITLE = re.compile(r'\d+(?:\.\s*|\s+)\S')
+
+class LineRecord:
+    """One text line of a page with its position (points) and font."""
+    __slots__ = ('page', 'column', 'x0', 'y0', 'x1', 'y1', 'size', 'bold', 'text')
+
+    def __init__(self, page: int, x0: float, y0: float, x1: float, y1: float,
+                 size: float, bold: bool, text: str, column: int = 0):
+        self.page = page
+        self.column = column
+        self.x0 = x0
+        self.y0 = y0
+        self.x1 = x1
+        self.y1 = y1
+        self.size = size
+        self.bold = bold
+        self.text = text
+
+    def __repr__(self):
+        return f"LineRecord(page={self.page}, column={self.column}, y0={self.y0:.1f}, size={self.size:g}, text={self.text!r})"
+
+def _line_record(page_index: int, line: Dict[str, Any]) -> Optional[LineRecord]:
+    spans = [span for span in line['spans'] if span['text']]
+    if not spans:
+        return None
+    parts = [spans[0]['text']]
+    for previous, span in zip(spans, spans[1:]):
+        # Spans placed apart without a space between them, e.g. a number and
+        # its title drawn separately.
+        gap = span['bbox'][0] - previous['bbox'][2]
+        if gap > span['size'] * 0.25 and not previous['text'][-1].isspace() and not span['text'][0].isspace():
+            parts.append(' ')
+        parts.append(span['text'])
+    text = ''.join(parts).strip()
+    if not text:
+        return None
+    # The dominant span decides the font, so a bold number in front of a
+    # regular title still marks the line as bold.
+    size = max(span['size'] for span in spans)
+    bold = any(span['flags'] & fitz.TEXT_FONT_BOLD for span in spans)
+    x0, y0, x1, y1 = line['bbox']
+    return LineRecord(page_index, x0, y0, x1, y1, size, bold, text)
+
+def _order_columns(lines: List[LineRecord], page_width: float) -> List[LineRecord]:
+    """
+    Sorts lines into reading order and sets their column (0 left or single,
+    1 right).
+    """
+    middle = page_width / 2
+    ordered: List[LineRecord] = []
+    band: List[LineRecord] = []
+
+    def flush():
+        right = [line for line in band if line.x0 >= middle]
+        if len(right) >= _MIN_COLUMN_LINES and len(band) - len(right) >= _MIN_COLUMN_LINES:
+            for line in right:
+                line.column = 1
+            ordered.extend(line for line in band if line.column == 0)
+            ordered.extend(right)
+        else:
+            ordered.extend(band)
+        band.clear()
+
+    for line in sorted(lines, key=lambda line: (line.y0, line.x0)):
+        if line.x0 < middle < line.x1:
+            flush()
+            ordered.append(line)
+        else:
+            band.append(line)
+    flush()
+    return ordered
+
+def page_lines(page: "fitz.Page", page_index: int = 0) -> List[LineRecord]:
+    """Reads the text lines of a PyMuPDF page in column-aware reading order."""
+    data = page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)
+    lines = []
+    for block in data['blocks']:
+        if block.get('type', 0) != 0:
+            continue
+        for line in block['lines']:
+            record = _line_record(page_index, line)
+            if record is not None:
+                lines.append(record)
+    return _order_columns(lines, data['width'])
+
+def lines_to_text(lines: List[LineRecord]) -> str:
+    """Joins the lines of a page into plain text in reading order."""
+    return ''.join(line.text + '\n' for line in lines)
+
+def extract_lines(pdf_path: str, page_numbers: Optional[Iterable[int]] = None) -> Iterator[List[LineRecord]]:
+    """
+    Extracts the line records of a PDF, one list per page.
+
+    Pages are loaded one at a time, so only the page being read is held in
+    memory.
+
+    Args:
+        pdf_path: The path to the PDF file.
+        page_numbers: Optional 0-based pages to read, in the order given
+                      (default: all pages).
+
+    Yields:
+        The LineRecords of each page in reading order.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        for page_number in (range(doc.page_count) if page_numbers is None else page_numbers):
+            yield page_lines(doc.load_page(page_number), page_number)
+    finally:
+        doc.close()
+
+def _body_font(lines: List[LineRecord]):
+    """Returns the (size, bold) that most of the page's text is set in."""
+    weights = Counter()
+    for line in lines:
+        weights[(round(line.size, 1), line.bold)] += len(line.text)
+    return weights.most_common(1)[0][0]
+
+def find_headers(lines: List[LineRecord]) -> List[bool]:
+    """
+    Flags the problem header lines of one page: numbered lines at the left
+    edge of their column, set larger or bolder than the body text. On a page
+    set in a single font, the line must start with a number followed by a
+    title (e.g. '12. Title' or '12 Title'), so a lone page number is not
+    taken for a header.
+    """
+    if not lines:
+        return []
+    edges: Dict[int, float] = {}
+    for line in lines:
+        edges[line.column] = min(edges.get(line.column, line.x0), line.x0)
+    body_size, body_bold = _body_font(lines)
+    uniform = all(round(line.size, 1) == body_size and line.bold == body_bold for line in lines)
+
+    flags = []
+    for line in lines:
+        is_header = (line.text[0].isdigit()
+                     and line.x0 - edges[line.column] <= _EDGE_TOLERANCE
+                     and (line.size >= body_size + _SIZE_STEP or (line.bold and not body_bold)
+                          or (uniform and _NUMBERED_TITLE.match(line.text) is not None))
+                     and _HEADER_TEXT.match(line.text) is not None)
+        flags.append(is_header)
+    return flags
+
+def clean_lines(lines: List[LineRecord], config) -> List[LineRecord]:
+    """Applies the preprocessing rules to the text of every line and drops emptied lines."""
+    for line in lines:
+        line.text = clean_text(line.text, config).strip()
+    return [line for line in lines if line.text]
+
+def _layout_item(header: LineRecord, explanation: List[str], patterns: PatternSet) -> Item:
+    match = _HEADER_TEXT.match(header.text)
+    body, explanation_items = _parse_explanation('\n'.join(explanation), patterns)
+    return Item(match.group('number'), (match.group('title') or '').strip(), body, explanation_items)
+
+class _LineScanner:
+    """
+    Incremental form of analyze_lines: pages of line records are pushed in
+    with feed() and the items they completed are returned, like
+    text_analyzer._StreamScanner.
+    """
+
+    def __init__(self, patterns: PatternSet, stats: Optional[Dict[str, Any]] = None,
+                 page_time_budget: Optional[float] = None):
+        self.patterns = patterns
+        self.stats = stats
+        self.page_time_budget = page_time_budget
+        self.timer = _PageTimer(page_time_budget) if page_time_budget and _PageTimer.available() else None
+        self.header: Optional[LineRecord] = None
+        self.explanation: List[str] = []
+        self.pending_chars = 0
+        # Pages the pending item has accumulated over.
+        self.pending_pages = 0
+        self.page_index = -1
+
+    def feed(self, lines: List[LineRecord]) -> List[Item]:
+        """Adds the next page and returns the items it completed."""
+        self.page_index += 1
+        if self.header is not None:
+            self.pending_pages += 1
+        found: List[Item] = []
+        if self.timer is None:
+            self._read(lines, found)
+        elif not self.timer.run(lambda: self._read(lines, found)):
+            # Quarantine: keep the items built so far, drop the pending one.
+            _quarantine(self.stats, self.page_index, self.pending_chars, self.page_time_budget)
+            self._drop_pending()
+        return found
+
+    def _read(self, lines: List[LineRecord], found: List[Item]):
+        stats = self.stats
+        for line, is_header in zip(lines, find_headers(lines)):
+            if is_header:
+                if self.header is not None:
+                    found.append(_layout_item(self.header, self.explanation, self.patterns))
+                self.header = line
+                self.explanation = []
+                self.pending_chars = 0
+                self.pending_pages = 1
+            elif self.header is not None:
+                self.explanation.append(line.text)
+                self.pending_chars += len(line.text) + 1
+                if stats is not None and self.pending_chars > stats.get('peak_buffer_chars', 0):
+                    stats['peak_buffer_chars'] = self.pending_chars
+        if self._over_limit():
+            found.extend(self._overflow())
+
+    def _drop_pending(self):
+        self.header = None
+        self.explanation = []
+        self.pending_chars = 0
+        self.pending_pages = 0
+
+    def _over_limit(self) -> bool:
+        max_chars = self.patterns.max_buffer_chars
+        max_pages = self.patterns.max_buffer_pages
+        return self.header is not None and ((max_chars is not None and self.pending_chars > max_chars)
+                                            or (max_pages is not None and self.pending_pages > max_pages))
+
+    def _overflow(self) -> List[Item]:
+        """
+        Applies the overflow policy to a pending item that exceeds the buffer
+        limits. Lines up to the next header are then skipped.
+        """
+        policy = self.patterns.overflow_policy
+        if self.stats is not None:
+            counts = self.stats.setdefault('buffer_overflows', {})
+            counts[policy] = counts.get(policy, 0) + 1
+
+        found: List[Item] = []
+        if policy == 'flush':
+            found = [_layout_item(self.header, self.explanation, self.patterns)]
+            detail = "flushed 1 unterminated item(s)"
+        elif policy == 'spill':
+            text = '\n'.join([self.header.text] + self.explanation)
+            detail = f"spilled to {_spill(text, self.patterns, self.stats)}"
+        else:
+            detail = "skipped"
+        logging.warning(f"Pending text reached {self.pending_chars} characters over {self.pending_pages} page(s) "
+                        f"without an item end at page {self.page_index + 1}; {detail}")
+        self._drop_pending()
+        return found
+
+    def finish(self) -> List[Item]:
+        """Returns the item still pending after the last page."""
+        if self.header is None:
+            return []
+        found: List[Item] = []
+        if self.timer is None:
+            found.append(_layout_item(self.header, self.explanation, self.patterns))
+        elif not self.timer.run(lambda: found.append(_layout_item(self.header, self.explanation, self.patterns))):
+            _quarantine(self.stats, self.page_index, self.pending_chars, self.page_time_budget)
+        self._drop_pending()
+        return found
+
+def analyze_lines(line_pages: Iterator[List[LineRecord]], config: Union[PatternSet, Dict[str, Any]],
+                  stats: Optional[Dict[str, Any]] = None,
+                  page_time_budget: Optional[float] = None) -> Iterator[Item]:
+    """
+    Finds the items in a stream of pages of line records, using find_headers
+    to tell where each problem starts. Only the lines of the current item are
+    held; it is yielded as soon as the next header appears.
+
+    The pending explanation is capped by 'matching.max_buffer_chars' and
+    'matching.max_buffer_pages' and handled by 'matching.overflow_policy'
+    like in analyze_text, and a page whose explanation patterns run longer
+    than the page time budget is quarantined.
+
+    Args:
+        line_pages: An iterator that yields the LineRecords of each page.
+        config: The PatternSet returned by load_config, or a dictionary
+                containing the regex patterns. Only the explanation patterns
+                are used, to split each explanation into body and sub-items.
+        stats: Optional dictionary that receives the same statistics as with
+               analyze_text ('peak_buffer_chars' counts pending explanation
+               text).
+        page_time_budget: Seconds the patterns may spend on one page.
+                          Defaults to the config's 'matching.page_time_budget'.
+
+    Yields:
+        An Item for each found item, like analyze_text.
+    """
+    patterns = compile_patterns(config)
+    budget = page_time_budget if page_time_budget is not None else patterns.page_time_budget
+    scanner = _LineScanner(patterns, stats, budget)
+    for lines in line_pages:
+        yield from scanner.feed(lines)
+    yield from scanner.finish()
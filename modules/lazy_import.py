@@ -0,0 +1,37 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+# Heavy dependencies (PyMuPDF alone takes a few hundred milliseconds to
+# import) are bound at module level as lazy modules, so `extract_tool --help`,
+# an argument error or a run served from the page cache never pays for them.
+# The module is loaded on the first attribute access, e.g. fitz.open(...),
+# and behaves like a regular import from then on (mock.patch included).
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns the module `name`, loaded on first attribute access.
+
+    An already imported module is returned as is.
+
+    Raises:
+        ImportError: If the module is not installed. This is raised at once,
+                     not on first use.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def is_loaded(name: str) -> bool:
+    """True if the module `name` has been imported and actually executed."""
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(module, importlib.util._LazyModule)
@@ -0,0 +1,168 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Any, List, Optional
+
+# The pipeline stages are chained generators, so the time spent inside
+# next() on a stage also contains the time its upstream stage needed to
+# produce the input. Every stage is measured inclusively, and a stage's own
+# time is its inclusive time minus that of the stage registered before it.
+# This holds because each stage consumes exactly the previous one.
+
+class StageMetrics:
+    """Counters of one pipeline stage. Times are inclusive of upstream stages."""
+    __slots__ = ('name', 'unit', 'wall', 'cpu', 'count', 'bytes', 'extra')
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.count = 0
+        self.bytes = 0
+        # Stage specific statistics, e.g. the analyzer's peak buffer size.
+        self.extra: Dict[str, Any] = {}
+
+def text_size(text: str) -> int:
+    """UTF-8 size of a page."""
+    return len(text.encode('utf-8'))
+
+def item_size(item: Dict[str, Any]) -> int:
+    """UTF-8 size of the text fields of an item."""
+    size = sum(len(item.get(key, '').encode('utf-8')) for key in ('number', 'title', 'body'))
+    for sub_item in item.get('explanation_items', []):
+        size += len(sub_item.get('label', '').encode('utf-8')) + len(sub_item.get('text', '').encode('utf-8'))
+    return size
+
+class PipelineMetrics:
+    """
+    Collects wall time, CPU time, counts, bytes and throughput per stage.
+
+    Register the stages in pipeline order: wrap every iterator stage with
+    stage() and time the stage that consumes the last iterator with sink().
+    """
+
+    def __init__(self):
+        self.stages: List[StageMetrics] = []
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    def stage(self, name: str, iterator: Iterator[Any], unit: str = 'items',
+              size: Optional[Callable[[Any], int]] = None,
+              extra: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """
+        Wraps a stage iterator so every value it produces is measured.
+        size returns the byte size of a value; extra is a dictionary the
+        stage fills with its own statistics, reported along with the rest.
+        """
+        record = StageMetrics(name, unit)
+        if extra is not None:
+            record.extra = extra
+        self.stages.append(record)
+        return self._measure(record, iterator, size)
+
+    @staticmethod
+    def _measure(record: StageMetrics, iterator: Iterator[Any], size: Optional[Callable[[Any], int]]) -> Iterator[Any]:
+        wall_clock = time.perf_counter
+        cpu_clock = time.process_time
+        iterator = iter(iterator)
+        while True:
+            wall_start = wall_clock()
+            cpu_start = cpu_clock()
+            try:
+                value = next(iterator)
+                if size is not None:
+                    record.bytes += size(value)
+            except StopIteration:
+                return
+            finally:
+                record.wall += wall_clock() - wall_start
+                record.cpu += cpu_clock() - cpu_start
+            record.count += 1
+            yield value
+
+    @contextmanager
+    def sink(self, name: str):
+        """
+        Times the stage that consumes the last iterator stage (e.g. writing
+        the output). Its count and bytes are those of the stage it consumes.
+        """
+        upstream = self.stages[-1] if self.stages else None
+        record = StageMetrics(name, upstream.unit if upstream else 'items')
+        self.stages.append(record)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall += time.perf_counter() - wall_start
+            record.cpu += time.process_time() - cpu_start
+            if upstream is not None:
+                record.count = upstream.count
+                record.bytes = upstream.bytes
+
+    def report(self) -> Dict[str, Any]:
+        """Builds the machine-readable report of all stages."""
+        stages = []
+        upstream_wall = upstream_cpu = 0.0
+        for record in self.stages:
+            wall = max(record.wall - upstream_wall, 0.0)
+            cpu = max(record.cpu - upstream_cpu, 0.0)
+            upstream_wall, upstream_cpu = record.wall, record.cpu
+            stages.append({
+                'stage': record.name,
+                'unit': record.unit,
+                'count': record.count,
+                'bytes': record.bytes,
+                'wall_seconds': round(wall, 6),
+                'cpu_seconds': round(cpu, 6),
+                'per_second': round(record.count / wall, 2) if wall > 0 else None,
+                'bytes_per_second': round(record.bytes / wall, 2) if wall > 0 else None,
+                **record.extra,
+            })
+        return {
+            'total_wall_seconds': round(time.perf_counter() - self._start_wall, 6),
+            'total_cpu_seconds': round(time.process_time() - self._start_cpu, 6),
+            'stages': stages,
+        }
+
+    def summary_lines(self) -> List[str]:
+        """Formats the report as one human-readable line per stage plus a total."""
+        report = self.report()
+        lines = []
+        for stage in report['stages']:
+            rate = f"{stage['per_second']:.1f} {stage['unit']}/s" if stage['per_second'] is not None else "-"
+            throughput = (f"{stage['bytes_per_second'] / 1e6:.2f} MB/s"
+                          if stage['bytes_per_second'] is not None else "-")
+            line = (f"{stage['stage']}: {stage['wall_seconds']:.3f}s wall, {stage['cpu_seconds']:.3f}s CPU, "
+                    f"{stage['count']} {stage['unit']}, {rate}, {throughput}")
+            if 'peak_buffer_chars' in stage:
+                line += f", peak buffer {stage['peak_buffer_chars']} chars"
+            if stage.get('buffer_overflows'):
+                overflows = ', '.join(f"{policy} {count}" for policy, count in sorted(stage['buffer_overflows'].items()))
+                line += f", buffer overflows ({overflows})"
+            lines.append(line)
+        lines.append(f"Total: {report['total_wall_seconds']:.3f}s wall, {report['total_cpu_seconds']:.3f}s CPU")
+        return lines
+
+    def write_json(self, path: str):
+        """Writes the report to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+def instrument(metrics: Optional[PipelineMetrics], name: str, iterator: Iterator[Any], unit: str = 'items',
+               size: Optional[Callable[[Any], int]] = None,
+               extra: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """Wraps a stage when metrics are enabled and returns it untouched otherwise."""
+    if metrics is None:
+        return iterator
+    return metrics.stage(name, iterator, unit, size, extra)
+
+@contextmanager
+def measure_sink(metrics: Optional[PipelineMetrics], name: str):
+    """Times the consuming stage when metrics are enabled."""
+    if metrics is None:
+        yield None
+    else:
+        with metrics.sink(name) as record:
+            yield record
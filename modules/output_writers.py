@@ -0,0 +1,174 @@
+import json
+from itertools import chain, islice
+from typing import Dict, Iterator, Any, List, Optional, Union
+
+from modules.csv_generator import save_to_csv
+from modules.items import Item, as_item
+
+# Output formats and the file extensions that select them. The first
+# extension is appended when the output path has none of them.
+FORMAT_EXTENSIONS = {
+    'csv': ('.csv',),
+    'jsonl': ('.jsonl', '.ndjson'),
+    'parquet': ('.parquet', '.pq'),
+    'arrow': ('.arrow', '.feather'),
+}
+OUTPUT_FORMATS = tuple(FORMAT_EXTENSIONS)
+
+# Rows per Parquet row group / Arrow record batch. Only one batch of items is
+# held in memory at a time.
+DEFAULT_BATCH_SIZE = 10000
+
+def resolve_output_format(output_path: str, output_format: Optional[str] = None) -> str:
+    """
+    Picks the output format from an explicit choice or the output extension.
+    Paths with an unknown extension are written as CSV.
+
+    Raises:
+        ValueError: If output_format is not one of OUTPUT_FORMATS.
+    """
+    if output_format is not None:
+        if output_format not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unknown output format '{output_format}'. Choose one of: {', '.join(OUTPUT_FORMATS)}")
+        return output_format
+
+    lower_path = output_path.lower()
+    for name, extensions in FORMAT_EXTENSIONS.items():
+        if lower_path.endswith(extensions):
+            return name
+    return 'csv'
+
+def _with_extension(output_path: str, output_format: str) -> str:
+    extensions = FORMAT_EXTENSIONS[output_format]
+    if not output_path.lower().endswith(extensions):
+        output_path += extensions[0]
+    return output_path
+
+def _structured_item(item: Union[Item, Dict[str, Any]]) -> Dict[str, Any]:
+    """Keeps the structured fields of an item, including its sub-items and dedup IDs."""
+    item = as_item(item)
+    structured = {
+        'number': item.number,
+        'title': item.title,
+        'body': item.body,
+        'explanation_items': [{'label': sub_item.label, 'text': sub_item.text}
+                              for sub_item in item.explanation_items],
+    }
+    if item.item_id is not None:
+        structured['item_id'] = item.item_id
+        structured['duplicate_of'] = item.duplicate_of
+    return structured
+
+def save_to_jsonl(data_iterator: Iterator[Dict[str, Any]], output_path: str):
+    """
+    Saves a stream of extracted items as JSON Lines, one item per line.
+    Unlike the CSV output, the explanation sub-items are kept as a nested list.
+
+    Args:
+        data_iterator: An iterator of structured item dictionaries.
+        output_path: The path to the output file.
+    """
+    output_path = _with_extension(output_path, 'jsonl')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for item in data_iterator:
+            f.write(json.dumps(_structured_item(item), ensure_ascii=False))
+            f.write('\n')
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow output require pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+def _arrow_schema(pa, with_ids: bool = False):
+    sub_item = pa.struct([('label', pa.string()), ('text', pa.string())])
+    fields = [
+        ('number', pa.string()),
+        ('title', pa.string()),
+        ('body', pa.string()),
+        ('explanation_items', pa.list_(sub_item)),
+    ]
+    if with_ids:
+        fields += [('item_id', pa.int64()), ('duplicate_of', pa.int64())]
+    return pa.schema(fields)
+
+def _item_batches(data_iterator: Iterator[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    items = (_structured_item(item) for item in data_iterator)
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def _first_batch(data_iterator: Iterator[Dict[str, Any]], batch_size: int):
+    """Returns the first batch (to pick the schema) and an iterator over all batches."""
+    batches = _item_batches(data_iterator, batch_size)
+    first = next(batches, [])
+    return first, chain([first] if first else [], batches)
+
+def save_to_parquet(data_iterator: Iterator[Dict[str, Any]], output_path: str,
+                    batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Saves a stream of extracted items to a Parquet file, one row group per
+    batch_size items. Requires pyarrow.
+
+    Args:
+        data_iterator: An iterator of structured item dictionaries.
+        output_path: The path to the output file.
+        batch_size: Number of items buffered per row group.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    pa = _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    output_path = _with_extension(output_path, 'parquet')
+    first, batches = _first_batch(data_iterator, batch_size)
+    schema = _arrow_schema(pa, with_ids=bool(first) and 'item_id' in first[0])
+    with pq.ParquetWriter(output_path, schema) as writer:
+        for batch in batches:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+def save_to_arrow(data_iterator: Iterator[Dict[str, Any]], output_path: str,
+                  batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Saves a stream of extracted items to an Arrow IPC (Feather v2) file, one
+    record batch per batch_size items. Requires pyarrow.
+
+    Args:
+        data_iterator: An iterator of structured item dictionaries.
+        output_path: The path to the output file.
+        batch_size: Number of items buffered per record batch.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    pa = _import_pyarrow()
+
+    output_path = _with_extension(output_path, 'arrow')
+    first, batches = _first_batch(data_iterator, batch_size)
+    schema = _arrow_schema(pa, with_ids=bool(first) and 'item_id' in first[0])
+    with pa.OSFile(output_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+
+_WRITERS = {
+    'csv': save_to_csv,
+    'jsonl': save_to_jsonl,
+    'parquet': save_to_parquet,
+    'arrow': save_to_arrow,
+}
+
+def save_items(data_iterator: Iterator[Dict[str, Any]], output_path: str, output_format: Optional[str] = None):
+    """
+    Saves a stream of extracted items in the requested format.
+
+    Args:
+        data_iterator: An iterator of structured item dictionaries.
+        output_path: The path to the output file.
+        output_format: One of OUTPUT_FORMATS. When None, the format is chosen
+                       from the output extension (CSV if unknown).
+    """
+    _WRITERS[resolve_output_format(output_path, output_format)](data_iterator, output_path)
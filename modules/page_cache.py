@@ -0,0 +1,192 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+# Cache file layout: the UTF-8 text of every page back to back, then
+# (page_count + 1) little-endian uint64 offsets into that data, then a footer
+# holding the page count and a magic marker. Pages are decoded straight from a
+# memory map, one at a time, so a hit never loads the whole document.
+CACHE_FORMAT_VERSION = 1
+CACHE_EXTENSION = '.pages'
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+
+_MAGIC = b'PDFPAGE1'
+_OFFSET = struct.Struct('<Q')
+_FOOTER = struct.Struct('<Q8s')
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+def default_cache_dir() -> str:
+    """Returns the default cache directory, honouring XDG_CACHE_HOME."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pdf_exam_parser', 'pages')
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class PageCache:
+    """
+    A size-bounded, least-recently-used cache of extracted page text.
+
+    Entries are keyed by the SHA-256 of the PDF content plus the extraction
+    options, so editing a PDF or changing how it is extracted never returns
+    stale text.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key_for(self, pdf_path: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Builds the cache key for a PDF and its extraction options."""
+        options_json = json.dumps({'format': CACHE_FORMAT_VERSION, **(options or {})}, sort_keys=True)
+        options_digest = hashlib.sha256(options_json.encode('utf-8')).hexdigest()[:16]
+        return f"{_file_digest(pdf_path)}-{options_digest}"
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_EXTENSION)
+
+    def read(self, key: str, page_numbers: Optional[Sequence[int]] = None) -> Optional[Iterator[str]]:
+        """
+        Returns an iterator over the cached pages, or None on a miss.
+        With page_numbers (0-based), only those pages are decoded, in the
+        order given. A hit marks the entry as recently used.
+
+        Raises:
+            IndexError: If a page number is outside the cached document.
+        """
+        path = self._path_for(key)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file, e.g. left behind by a crash
+            f.close()
+            self._discard(path)
+            return None
+
+        size = len(mapped)
+        valid = size >= _FOOTER.size
+        if valid:
+            page_count, magic = _FOOTER.unpack_from(mapped, size - _FOOTER.size)
+            index_start = size - _FOOTER.size - (page_count + 1) * _OFFSET.size
+            valid = magic == _MAGIC and index_start >= 0
+        if not valid:
+            mapped.close()
+            f.close()
+            self._discard(path)
+            return None
+
+        os.utime(path)
+        if page_numbers is not None:
+            for page_number in page_numbers:
+                if not 0 <= page_number < page_count:
+                    mapped.close()
+                    f.close()
+                    raise IndexError(f"Page {page_number + 1} is outside the cached document ({page_count} pages)")
+            return self._iter_selected_pages(f, mapped, page_numbers, index_start)
+        return self._iter_pages(f, mapped, page_count, index_start)
+
+    @staticmethod
+    def _iter_pages(f, mapped: mmap.mmap, page_count: int, index_start: int) -> Iterator[str]:
+        try:
+            start = _OFFSET.unpack_from(mapped, index_start)[0]
+            for page_number in range(1, page_count + 1):
+                end = _OFFSET.unpack_from(mapped, index_start + page_number * _OFFSET.size)[0]
+                yield mapped[start:end].decode('utf-8')
+                start = end
+        finally:
+            mapped.close()
+            f.close()
+
+    @staticmethod
+    def _iter_selected_pages(f, mapped: mmap.mmap, page_numbers: Sequence[int], index_start: int) -> Iterator[str]:
+        # The offset index gives random access to any page.
+        try:
+            for page_number in page_numbers:
+                start, end = struct.unpack_from('<2Q', mapped, index_start + page_number * _OFFSET.size)
+                yield mapped[start:end].decode('utf-8')
+        finally:
+            mapped.close()
+            f.close()
+
+    def write_through(self, key: str, pages: Iterator[str]) -> Iterator[str]:
+        """
+        Yields pages unchanged while storing them under key.
+        The entry is only committed once the iterator is fully consumed, so an
+        interrupted extraction never leaves a truncated entry behind.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        committed = False
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                offsets = [0]
+                for page_text in pages:
+                    data = page_text.encode('utf-8')
+                    f.write(data)
+                    offsets.append(offsets[-1] + len(data))
+                    yield page_text
+                for offset in offsets:
+                    f.write(_OFFSET.pack(offset))
+                f.write(_FOOTER.pack(len(offsets) - 1, _MAGIC))
+            os.replace(temp_path, self._path_for(key))
+            committed = True
+        finally:
+            if not committed:
+                self._discard(temp_path)
+
+        self.evict()
+
+    def get_or_extract(self, pdf_path: str, extract: Callable[[], Iterator[str]],
+                       options: Optional[Dict[str, Any]] = None,
+                       page_numbers: Optional[Sequence[int]] = None) -> Iterator[str]:
+        """
+        Streams pages from the cache, or from extract() on a miss while
+        filling the cache. With page_numbers, extract() must return just
+        those pages; a partial document is never stored.
+        """
+        key = self.key_for(pdf_path, options)
+        cached_pages = self.read(key, page_numbers)
+        if cached_pages is not None:
+            yield from cached_pages
+        elif page_numbers is not None:
+            yield from extract()
+        else:
+            yield from self.write_through(key, extract())
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(CACHE_EXTENSION):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._discard(os.path.join(self.cache_dir, name))
+            total -= size
+
+    @staticmethod
+    def _discard(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,95 @@
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Tuple
+
+# Shared-memory transport of page text from extraction workers to the
+# process running the analyzer. A PageRing is one shared memory block cut
+# into equally sized slots. Every task of a worker gets a free slot, writes
+# the UTF-8 text of its pages into it back to back and returns only the byte
+# lengths; the consumer decodes each page straight out of the slot and frees
+# the slot once all its pages were handed on. Page text is therefore encoded
+# once and decoded once, instead of being pickled, piped and unpickled.
+#
+# The number of slots bounds the work in flight: a task is only submitted
+# into a free slot, so an analyzer that falls behind stops the extractors
+# rather than letting extracted pages pile up. Pages that do not fit in the
+# rest of their slot travel inline in the task result, as before.
+
+DEFAULT_SLOT_BYTES = 1024 * 1024
+
+# Blocks attached by this (worker) process, by name.
+_ATTACHED: Dict[str, shared_memory.SharedMemory] = {}
+
+class PageRing:
+    """
+    A shared memory block of `slots` slots of `slot_size` bytes, owned by the
+    consumer process. Use it as a context manager, or call close() to free
+    the block.
+    """
+
+    def __init__(self, slots: int, slot_size: int = DEFAULT_SLOT_BYTES):
+        if slots < 1 or slot_size < 1:
+            raise ValueError("A page ring needs at least one slot of at least one byte")
+        self.slots = slots
+        self.slot_size = slot_size
+        self.memory = shared_memory.SharedMemory(create=True, size=slots * slot_size)
+        self.free = deque(range(slots))
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def acquire(self) -> int:
+        """Returns a free slot. Raises IndexError when every slot is in use."""
+        return self.free.popleft()
+
+    def release(self, slot: int):
+        self.free.append(slot)
+
+    def read_pages(self, slot: int, lengths: List[int]) -> Iterator[str]:
+        """Decodes the pages written into a slot, one at a time."""
+        buffer = self.memory.buf
+        start = slot * self.slot_size
+        for length in lengths:
+            yield str(buffer[start:start + length], 'utf-8')
+            start += length
+
+    def close(self):
+        if self.memory is not None:
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    memory = _ATTACHED.get(name)
+    if memory is None:
+        memory = shared_memory.SharedMemory(name=name)
+        _ATTACHED[name] = memory
+    return memory
+
+def write_pages(ring_name: str, slot: int, slot_size: int, pages: List[str]) -> Tuple[List[int], List[str]]:
+    """
+    Writes pages into a slot of a PageRing, in a worker process.
+
+    Returns:
+        (byte length of every page written to the slot, the pages that did
+        not fit). The overflow pages follow the written ones in page order.
+    """
+    buffer = _attach(ring_name).buf
+    position = slot * slot_size
+    end = position + slot_size
+    lengths = []
+    for index, page in enumerate(pages):
+        data = page.encode('utf-8')
+        if position + len(data) > end:
+            return lengths, pages[index:]
+        buffer[position:position + len(data)] = data
+        position += len(data)
+        lengths.append(len(data))
+    return lengths, []
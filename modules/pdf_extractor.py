@@ -1,25 +1,341 @@
-import fitz  # PyMuPDF
-from typing import Iterator
+import hashlib
+import random
+import re
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from modules.lazy_import import lazy_import
+from modules.page_cache import PageCache
 
-def extract_pages(pdf_path: str) -> Iterator[str]:
+fitz = lazy_import('fitz')  # PyMuPDF, loaded on first use
+
+DEFAULT_CHUNK_SIZE = 16
+EXTRACTION_MODES = ('text', 'layout')
+# How worker processes hand extracted pages back (see modules.page_transport).
+TRANSPORTS = ('shm', 'pickle')
+# Outline titles that mark the start of the answer/explanation section, most
+# specific first: a generic word like '해설' also names concept chapters
+# ('01 개념 해설'), so it is only used when no specific title is found.
+ANSWER_SECTION_KEYWORDS = ('정답과 해설', '정답 및 해설', '정답', '해설', 'answer', 'solution')
+
+def _page_text(page: "fitz.Page", page_number: int, mode: str) -> str:
+    if mode == 'layout':
+        # Imported here so plain-text extraction does not load the analyzer.
+        from modules.layout_extractor import page_lines, lines_to_text
+        return lines_to_text(page_lines(page, page_number))
+    return page.get_text()
+
+def _extract_page_list(pdf_path: str, page_numbers: List[int], mode: str = 'text') -> List[str]:
+    """
+    Extracts the text of the given pages in a worker process.
+    Each worker opens its own document, since fitz documents cannot be shared
+    across processes.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        return [_page_text(doc.load_page(page_number), page_number, mode) for page_number in page_numbers]
+    finally:
+        doc.close()
+
+def _extract_page_list_to_ring(pdf_path: str, page_numbers: List[int], mode: str,
+                               ring_name: str, slot: int, slot_size: int) -> Tuple[List[int], List[str]]:
+    """Extracts the given pages in a worker process and writes them into a PageRing slot."""
+    from modules.page_transport import write_pages
+    return write_pages(ring_name, slot, slot_size, _extract_page_list(pdf_path, page_numbers, mode))
+
+def _extract_pages_parallel(pdf_path: str, workers: int, chunk_size: int, mode: str = 'text',
+                            pages: Optional[Sequence[int]] = None, transport: str = 'shm') -> Iterator[str]:
+    """
+    Extracts pages with a pool of worker processes, yielding them in page order
+    (or in the order of pages, when given).
+    At most two chunks per worker are in flight, so memory stays bounded
+    regardless of the document size. With the 'shm' transport the chunks
+    come back through the slots of a shared memory PageRing, and a chunk is
+    only submitted once the consumer has freed a slot.
+    """
+    if pages is None:
+        pages = range(get_page_count(pdf_path))
+
+    # Imported here so single-process runs do not load multiprocessing.
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = (list(pages[start:start + chunk_size]) for start in range(0, len(pages), chunk_size))
+    window = workers * 2
+
+    if transport == 'shm':
+        from modules.page_transport import PageRing
+        ring = PageRing(window)
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = deque()
+            for chunk in chunks:
+                if not ring.free:
+                    yield from _drain_slot(ring, *pending.popleft())
+                slot = ring.acquire()
+                pending.append((slot, executor.submit(_extract_page_list_to_ring, pdf_path, chunk, mode,
+                                                      ring.name, slot, ring.slot_size)))
+            while pending:
+                yield from _drain_slot(ring, *pending.popleft())
+        finally:
+            # The workers must be done writing before the block is freed.
+            executor.shutdown(wait=True, cancel_futures=True)
+            ring.close()
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_extract_page_list, pdf_path, chunk, mode))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _drain_slot(ring, slot: int, future) -> Iterator[str]:
+    """Yields the pages of a finished task from its slot, then frees the slot."""
+    lengths, overflow = future.result()
+    yield from ring.read_pages(slot, lengths)
+    yield from overflow
+    ring.release(slot)
+
+def pymupdf_version() -> str:
+    """
+    Returns the installed PyMuPDF version (fitz.VersionBind), read from the
+    package metadata when possible, so a page cache hit does not have to
+    import PyMuPDF just to build its key.
+    """
+    # Imported here so only a run that builds a cache key loads the metadata machinery.
+    from importlib import metadata
+    try:
+        return metadata.version('pymupdf')
+    except metadata.PackageNotFoundError:
+        return fitz.VersionBind
+
+def extract_pages(pdf_path: str, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  cache_dir: Optional[str] = None, mode: str = 'text',
+                  pages: Optional[Sequence[int]] = None, transport: str = 'shm') -> Iterator[str]:
     """
     Extracts text from a given PDF file, page by page.
 
     Args:
         pdf_path: The path to the PDF file.
+        workers: Number of worker processes. With more than one worker, pages
+                 are extracted in parallel and still yielded in page order.
+        chunk_size: Number of consecutive pages each worker extracts per task.
+        cache_dir: Optional directory of the page text cache. On a hit the
+                   pages are streamed from the cache without opening the PDF.
+        mode: 'text' (default) returns PyMuPDF's plain text. 'layout' reads
+              the text lines with their positions, so two-column pages come
+              out column by column (see modules.layout_extractor).
+        pages: Optional 0-based page numbers to extract, in the order given
+               (see parse_page_ranges and sample_pages). The pages are loaded
+               directly, so the others cost nothing. A partial extraction is
+               served from a cached document but never fills the cache.
+        transport: How workers return pages: 'shm' (default) writes them
+                   into a bounded shared memory ring that this process
+                   decodes them from, 'pickle' sends them in the task results.
 
     Yields:
         The text content of each page as a string.
+
+    Raises:
+        ValueError: If the mode or transport is unknown.
     """
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode '{mode}'; expected one of {', '.join(EXTRACTION_MODES)}")
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown page transport '{transport}'; expected one of {', '.join(TRANSPORTS)}")
+
+    if cache_dir is not None:
+        cache = PageCache(cache_dir)
+        options = {'mode': mode, 'pymupdf': pymupdf_version()}
+        yield from cache.get_or_extract(pdf_path, lambda: extract_pages(pdf_path, workers, chunk_size, mode=mode,
+                                                                        pages=pages, transport=transport),
+                                        options, page_numbers=pages)
+        return
+
+    if workers > 1:
+        yield from _extract_pages_parallel(pdf_path, workers, chunk_size, mode, pages, transport)
+        return
+
+    if pages is not None:
+        yield from extract_selected_pages(pdf_path, pages, mode)
+        return
+
     try:
         doc = fitz.open(pdf_path)
-        for page in doc:
-            yield page.get_text()
+        for page_number, page in enumerate(doc):
+            yield page.get_text() if mode == 'text' else _page_text(page, page_number, mode)
     except Exception as e:
         # In case of an error, we'll log it (in the main script)
         # and yield nothing, resulting in an empty generator.
         raise e
 
+def extract_selected_pages(pdf_path: str, page_numbers: Iterable[int], mode: str = 'text') -> Iterator[str]:
+    """
+    Extracts the text of specific pages (0-based), in the order given.
+    Pages are pulled lazily, so a consumer that stops early never pays for
+    the remaining pages.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        for page_number in page_numbers:
+            yield _page_text(doc.load_page(page_number), page_number, mode)
+    finally:
+        doc.close()
+
+def get_page_count(pdf_path: str) -> int:
+    """Returns the number of pages of a PDF without extracting any text."""
+    doc = fitz.open(pdf_path)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+def parse_page_ranges(spec: str, page_count: int) -> List[int]:
+    """
+    Parses a page selection such as '120-340' or '1-10,55,300-' into 0-based
+    page numbers.
+
+    Pages are 1-based and ranges inclusive, as printed in a PDF viewer. An
+    open range ('300-' or '-10') runs to the last or from the first page.
+    Overlapping ranges are merged and the pages are returned in document
+    order, so items spanning consecutive pages stay intact.
+
+    Raises:
+        ValueError: If the selection is malformed or outside the document.
+    """
+    selected = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition('-')
+        try:
+            start = int(first) if first.strip() else 1
+            stop = (int(last) if last.strip() else page_count) if dash else start
+        except ValueError:
+            raise ValueError(f"Invalid page range '{part}' in '{spec}'") from None
+        if start < 1 or stop < start:
+            raise ValueError(f"Invalid page range '{part}' in '{spec}'")
+        if stop > page_count:
+            raise ValueError(f"Page range '{part}' is outside the document ({page_count} pages)")
+        selected.update(range(start - 1, stop))
+    if not selected:
+        raise ValueError(f"Page selection '{spec}' contains no pages")
+    return sorted(selected)
+
+def sample_pages(pages: Sequence[int], sample_size: int, seed: int = 0) -> List[int]:
+    """
+    Picks sample_size pages at random from pages, in document order. The
+    seed makes the sample reproducible, so a config can be re-checked on the
+    same pages after every change.
+    """
+    if sample_size < 1:
+        raise ValueError("The sample size must be at least 1")
+    if sample_size >= len(pages):
+        return list(pages)
+    return sorted(random.Random(seed).sample(list(pages), sample_size))
+
+def find_answer_section(pdf_path: str, keywords: Sequence[str] = ANSWER_SECTION_KEYWORDS) -> Optional[int]:
+    """
+    Looks up where the answer/explanation section starts in the PDF outline
+    (table of contents), without extracting any page text.
+
+    The keywords are tried in order, each against the whole outline, so a
+    later entry with a more specific title wins over an earlier one with a
+    generic word.
+
+    Returns:
+        The 0-based page of the first outline entry whose title contains the
+        first keyword any entry contains, or None if the PDF has no such entry.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        toc = doc.get_toc(simple=True)
+    finally:
+        doc.close()
+
+    entries = [(' '.join(title.split()).casefold(), page) for _, title, page in toc if page >= 1]
+    for keyword in keywords:
+        keyword = keyword.casefold()
+        for title, page in entries:
+            if keyword in title:
+                return page - 1
+    return None
+
+# An indirect reference in PDF object source, e.g. '12 0 R', optionally
+# after a /Parent or /P key. Those point back up the page tree or to the
+# owning page and are not part of what the page shows.
+_REFERENCE = re.compile(r'(/(?:Parent|P)\s*)?\b(\d+) (\d+) R\b')
+
+def _object_digest(doc: "fitz.Document", xref: int, memo: dict, active: set) -> str:
+    """
+    Hashes a PDF object together with everything it references: each
+    reference in its source is replaced by the digest of the referenced
+    object, and a stream's raw bytes are included. The digest therefore does
+    not depend on object numbers, which change whenever a PDF is re-saved.
+    """
+    if xref in memo:
+        return memo[xref]
+    if xref in active or not 0 < xref < doc.xref_length():
+        return 'ref'  # a reference cycle or a dangling reference
+    active.add(xref)
+
+    def resolve(match) -> str:
+        if match.group(1):
+            return match.group(1) + 'ref'
+        return _object_digest(doc, int(match.group(2)), memo, active)
+
+    digest = hashlib.sha256(_REFERENCE.sub(resolve, doc.xref_object(xref, compressed=True)).encode('utf-8'))
+    if doc.xref_is_stream(xref):
+        digest.update(doc.xref_stream_raw(xref) or b'')
+    active.discard(xref)
+    memo[xref] = digest.hexdigest()[:32]
+    return memo[xref]
+
+def _inherited_resources(doc: "fitz.Document", page_xref: int) -> str:
+    """Returns the source of the Resources a page inherits from the page tree ('' if none)."""
+    xref, seen = page_xref, set()
+    while xref not in seen:
+        seen.add(xref)
+        kind, value = doc.xref_get_key(xref, 'Resources')
+        if kind != 'null':
+            return value
+        kind, value = doc.xref_get_key(xref, 'Parent')
+        if kind != 'xref':
+            break
+        xref = int(value.split()[0])
+    return ''
+
+def page_fingerprints(pdf_path: str) -> List[str]:
+    """
+    Returns a fingerprint per page, computed without extracting any text.
+    It is used to tell which pages changed between two versions of a PDF.
+
+    The fingerprint covers the page object with everything it references,
+    resolved recursively: the content streams, and the fonts, images and
+    Form XObjects of its resources (see _object_digest), including
+    resources inherited from the page tree, and the page size.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        memo: dict = {}
+        fingerprints = []
+        for page in doc:
+            digest = hashlib.sha256(_object_digest(doc, page.xref, memo, set()).encode('ascii'))
+            if doc.xref_get_key(page.xref, 'Resources')[0] == 'null':
+                resources = _inherited_resources(doc, page.xref)
+                digest.update(_REFERENCE.sub(
+                    lambda match: _object_digest(doc, int(match.group(2)), memo, set()), resources).encode('utf-8'))
+            digest.update(repr(tuple(page.rect)).encode('ascii'))
+            fingerprints.append(digest.hexdigest()[:32])
+        return fingerprints
+    finally:
+        doc.close()
+
 if __name__ == '__main__':
     # This is for testing purposes.
     # Create a dummy PDF for testing or use an existing one.
@@ -28,4 +344,4 @@ if __name__ == '__main__':
     # Example usage (requires a sample.pdf file):
     # sample_text = extract_text('path/to/your/sample.pdf')
     # if sample_text:
-    #     print("Successfully extracted text.") 
\ No newline at end of file
+    #     print("Successfully extracted text.")
@@ -0,0 +1,245 @@
+import re
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants, _compiler as sre_compile
+except ImportError:  # Python < 3.11
+    import sre_parse, sre_constants, sre_compile
+
+# Cheap checks derived from a compiled pattern that rule out text the pattern
+# cannot match, so the regex engine only runs where a match is possible.
+# Everything here is a necessary condition read off the parsed pattern, so
+# results are the same as running the pattern directly:
+#
+# - LiteralPrefilter: the literal strings every match must contain (also
+#   inside lookarounds). Text missing one of them is skipped with str.find
+#   speed instead of a regex scan.
+# - AnchoredScanner: for a pattern of the shape ^<atom>...(?=<terminator>),
+#   like the 'stream' pattern, matches are only attempted at line starts
+#   where <atom> matches (found with \n(?=<atom>)), and never after the last
+#   place the terminator can match. Without the bound, finditer retries the
+#   unterminated last item at every possible split of its lines, which is
+#   quadratic in its length. When the terminator cannot run on past a newline
+#   after its first character, it is also the line_probe: a stream reader
+#   only has to rescan once it matches in the text from the last line start
+#   through a new page.
+#
+# Character classes are not used as prefilters: scanning for [ㄱ-ㅎ] costs
+# more than the regex search it would save, which already skips ahead to
+# its literal prefix.
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+            getattr(sre_constants, 'POSSESSIVE_REPEAT', None))
+_ATOMS = (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.IN, sre_constants.ANY)
+_GROUP_REFS = (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS)
+
+def _plain_group(av) -> bool:
+    """True for a (capturing or not) group that does not change flags."""
+    return len(av) < 4 or (not av[1] and not av[2])
+
+def _compile(parsed, nodes, flags: int) -> re.Pattern:
+    """Compiles a list of parsed nodes as a standalone pattern."""
+    return sre_compile.compile(sre_parse.SubPattern(parsed.state, list(nodes)), flags)
+
+def _required_literals(items, literals: List[str]):
+    """Collects the literal runs that every match of a node sequence contains."""
+    run = []
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            literals.append(''.join(run))
+            run = []
+        if op == sre_constants.SUBPATTERN and _plain_group(av):
+            _required_literals(av[-1], literals)
+        elif op in _REPEATS and op is not None and av[0] >= 1:
+            _required_literals(av[2], literals)
+        elif op == getattr(sre_constants, 'ATOMIC_GROUP', None):
+            _required_literals(av, literals)
+        elif op == sre_constants.ASSERT:
+            # Lookarounds look at the same string, so their text must be in it.
+            _required_literals(av[1], literals)
+    if run:
+        literals.append(''.join(run))
+
+def _subpatterns(value) -> Iterator:
+    if isinstance(value, sre_parse.SubPattern):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _subpatterns(item)
+
+def _mentions(items, ops) -> bool:
+    """True if any node of a parsed sequence, at any depth, is one of ops."""
+    return any(op in ops or any(_mentions(child, ops) for child in _subpatterns(av)) for op, av in items)
+
+class LiteralPrefilter:
+    """Rejects text that lacks one of the literals every match contains."""
+    __slots__ = ('literals',)
+
+    def __init__(self, literals: Tuple[str, ...]):
+        self.literals = literals
+
+    def may_match(self, text: str) -> bool:
+        for literal in self.literals:
+            if literal not in text:
+                return False
+        return True
+
+    def __repr__(self):
+        return f"LiteralPrefilter({self.literals!r})"
+
+def literal_prefilter(pattern: re.Pattern) -> Optional[LiteralPrefilter]:
+    """
+    Derives the literal prefilter of a compiled pattern.
+
+    Returns:
+        A LiteralPrefilter, or None if no literal is required or the pattern
+        is case-insensitive.
+    """
+    if pattern.flags & (re.IGNORECASE | re.LOCALE):
+        return None
+    parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    literals: List[str] = []
+    _required_literals(parsed, literals)
+    # Longer literals are rarer; a shorter one contained in a longer one adds nothing.
+    unique = sorted(set(literals), key=lambda literal: (-len(literal), literal))
+    kept = [literal for index, literal in enumerate(unique) if not any(literal in longer for longer in unique[:index])]
+    return LiteralPrefilter(tuple(kept)) if kept else None
+
+def _newline_free(parsed, items, flags: int) -> bool:
+    """True if no node of a parsed sequence can match a newline; False when unsure."""
+    for op, av in items:
+        if op in _ATOMS:
+            if _compile(parsed, [(op, av)], flags).match('\n'):
+                return False
+        elif op == sre_constants.SUBPATTERN and _plain_group(av):
+            if not _newline_free(parsed, av[-1], flags):
+                return False
+        elif op in _REPEATS and op is not None:
+            if not _newline_free(parsed, av[2], flags):
+                return False
+        elif op == sre_constants.BRANCH:
+            if not all(_newline_free(parsed, branch, flags) for branch in av[1]):
+                return False
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if not _newline_free(parsed, av[1], flags):
+                return False
+        elif op != sre_constants.AT:
+            return False
+    return True
+
+def _first_atom(items):
+    """Returns the first node of a sequence if it is a mandatory one-character atom, reached through groups and repeats."""
+    if not items:
+        return None
+    op, av = items[0]
+    if op in _ATOMS:
+        return op, av
+    if op == sre_constants.SUBPATTERN and _plain_group(av):
+        return _first_atom(av[-1])
+    if op in _REPEATS and op is not None and av[0] >= 1:
+        return _first_atom(av[2])
+    return None
+
+class AnchoredScanner:
+    """
+    Runs a ^-anchored MULTILINE pattern only at the line starts where it can
+    match. finditer() yields the same matches as pattern.finditer(), also
+    when searching from a position.
+
+    Attributes:
+        pattern: The wrapped compiled pattern.
+        first: Pattern of the first character a match must start with.
+        head: Pattern finding a newline followed by that character.
+        terminator: The pattern of the trailing lookahead, or None.
+        line_probe: The terminator if none of its matches can go on past a
+                    newline other than its first character, else None. Appending
+                    text then only completes a new match where line_probe
+                    matches from the last line start before the new text on.
+    """
+    __slots__ = ('pattern', 'first', 'head', 'terminator', 'line_probe')
+
+    def __init__(self, pattern: re.Pattern, first: re.Pattern, head: re.Pattern, terminator: Optional[re.Pattern],
+                 line_probe: Optional[re.Pattern] = None):
+        self.pattern = pattern
+        self.first = first
+        self.head = head
+        self.terminator = terminator
+        self.line_probe = line_probe
+
+    def _candidates(self, string: str, pos: int = 0) -> Iterator[int]:
+        if pos == 0 and self.first.match(string):
+            yield 0
+        # A literal newline lets the engine skip ahead between line starts,
+        # which a bare ^ does not.
+        for head in self.head.finditer(string, max(pos - 1, 0)):
+            yield head.start() + 1
+
+    def next_start(self, string: str, pos: int = 0) -> Optional[int]:
+        """Returns the first line start at or after pos where a match can begin, or None."""
+        return next(self._candidates(string, pos), None)
+
+    def finditer(self, string: str, pos: int = 0) -> Iterator[re.Match]:
+        match_at = self.pattern.match
+        terminator = self.terminator
+        # Start of a terminator at or after the current candidate, once known.
+        next_terminator = -1
+        position = pos
+        for start in self._candidates(string):
+            if start < position:
+                continue
+            if terminator is not None and next_terminator < start:
+                found = terminator.search(string, start)
+                if found is None:
+                    # Every match ends where the terminator matches.
+                    return
+                next_terminator = found.start()
+            # match() at a position sees the whole string, so ^ and
+            # lookbehinds behave as they do inside finditer.
+            match = match_at(string, start)
+            if match is not None:
+                yield match
+                position = match.end()
+
+    def __repr__(self):
+        return f"AnchoredScanner({self.pattern.pattern!r})"
+
+def anchored_scanner(pattern: re.Pattern) -> Optional[AnchoredScanner]:
+    """
+    Builds an AnchoredScanner for a MULTILINE pattern that starts with ^
+    followed by a mandatory character, e.g. ^(?P<number>\\d+)...
+
+    Returns:
+        The scanner, or None if the pattern does not have that shape.
+    """
+    parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    flags = parsed.state.flags
+    if not flags & re.MULTILINE or len(parsed) < 2 or parsed[0] != (sre_constants.AT, sre_constants.AT_BEGINNING):
+        return None
+    atom = _first_atom(parsed[1:])
+    if atom is None:
+        return None
+    first = _compile(parsed, [atom], flags)
+    # The atom is a lookahead, so head matches never overlap the next line
+    # start, even when the atom itself can match a newline.
+    lookahead = (sre_constants.ASSERT, (1, sre_parse.SubPattern(parsed.state, [atom])))
+    head = _compile(parsed, [(sre_constants.LITERAL, ord('\n')), lookahead], flags)
+
+    terminator = line_probe = None
+    op, av = parsed[-1]
+    # A terminator that can match empty text, like (?=...|\Z), holds at the
+    # end of every buffer and bounds nothing.
+    if (op == sre_constants.ASSERT and av[0] == 1 and av[1].getwidth()[0] > 0
+            and not _mentions(av[1], _GROUP_REFS)):
+        terminator = _compile(parsed, av[1], flags)
+        rest = list(av[1])
+        if rest[0] == (sre_constants.LITERAL, ord('\n')):
+            rest = rest[1:]
+        # A newline matched by a final one-character atom ends the match.
+        if rest and rest[-1][0] in _ATOMS:
+            rest = rest[:-1]
+        if _newline_free(parsed, rest, flags):
+            line_probe = terminator
+    return AnchoredScanner(pattern, first, head, terminator, line_probe)
@@ -0,0 +1,207 @@
+import re
+from typing import Dict, List, FrozenSet, Tuple
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse, sre_constants
+
+# Static checks for regexes whose backtracking can blow up on text that
+# almost matches:
+#
+# - exponential: an unbounded repeat whose body is essentially another
+#   unbounded repeat, e.g. (\w+)+ or (\w+\s?)*, or whose body is an
+#   alternation with overlapping branches, e.g. (\w|\d\w)+.
+# - polynomial: two unbounded repeats that can match the same letters or
+#   digits with nothing mandatory in between, e.g. \d+\d+ or .*.*. Overlaps
+#   on whitespace and punctuation only (like \s+.*?) are not reported, since
+#   such runs are short in real text.
+#
+# Character sets are compared on a sample alphabet of representative
+# characters plus every literal in the pattern, which is exact for the
+# literal-heavy patterns of exam layouts and a close approximation otherwise.
+
+_SAMPLE_CHARS = 'aZé_05 \t\n\r.,;:()[]-+*/\'"가힣ㄱㅎ① \x00'
+_TEXT_CHARS = frozenset(ch for ch in _SAMPLE_CHARS if ch.isalnum() or ch == '_')
+
+_CATEGORY_TESTS = {
+    sre_constants.CATEGORY_DIGIT: re.compile(r'\d').match,
+    sre_constants.CATEGORY_NOT_DIGIT: re.compile(r'\D').match,
+    sre_constants.CATEGORY_SPACE: re.compile(r'\s').match,
+    sre_constants.CATEGORY_NOT_SPACE: re.compile(r'\S').match,
+    sre_constants.CATEGORY_WORD: re.compile(r'\w').match,
+    sre_constants.CATEGORY_NOT_WORD: re.compile(r'\W').match,
+    sre_constants.CATEGORY_LINEBREAK: lambda ch: ch == '\n',
+    sre_constants.CATEGORY_NOT_LINEBREAK: lambda ch: ch != '\n',
+}
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_ZERO_WIDTH = (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+
+class _Info:
+    """What a pattern node can match: first characters, all characters, empty string."""
+    __slots__ = ('first', 'chars', 'nullable')
+
+    def __init__(self, first: FrozenSet[str], chars: FrozenSet[str], nullable: bool):
+        self.first = first
+        self.chars = chars
+        self.nullable = nullable
+
+class _Linter:
+    def __init__(self, alphabet: FrozenSet[str], dotall: bool):
+        self.alphabet = alphabet
+        self.dotall = dotall
+        self.issues: List[Dict[str, str]] = []
+        # Node analyses by node identity, so nested groups are analyzed once.
+        self._infos: Dict[Tuple[int, int], _Info] = {}
+
+    def _report(self, severity: str, message: str):
+        issue = {'severity': severity, 'message': message}
+        if issue not in self.issues:
+            self.issues.append(issue)
+
+    def _class_chars(self, items) -> FrozenSet[str]:
+        negate = False
+        tests = []
+        for op, av in items:
+            if op == sre_constants.NEGATE:
+                negate = True
+            elif op == sre_constants.LITERAL:
+                tests.append(lambda ch, code=av: ord(ch) == code)
+            elif op == sre_constants.RANGE:
+                tests.append(lambda ch, low=av[0], high=av[1]: low <= ord(ch) <= high)
+            elif op == sre_constants.CATEGORY:
+                tests.append(lambda ch, test=_CATEGORY_TESTS.get(av, lambda ch: True): bool(test(ch)))
+            else:  # e.g. a character set bitmap: assume it can match anything
+                tests.append(lambda ch: True)
+        return frozenset(ch for ch in self.alphabet if any(test(ch) for test in tests) != negate)
+
+    def sequence(self, items) -> _Info:
+        """Analyzes a sequence of nodes and checks it for adjacent overlapping repeats."""
+        infos = [self.node(op, av) for op, av in items]
+        self._check_adjacent_repeats(items)
+
+        first = set()
+        chars = set()
+        nullable = True
+        for info in infos:
+            if nullable:
+                first |= info.first
+            chars |= info.chars
+            nullable = nullable and info.nullable
+        return _Info(frozenset(first), frozenset(chars), nullable)
+
+    def node(self, op, av) -> _Info:
+        key = (id(op), id(av))
+        info = self._infos.get(key)
+        if info is None:
+            info = self._infos[key] = self._analyze(op, av)
+        return info
+
+    def _analyze(self, op, av) -> _Info:
+        if op == sre_constants.LITERAL:
+            chars = frozenset([chr(av)])
+            return _Info(chars, chars, False)
+        if op == sre_constants.NOT_LITERAL:
+            chars = frozenset(ch for ch in self.alphabet if ord(ch) != av)
+            return _Info(chars, chars, False)
+        if op == sre_constants.ANY:
+            chars = frozenset(ch for ch in self.alphabet if self.dotall or ch != '\n')
+            return _Info(chars, chars, False)
+        if op == sre_constants.IN:
+            chars = self._class_chars(av)
+            return _Info(chars, chars, False)
+        if op == sre_constants.SUBPATTERN:
+            return self.sequence(av[-1])
+        if op == sre_constants.BRANCH:
+            infos = [self.sequence(branch) for branch in av[1]]
+            return _Info(frozenset().union(*(i.first for i in infos)),
+                         frozenset().union(*(i.chars for i in infos)),
+                         any(i.nullable for i in infos))
+        if op in _REPEATS:
+            low, high, body = av
+            info = self.sequence(body)
+            if high == sre_constants.MAXREPEAT:
+                self._check_nested_repeat(body)
+            return _Info(info.first, info.chars, low == 0 or info.nullable)
+        if op in _ZERO_WIDTH:
+            if op != sre_constants.AT:
+                self.sequence(av[1])
+            return _Info(frozenset(), frozenset(), True)
+        if op == getattr(sre_constants, 'POSSESSIVE_REPEAT', None):
+            # Possessive repeats never give back characters.
+            info = self.sequence(av[2])
+            return _Info(info.first, info.chars, av[0] == 0 or info.nullable)
+        if op == getattr(sre_constants, 'ATOMIC_GROUP', None):
+            return self.sequence(av)
+        # Backreferences, conditionals: may match anything, including nothing.
+        return _Info(self.alphabet, self.alphabet, True)
+
+    @staticmethod
+    def _flatten(items) -> List[Tuple]:
+        """Inlines plain groups, so (a+) and a+ look the same to the checks."""
+        flat = []
+        for op, av in items:
+            if op == sre_constants.SUBPATTERN:
+                flat.extend(_Linter._flatten(av[-1]))
+            else:
+                flat.append((op, av))
+        return flat
+
+    @staticmethod
+    def _is_unbounded_repeat(op, av) -> bool:
+        return op in _REPEATS and av[1] == sre_constants.MAXREPEAT
+
+    def _check_nested_repeat(self, body):
+        """Checks the body of an unbounded repeat for ways to split one run of text into iterations."""
+        items = self._flatten(body)
+        infos = [self.node(op, av) for op, av in items]
+        for index, (op, av) in enumerate(items):
+            if not all(info.nullable for other, info in enumerate(infos) if other != index):
+                continue
+            if self._is_unbounded_repeat(op, av):
+                self._report('exponential', "nested unbounded quantifiers, e.g. (x+)+, can backtrack exponentially")
+            elif op == sre_constants.BRANCH:
+                branches = av[1]
+                firsts = [self.sequence(branch).first for branch in branches]
+                if any(firsts[i] & firsts[j] for i in range(len(firsts)) for j in range(i + 1, len(firsts))):
+                    self._report('exponential', "a repeated alternation with overlapping branches, "
+                                                "e.g. (\\w|\\d\\w)+, can backtrack exponentially")
+                for branch in branches:
+                    self._check_nested_repeat(branch)
+
+    def _check_adjacent_repeats(self, items):
+        """Compares every unbounded repeat with those before it that nothing mandatory separates it from."""
+        items = self._flatten(items)
+        infos = [self.node(op, av) for op, av in items]
+        open_repeats: List[_Info] = []
+        for (op, av), info in zip(items, infos):
+            if self._is_unbounded_repeat(op, av):
+                if any(previous.chars & info.chars & _TEXT_CHARS for previous in open_repeats):
+                    self._report('polynomial', "adjacent unbounded quantifiers matching the same text, "
+                                               "e.g. \\d+\\d+ or .*.*, can backtrack polynomially")
+                # A repeat that must match something separates the ones before it.
+                open_repeats = open_repeats + [info] if info.nullable else [info]
+            elif not info.nullable:
+                open_repeats = []
+
+def lint_pattern(pattern: str, flags: int = 0) -> List[Dict[str, str]]:
+    """
+    Looks for constructs with catastrophic backtracking risk.
+
+    Args:
+        pattern: The regular expression source.
+        flags: The re flags it is compiled with (DOTALL matters).
+
+    Returns:
+        A list of issues, each a dictionary with 'severity' ('exponential'
+        or 'polynomial') and 'message'. Empty when nothing risky was found.
+
+    Raises:
+        re.error: If the pattern does not parse.
+    """
+    parsed = sre_parse.parse(pattern, flags)
+    literals = {ch for ch in pattern if not ch.isspace()}
+    linter = _Linter(frozenset(_SAMPLE_CHARS) | frozenset(literals), bool(parsed.state.flags & re.DOTALL))
+    linter.sequence(parsed)
+    return linter.issues
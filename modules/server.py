@@ -0,0 +1,365 @@
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Any, Optional, Tuple
+
+import yaml
+
+from modules.pdf_extractor import extract_pages
+from modules.text_analyzer import analyze_text
+from modules.text_preprocessor import clean_text
+from modules.config_loader import load_config, PatternSet
+
+# Jobs and replies are JSON objects, one per line. A job is
+#   {"pdf_path": "...", "preprocess": false, "config": "optional/custom.yaml"}
+# and the reply is a stream of
+#   {"type": "item", "item": {...}}      one per item, as soon as it is found
+#   {"type": "done", "items": N, "seconds": S}
+# or, instead of "done", {"type": "error", "error": "..."}.
+#
+# Each worker process imports fitz and the pipeline once and then runs one job
+# at a time, sending items over a pipe. The server only reads the next item
+# from the pipe after the previous one was written to the client, so a slow
+# client fills the pipe and blocks the worker instead of buffering items.
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 16
+DEFAULT_JOB_TIMEOUT = 300.0
+DEFAULT_HTTP_PORT = 8765
+# Custom config files kept compiled, least recently used first out.
+MAX_CACHED_CONFIGS = 16
+
+class ServiceBusy(Exception):
+    """Raised when the job queue is full."""
+
+class JobTimeout(Exception):
+    """Raised when a job runs longer than the job timeout."""
+
+def _worker_main(conn, cache_dir: Optional[str]):
+    """Worker process loop: runs jobs received on conn until it gets None."""
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        pdf_path, config, preprocess = job
+        count = 0
+        try:
+            page_stream = extract_pages(pdf_path, cache_dir=cache_dir)
+            if preprocess:
+                page_stream = (clean_text(page, config) for page in page_stream)
+            for item in analyze_text(page_stream, config):
+                conn.send(('item', item.as_dict()))
+                count += 1
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+        else:
+            conn.send(('done', count))
+
+class _Worker:
+    """A warm worker process and the server end of its pipe."""
+
+    def __init__(self, context, cache_dir: Optional[str]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, cache_dir), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, timeout: float = 5.0):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+class ExtractionService:
+    """
+    Runs extraction jobs on a fixed set of warm worker processes.
+
+    At most `workers` jobs run at the same time and up to `max_pending` more
+    wait for a free worker; further jobs are rejected with ServiceBusy. A job
+    that runs longer than job_timeout seconds, or whose client goes away, has
+    its worker killed and replaced.
+    """
+
+    def __init__(self, config_path: Optional[str] = None, workers: int = DEFAULT_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING, job_timeout: float = DEFAULT_JOB_TIMEOUT,
+                 cache_dir: Optional[str] = None):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_pending < 0:
+            raise ValueError("max_pending must not be negative")
+
+        self.config_path = config_path
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.cache_dir = cache_dir
+        self._context = multiprocessing.get_context('spawn')
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._idle: 'queue.Queue[_Worker]' = queue.Queue()
+        self._all_workers = []
+        # Path -> (mtime, compiled config) of the configs used recently.
+        self._configs: 'OrderedDict[Optional[str], Tuple[float, PatternSet]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._active = 0
+
+        # Fail on a broken default config before any worker is started.
+        self.config_for(None)
+        for _ in range(workers):
+            self._add_worker()
+
+    def _add_worker(self):
+        worker = _Worker(self._context, self.cache_dir)
+        with self._lock:
+            self._all_workers.append(worker)
+        self._idle.put(worker)
+
+    def _replace_worker(self, worker: _Worker):
+        worker.kill()
+        with self._lock:
+            self._all_workers.remove(worker)
+        self._add_worker()
+
+    def config_for(self, config_path: Optional[str]) -> PatternSet:
+        """Returns the compiled config, reloading it only when the file changes."""
+        path = config_path or self.config_path
+        try:
+            mtime = os.path.getmtime(path) if path else 0.0
+        except OSError:
+            mtime = 0.0
+
+        with self._lock:
+            cached = self._configs.get(path)
+            if cached is not None and cached[0] == mtime:
+                self._configs.move_to_end(path)
+                return cached[1]
+        config = load_config(path)
+        with self._lock:
+            self._configs[path] = (mtime, config)
+            self._configs.move_to_end(path)
+            while len(self._configs) > MAX_CACHED_CONFIGS:
+                self._configs.popitem(last=False)
+        return config
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'workers': self.workers, 'active_jobs': self._active, 'idle_workers': self._idle.qsize()}
+
+    @contextmanager
+    def job(self, request: Dict[str, Any]) -> Iterator[Iterator[Dict[str, Any]]]:
+        """
+        Queues a job and provides the stream of its reply messages.
+
+        Raises:
+            ValueError: If the request is malformed or its config is invalid.
+            FileNotFoundError: If a custom config file does not exist.
+            OSError: If a custom config file cannot be read.
+            ServiceBusy: If too many jobs are already running or waiting.
+        """
+        if not isinstance(request, dict) or not isinstance(request.get('pdf_path'), str):
+            raise ValueError("A job needs a 'pdf_path' string")
+        preprocess = request.get('preprocess', False)
+        if not isinstance(preprocess, bool):
+            raise ValueError("'preprocess' must be true or false")
+        config_path = request.get('config')
+        if config_path is not None and not isinstance(config_path, str):
+            raise ValueError("'config' must be a path string")
+        try:
+            config = self.config_for(config_path)
+        except yaml.YAMLError as e:
+            raise ValueError(str(e)) from e
+
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusy("Too many jobs are queued, try again later")
+        messages = self._run(request['pdf_path'], config, preprocess)
+        try:
+            yield messages
+        finally:
+            messages.close()
+            self._slots.release()
+
+    def _run(self, pdf_path: str, config: PatternSet, preprocess: bool) -> Iterator[Dict[str, Any]]:
+        start = time.monotonic()
+        try:
+            worker = self._idle.get(timeout=self.job_timeout)
+        except queue.Empty:
+            yield {'type': 'error', 'error': f"No worker became free within {self.job_timeout:g}s"}
+            return
+        with self._lock:
+            self._active += 1
+        deadline = start + self.job_timeout
+        finished = False
+        try:
+            worker.conn.send((pdf_path, config, preprocess))
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not worker.conn.poll(remaining):
+                    raise JobTimeout(f"Job exceeded {self.job_timeout:g}s")
+                kind, payload = worker.conn.recv()
+                if kind == 'item':
+                    yield {'type': 'item', 'item': payload}
+                    continue
+
+                finished = True
+                if kind == 'error':
+                    yield {'type': 'error', 'error': payload}
+                else:
+                    yield {'type': 'done', 'items': payload, 'seconds': round(time.monotonic() - start, 3)}
+                return
+        except JobTimeout as e:
+            yield {'type': 'error', 'error': str(e)}
+        except (EOFError, OSError):
+            yield {'type': 'error', 'error': "Worker process died"}
+        finally:
+            with self._lock:
+                self._active -= 1
+            if finished:
+                self._idle.put(worker)
+            else:
+                # Timed out, crashed or abandoned by the client mid-stream:
+                # the worker may still be sending, so start a fresh one.
+                self._replace_worker(worker)
+
+    def close(self):
+        """Stops every worker process."""
+        with self._lock:
+            workers, self._all_workers = self._all_workers, []
+        for worker in workers:
+            worker.stop()
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+
+class _UnixJobHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON job line and streams the reply as JSON lines."""
+
+    def handle(self):
+        service: ExtractionService = self.server.service
+        with ExitStack() as stack:
+            try:
+                request = json.loads(self.rfile.readline().decode('utf-8'))
+                messages = stack.enter_context(service.job(request))
+            except (ValueError, OSError, ServiceBusy) as e:
+                self.wfile.write(_encode({'type': 'error', 'error': str(e)}))
+                return
+            try:
+                for message in messages:
+                    self.wfile.write(_encode(message))
+            except (BrokenPipeError, ConnectionResetError):
+                logging.info("Client disconnected before the job finished")
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class _HTTPJobHandler(BaseHTTPRequestHandler):
+    """
+    POST /extract with a JSON job streams the reply as NDJSON using chunked
+    transfer encoding. GET /health reports the worker status.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, status: int, message: Dict[str, Any]):
+        body = _encode(message)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'type': 'error', 'error': 'Not found'})
+            return
+        self._send_json(200, self.server.service.status())
+
+    def do_POST(self):
+        if self.path != '/extract':
+            self._send_json(404, {'type': 'error', 'error': 'Not found'})
+            return
+
+        service: ExtractionService = self.server.service
+        with ExitStack() as stack:
+            # Errors up to here are reported with a status code; once the
+            # reply has started, they can only end the stream.
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length).decode('utf-8'))
+                messages = stack.enter_context(service.job(request))
+            except ServiceBusy as e:
+                self._send_json(503, {'type': 'error', 'error': str(e)})
+                return
+            except (ValueError, FileNotFoundError) as e:
+                self._send_json(400, {'type': 'error', 'error': str(e)})
+                return
+            except OSError as e:
+                self._send_json(500, {'type': 'error', 'error': f"{type(e).__name__}: {e}"})
+                return
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for message in messages:
+                    self._write_chunk(_encode(message))
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                logging.info("Client disconnected before the job finished")
+                self.close_connection = True
+
+    def log_message(self, format, *args):
+        logging.info("%s - %s", self.address_string(), format % args)
+
+def make_unix_server(service: ExtractionService, socket_path: str) -> socketserver.BaseServer:
+    """Creates a server accepting jobs on a Unix socket (replacing a stale socket file)."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = _UnixServer(socket_path, _UnixJobHandler)
+    server.service = service
+    return server
+
+def make_http_server(service: ExtractionService, port: int = DEFAULT_HTTP_PORT,
+                     host: str = '127.0.0.1') -> socketserver.BaseServer:
+    """Creates an HTTP server accepting jobs on host:port (localhost by default)."""
+    server = ThreadingHTTPServer((host, port), _HTTPJobHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+def request_extraction(socket_path: str, pdf_path: str, preprocess: bool = False,
+                       config: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Client helper: sends a job to a Unix socket server and yields the reply
+    messages as they arrive.
+    """
+    job = {'pdf_path': pdf_path, 'preprocess': preprocess}
+    if config is not None:
+        job['config'] = config
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(_encode(job))
+        with sock.makefile('rb') as replies:
+            for line in replies:
+                yield json.loads(line.decode('utf-8'))
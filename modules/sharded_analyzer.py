@@ -0,0 +1,192 @@
+import os
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Iterator, Any, List, Optional, Tuple, Union
+
+from modules.config_loader import compile_patterns, PatternSet
+from modules.items import Item
+from modules.text_analyzer import _StreamScanner, _build_item
+
+if TYPE_CHECKING:
+    # Only for annotations, so importing the CLI does not load concurrent.futures.
+    from concurrent.futures import Executor
+
+# Sharded form of analyze_text for one large book. The page stream is cut
+# into shards of consecutive pages that worker processes analyze in
+# parallel, each starting from an empty buffer as if its first page began
+# the document. That guess is only wrong until the worker's scanner reaches
+# the state the sequential scan would be in: once both have their pending
+# text start at the same position of the page stream after the same page
+# (with the same line tail and page count), they behave identically from
+# there on, since the pending text is the same slice of the same pages.
+#
+# Stitching therefore runs the true, sequential scanner over each shard only
+# until its state matches the worker's recorded state after one of the
+# shard's pages (usually the first page on which the item straddling the
+# shard edge ends), then takes the worker's items for the remaining pages
+# and continues from the worker's final state. The result is identical to
+# analyze_text. A shard that never converges, e.g. one long explanation
+# covering all of it, is simply scanned sequentially.
+#
+# A worker never applies the buffer overflow policy, since a spill file or a
+# warning caused by its guessed state would be wrong. It stops at the page
+# that would overflow instead, and the stitching scans the rest of the shard
+# sequentially, where the policy applies as usual.
+#
+# Statistics follow the same rule: the sequential scanner records its own
+# pages, and for the pages whose worker items are taken over, the worker's
+# pending buffer sizes and quarantined pages are merged in.
+
+DEFAULT_SHARD_PAGES = 64
+
+class _BufferOverflow(Exception):
+    """Raised by a worker's scanner instead of applying the overflow policy."""
+
+class _ShardScanner(_StreamScanner):
+    def _overflow(self):
+        raise _BufferOverflow()
+
+def _state_key(scanner: _StreamScanner) -> Tuple[int, int, str, int]:
+    """What the scanner's future behaviour depends on, apart from the (shared) page text."""
+    return scanner.buffer_offset, scanner.pending_pages, scanner.line_tail, scanner.page_index
+
+def _analyze_shard(pages: List[str], first_page: int, char_offset: int,
+                   patterns: PatternSet) -> Tuple[List[Tuple], List[List[Item]], Dict[str, Any], Dict[str, Any]]:
+    """
+    Analyzes one shard in a worker, starting from an empty buffer.
+
+    Returns:
+        (state key after every analyzed page, the items each page completed,
+        the scanner state after the last analyzed page, page statistics:
+        'pending_chars', the pending buffer size each page reached, and
+        'quarantined_pages'). Fewer pages than given are analyzed when one
+        would overflow the buffer.
+    """
+    worker_stats: Dict[str, Any] = {}
+    scanner = _ShardScanner(patterns, worker_stats, page_time_budget=patterns.page_time_budget)
+    scanner.page_index = first_page - 1
+    scanner.buffer_offset = char_offset
+    keys: List[Tuple] = []
+    items: List[List[Item]] = []
+    pending_chars: List[int] = []
+    try:
+        for page_text in pages:
+            saved = (list(scanner.chunks), scanner.buffer_offset, scanner.line_tail,
+                     scanner.pending_pages, scanner.page_index)
+            peak = scanner.pending_chars + len(page_text)
+            found = scanner.feed(page_text)
+            items.append([_build_item(match, patterns) for match, _ in found])
+            keys.append(_state_key(scanner))
+            pending_chars.append(peak)
+        final = scanner.state()
+    except _BufferOverflow:
+        chunks, buffer_offset, line_tail, pending_pages, page_index = saved
+        final = {'pending': "".join(chunks), 'buffer_offset': buffer_offset, 'line_tail': line_tail,
+                 'pending_pages': pending_pages, 'page_index': page_index}
+    page_stats = {'pending_chars': pending_chars,
+                  'quarantined_pages': worker_stats.get('quarantined_pages', [])}
+    return keys, items, final, page_stats
+
+def _merge_stats(stats: Dict[str, Any], page_stats: Dict[str, Any], first_page: int, taken: int):
+    """Adds the statistics of the worker's pages from index taken on, whose items are used."""
+    peaks = page_stats['pending_chars'][taken:]
+    if peaks and max(peaks) > stats.get('peak_buffer_chars', 0):
+        stats['peak_buffer_chars'] = max(peaks)
+    quarantined = [page for page in page_stats['quarantined_pages'] if page >= first_page + taken]
+    if quarantined:
+        stats.setdefault('quarantined_pages', []).extend(quarantined)
+
+def _stitch(scanner: _StreamScanner, pages: List[str], first_page: int, char_offset: int,
+            result: Tuple[List[Tuple], List[List[Item]], Dict[str, Any], Dict[str, Any]],
+            patterns: PatternSet, stats: Optional[Dict[str, Any]] = None) -> Iterator[Item]:
+    """
+    Continues the sequential scan over one shard, taking over the worker's
+    items (and, with stats, the statistics of their pages) once the states meet.
+    """
+    keys, items, final, page_stats = result
+    converged = _state_key(scanner) == (char_offset, 0, "", first_page - 1)
+    analyzed = 0
+    while not converged and analyzed < len(pages):
+        for match, _ in scanner.feed(pages[analyzed]):
+            yield _build_item(match, patterns)
+        analyzed += 1
+        converged = analyzed <= len(keys) and _state_key(scanner) == keys[analyzed - 1]
+
+    if converged and analyzed < len(keys):
+        for page_items in items[analyzed:]:
+            yield from page_items
+        if stats is not None:
+            _merge_stats(stats, page_stats, first_page, analyzed)
+        scanner.restore(final)
+        analyzed = len(keys)
+
+    # Pages the worker did not analyze (it stopped at a buffer overflow).
+    for page_text in pages[analyzed:]:
+        for match, _ in scanner.feed(page_text):
+            yield _build_item(match, patterns)
+
+def _shards(text_iterator: Iterator[str], shard_pages: int) -> Iterator[List[str]]:
+    shard: List[str] = []
+    for page_text in text_iterator:
+        shard.append(page_text)
+        if len(shard) == shard_pages:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+def analyze_text_sharded(text_iterator: Iterator[str], config: Union[PatternSet, Dict[str, Any]],
+                         workers: Optional[int] = None, shard_pages: int = DEFAULT_SHARD_PAGES,
+                         executor: Optional['Executor'] = None,
+                         stats: Optional[Dict[str, Any]] = None) -> Iterator[Item]:
+    """
+    Same as analyze_text, with the pattern matching and item building spread
+    over worker processes, shard_pages pages at a time. Yields the same
+    items in the same order.
+
+    At most two shards per worker are in flight, so memory stays bounded
+    regardless of the document size.
+
+    Args:
+        text_iterator: An iterator that yields text for each page.
+        config: The PatternSet returned by load_config, or a config dictionary.
+        workers: Number of worker processes (default: CPU count).
+        shard_pages: Pages per shard.
+        executor: Optional executor to run the shards on instead of a new
+                  process pool (workers then only sizes the window).
+        stats: Optional dictionary that receives the same statistics as
+               with analyze_text.
+
+    Raises:
+        ValueError: If shard_pages is not positive.
+    """
+    if shard_pages < 1:
+        raise ValueError("shard_pages must be at least 1")
+    patterns = compile_patterns(config)
+    workers = workers or os.cpu_count() or 1
+    window = workers * 2
+
+    own_executor = executor is None
+    if own_executor:
+        # Imported here so sequential runs do not load multiprocessing.
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers)
+    scanner = _StreamScanner(patterns, stats, page_time_budget=patterns.page_time_budget)
+    try:
+        pending = deque()
+        first_page = char_offset = 0
+        for shard in _shards(text_iterator, shard_pages):
+            future = executor.submit(_analyze_shard, shard, first_page, char_offset, patterns)
+            pending.append((shard, first_page, char_offset, future))
+            first_page += len(shard)
+            char_offset += sum(len(page_text) for page_text in shard)
+            if len(pending) >= window:
+                shard, start, offset, future = pending.popleft()
+                yield from _stitch(scanner, shard, start, offset, future.result(), patterns, stats)
+        while pending:
+            shard, start, offset, future = pending.popleft()
+            yield from _stitch(scanner, shard, start, offset, future.result(), patterns, stats)
+        for match, _ in scanner.finish():
+            yield _build_item(match, patterns)
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,106 +1,429 @@
 import re
-from typing import Dict, Iterator, Any, List
-from modules.config_loader import load_config
+import os
+import signal
+import logging
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, Any, List, Optional, Tuple, Union
+from modules.config_loader import load_config, compile_patterns, PatternSet
+from modules.items import Item, SubItem
+from modules.prefilter import AnchoredScanner
 
-# Patterns are now loaded from config, so global pre-compilation is removed.
+class MatchTimeout(Exception):
+    """Raised when matching on one page exceeds the page time budget."""
 
-def _parse_explanation(full_explanation: str, config: Dict[str, Any]) -> Dict[str, Any]:
-    """Parses a full explanation block into a body and structured items using patterns from config."""
-    
-    exp_patterns = config.get('explanation_patterns', {})
-    first_item_delimiter = exp_patterns.get('first_item_delimiter')
-    item_split_delimiter = exp_patterns.get('item_split_delimiter')
-    sub_item_pattern_str = exp_patterns.get('sub_item')
+class _PageTimer:
+    """
+    Interrupts regex matching that runs longer than the budget. The regex
+    engine checks for signals while it backtracks, so a SIGALRM handler can
+    abort even a catastrophic match.
+
+    The handler and the timer are only installed while one page is being
+    matched. Afterwards the previous handler is put back and a real-time
+    timer the caller had running is re-armed with the time the page took
+    deducted, so nothing of the caller's is held while the scan is suspended
+    between pages. A process that already handles SIGALRM itself is left
+    alone: the budget is then not enforced.
+    """
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.armed = False
+        self.warned = False
+
+    @staticmethod
+    def available() -> bool:
+        # Signal handlers only run in the main thread.
+        return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+    def _on_alarm(self, signum, frame):
+        if self.armed:
+            raise MatchTimeout()
+
+    def run(self, function) -> bool:
+        """Calls function() within the budget. Returns False if time ran out."""
+        previous_handler = signal.getsignal(signal.SIGALRM)
+        if previous_handler is not signal.SIG_DFL:
+            if not self.warned:
+                logging.warning("SIGALRM already has a handler; the page time budget is not enforced")
+                self.warned = True
+            function()
+            return True
+
+        signal.signal(signal.SIGALRM, self._on_alarm)
+        started = time.monotonic()
+        self.armed = True
+        previous_timer = signal.setitimer(signal.ITIMER_REAL, self.budget)
+        try:
+            function()
+            self.armed = False
+        except MatchTimeout:
+            return False
+        finally:
+            self.armed = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+            remaining, interval = previous_timer
+            if remaining > 0:
+                # An alarm that came due during the page fires right away.
+                signal.setitimer(signal.ITIMER_REAL, max(remaining - (time.monotonic() - started), 1e-6), interval)
+        return True
+
+    def find_all(self, pattern, buffer: str, pos: int = 0) -> Tuple[List[re.Match], bool]:
+        """Returns the matches of pattern (or a prefilter scanner) from pos found within the budget and whether time ran out."""
+        matches: List[re.Match] = []
+
+        def collect():
+            for match in pattern.finditer(buffer, pos):
+                matches.append(match)
+
+        return matches, not self.run(collect)
+
+def _quarantine(stats: Optional[Dict[str, Any]], page_index: int, skipped_chars: int, budget: float):
+    logging.warning(f"Matching on page {page_index + 1} exceeded {budget:g}s; "
+                    f"skipped {skipped_chars} characters of unmatched text")
+    if stats is not None:
+        stats.setdefault('quarantined_pages', []).append(page_index)
+
+def _spill(text: str, patterns: PatternSet, stats: Optional[Dict[str, Any]]) -> str:
+    """Writes overflowing pending text to a file in the config's spill_dir and returns its path."""
+    fd, spill_path = tempfile.mkstemp(prefix='pdf_exam_overflow_', suffix='.txt', dir=patterns.spill_dir)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    if stats is not None:
+        stats.setdefault('spilled_files', []).append(spill_path)
+    return spill_path
+
+def _sub_items(items_text_block: str, patterns: PatternSet) -> List[SubItem]:
+    """
+    Splits the block of sub-items into SubItems. Each SubItem keeps the piece
+    of the block it was matched in and the offsets of its text, instead of
+    copying the text out of the match.
+    """
+    sub_items: List[SubItem] = []
+    sub_item_match = patterns.sub_item.match
+    for item_text in patterns.item_split_delimiter.split(items_text_block):
+        # strip() returns the piece itself when there is nothing to strip.
+        item_text = item_text.strip()
+        if not item_text:
+            continue
+        match = sub_item_match(item_text)
+        if match:
+            start, end = match.span('text')
+            while start < end and item_text[start].isspace():
+                start += 1
+            while end > start and item_text[end - 1].isspace():
+                end -= 1
+            sub_items.append(SubItem(match.group('label'), item_text, start, end))
+    return sub_items
 
-    if not all([first_item_delimiter, item_split_delimiter, sub_item_pattern_str]):
-        # Fallback or error if patterns are missing
-        return {'body': full_explanation.strip(), 'explanation_items': []}
+def _parse_explanation(full_explanation: str, patterns: PatternSet) -> Tuple[str, List[SubItem]]:
+    """Parses a full explanation block into a body and its sub-items using the compiled patterns."""
 
-    SUB_ITEM_PATTERN = re.compile(sub_item_pattern_str, re.MULTILINE | re.DOTALL)
+    if patterns.sub_item is None or patterns.first_item_delimiter is None or patterns.item_split_delimiter is None:
+        # Fallback if explanation patterns are not configured
+        return full_explanation.strip(), []
 
     # Find the start of the first sub-item to separate body from items
-    first_item_match = re.search(first_item_delimiter, full_explanation)
-    
-    if first_item_match:
-        body_end_index = first_item_match.start()
-        body = full_explanation[:body_end_index].strip()
-        items_text_block = full_explanation[body_end_index:].strip()
+    prefilter = patterns.explanation_prefilter
+    if prefilter is None or prefilter.may_match(full_explanation):
+        first_item_match = patterns.first_item_delimiter.search(full_explanation)
     else:
-        body = full_explanation.strip()
-        items_text_block = ""
-        
-    explanation_items: List[Dict[str, str]] = []
-    if items_text_block:
-        # Split the block into individual items based on the start of the next item
-        item_texts = re.split(item_split_delimiter, items_text_block)
-        for item_text in item_texts:
-            if not item_text.strip():
-                continue
-            
-            match = SUB_ITEM_PATTERN.match(item_text.strip())
-            if match:
-                data = match.groupdict()
-                explanation_items.append({
-                    'label': data['label'],
-                    'text': data['text'].strip()
-                })
+        first_item_match = None
+
+    if not first_item_match:
+        return full_explanation.strip(), []
 
-    return {'body': body, 'explanation_items': explanation_items}
+    body_end_index = first_item_match.start()
+    body = full_explanation[:body_end_index].strip()
+    items_text_block = full_explanation[body_end_index:].strip()
+    if not items_text_block:
+        return body, []
+    return body, _sub_items(items_text_block, patterns)
 
 
-def analyze_text(text_iterator: Iterator[str], config: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+def _build_item(match: re.Match, patterns: PatternSet) -> Item:
+    """Turns a 'stream' or 'final' match into an Item."""
+    body, explanation_items = _parse_explanation(match.group('explanation'), patterns)
+    return Item(match.group('number').strip(), match.group('problem').strip(), body, explanation_items)
+
+
+class _StreamScanner:
+    """
+    Incremental form of the stream scan: pages are pushed in with feed() and
+    the matches that became complete are returned, so the scan can be driven
+    by a pull-based generator (_scan) or by an event loop.
+
+    Matches are returned together with the offset of the scanned buffer
+    within the concatenated page stream. See _scan for stats and
+    page_time_budget.
+    """
+
+    def __init__(self, patterns: PatternSet, stats: Optional[Dict[str, Any]] = None,
+                 page_time_budget: Optional[float] = None):
+        self.patterns = patterns
+        self.stats = stats
+        self.page_time_budget = page_time_budget
+        self.timer = _PageTimer(page_time_budget) if page_time_budget and _PageTimer.available() else None
+        self.chunks: List[str] = []
+        self.buffer_offset = 0
+        # Text from the last newline seen onwards. An item start can straddle
+        # a page break, so the probe for a new page always begins here.
+        self.line_tail = ""
+        # Pattern that must match in line_tail + page for the page to complete
+        # a stream match: 'item_start' if given, else the stream terminator.
+        self.probe = patterns.item_start
+        if self.probe is None and isinstance(patterns.stream_scanner, AnchoredScanner):
+            self.probe = patterns.stream_scanner.line_probe
+        self.pending_chars = 0
+        # Pages the pending text has accumulated over.
+        self.pending_pages = 0
+        self.page_index = -1
+        # Earliest position of the pending text where an item can still
+        # start, so the stream scan resumes there instead of rescanning text
+        # (e.g. front matter) that cannot begin one.
+        self.scan_from = 0
+
+    def _find_all(self, pattern, buffer: str, pos: int = 0) -> Tuple[List[re.Match], bool]:
+        if self.timer is None:
+            return list(pattern.finditer(buffer, pos)), False
+        return self.timer.find_all(pattern, buffer, pos)
+
+    def _next_item_start(self, buffer: str, pos: int) -> Optional[int]:
+        """
+        Returns the first possible item start at or after pos, from the
+        'item_start' pattern or else from the line starts the prefilter
+        scanner would try, or None if there is none. Without either, every
+        position is possible.
+        """
+        item_start = self.patterns.item_start
+        if item_start is not None:
+            found = item_start.search(buffer, pos)
+            return found.start() if found else None
+        scanner = self.patterns.stream_scanner
+        if isinstance(scanner, AnchoredScanner):
+            return scanner.next_start(buffer, pos)
+        return pos
+
+    def feed(self, page_text: str) -> List[Tuple[re.Match, int]]:
+        """Adds the next page and returns the 'stream' matches it completed."""
+        self.page_index += 1
+        stats = self.stats
+        self.chunks.append(page_text)
+        self.pending_chars += len(page_text)
+        self.pending_pages += 1
+        if stats is not None and self.pending_chars > stats.get('peak_buffer_chars', 0):
+            stats['peak_buffer_chars'] = self.pending_chars
+
+        found = self._scan_page(page_text)
+        if self._over_limit():
+            found.extend(self._overflow())
+        return found
+
+    def _scan_page(self, page_text: str) -> List[Tuple[re.Match, int]]:
+        stats = self.stats
+
+        if self.probe is not None:
+            probe = self.line_tail + page_text
+            newline_index = page_text.rfind('\n')
+            self.line_tail = page_text[newline_index:] if newline_index >= 0 else probe
+            if not self.probe.search(probe):
+                # No stream match can complete without a new item start.
+                return []
+
+        chunks = self.chunks
+        buffer = chunks[0] if len(chunks) == 1 else "".join(chunks)
+        start = self._next_item_start(buffer, self.scan_from)
+        if start is None:
+            # An item can only begin on the last, unfinished line.
+            self.chunks = [buffer]
+            self.scan_from = max(self.scan_from, buffer.rfind('\n') + 1)
+            return []
+        matches, timed_out = self._find_all(self.patterns.stream_scanner, buffer, start)
+        buffer_offset = self.buffer_offset
+        found = [(match, buffer_offset) for match in matches]
+        last_match_end = matches[-1].end() if matches else 0
+
+        if timed_out:
+            # Quarantine: drop the text that could not be matched in time.
+            _quarantine(stats, self.page_index, len(buffer) - last_match_end, self.page_time_budget)
+            self._drop_pending(len(buffer))
+            return found
+
+        if last_match_end > 0:
+            self.chunks = [buffer[last_match_end:]]
+            self.pending_pages = 1
+            self.scan_from = 0
+        else:
+            self.chunks = [buffer]
+            self.scan_from = start
+        self.buffer_offset += last_match_end
+        self.pending_chars -= last_match_end
+        return found
+
+    def _drop_pending(self, buffer_length: int):
+        self.chunks = []
+        self.buffer_offset += buffer_length
+        self.pending_chars = 0
+        self.pending_pages = 0
+        self.line_tail = ""
+        self.scan_from = 0
+
+    def _over_limit(self) -> bool:
+        max_chars = self.patterns.max_buffer_chars
+        max_pages = self.patterns.max_buffer_pages
+        return ((max_chars is not None and self.pending_chars > max_chars)
+                or (max_pages is not None and self.pending_pages > max_pages))
+
+    def _overflow(self) -> List[Tuple[re.Match, int]]:
+        """
+        Applies the overflow policy to pending text that exceeds the buffer
+        limits, so a runaway item (e.g. a broken numbering scheme) cannot
+        grow the buffer until the end of the document.
+        """
+        policy = self.patterns.overflow_policy
+        buffer = "".join(self.chunks)
+        pages = self.pending_pages
+        if self.stats is not None:
+            counts = self.stats.setdefault('buffer_overflows', {})
+            counts[policy] = counts.get(policy, 0) + 1
+
+        found: List[Tuple[re.Match, int]] = []
+        if policy == 'flush':
+            # Emit whatever the 'final' pattern makes of the text, as if the
+            # document ended here.
+            matches, timed_out = self._find_all(self.patterns.final, buffer)
+            if timed_out:
+                skipped = len(buffer) - (matches[-1].end() if matches else 0)
+                _quarantine(self.stats, self.page_index, skipped, self.page_time_budget)
+            found = [(match, self.buffer_offset) for match in matches]
+            detail = f"flushed {len(found)} unterminated item(s)"
+        elif policy == 'spill':
+            detail = f"spilled to {_spill(buffer, self.patterns, self.stats)}"
+        else:
+            detail = "skipped"
+        logging.warning(f"Pending text reached {len(buffer)} characters over {pages} page(s) "
+                        f"without an item end at page {self.page_index + 1}; {detail}")
+        self._drop_pending(len(buffer))
+        return found
+
+    def finish(self) -> List[Tuple[re.Match, int]]:
+        """Returns the 'final' matches in the text left after the last page."""
+        buffer = "".join(self.chunks)
+        self.chunks = []
+        if not buffer:
+            return []
+        matches, timed_out = self._find_all(self.patterns.final, buffer)
+        if timed_out:
+            skipped = len(buffer) - (matches[-1].end() if matches else 0)
+            _quarantine(self.stats, self.page_index, skipped, self.page_time_budget)
+        return [(match, self.buffer_offset) for match in matches]
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Returns the scan position and pending text as a JSON-serializable
+        dictionary, e.g. for a checkpoint taken between two pages.
+        """
+        return {
+            'pending': "".join(self.chunks),
+            'buffer_offset': self.buffer_offset,
+            'line_tail': self.line_tail,
+            'pending_pages': self.pending_pages,
+            'page_index': self.page_index,
+        }
+
+    def restore(self, state: Dict[str, Any]):
+        """Continues from a state() snapshot, as if the pages before it had been fed."""
+        pending = state['pending']
+        self.chunks = [pending] if pending else []
+        self.buffer_offset = state['buffer_offset']
+        self.line_tail = state['line_tail']
+        self.pending_chars = len(pending)
+        self.pending_pages = state['pending_pages']
+        self.page_index = state['page_index']
+        self.scan_from = 0
+
+
+def _scan(text_iterator: Iterator[str], patterns: PatternSet,
+          stats: Optional[Dict[str, Any]] = None,
+          page_time_budget: Optional[float] = None) -> Iterator[Tuple[re.Match, int]]:
+    """
+    Yields every 'stream' match, then every 'final' match, together with the
+    offset of the scanned buffer within the concatenated page stream.
+    When stats is given, the largest pending buffer is recorded in it as
+    'peak_buffer_chars'.
+
+    With a page_time_budget (seconds), a page whose matching runs longer is
+    quarantined: matches found so far are kept, the rest of the pending text
+    is dropped, the page index is added to stats['quarantined_pages'] and
+    scanning continues with the next page.
+    The budget is only enforced in the main thread, where SIGALRM can
+    interrupt the match, and not when the process has its own SIGALRM
+    handler (see _PageTimer).
+    """
+    scanner = _StreamScanner(patterns, stats, page_time_budget)
+    for page_text in text_iterator:
+        yield from scanner.feed(page_text)
+    yield from scanner.finish()
+
+
+def analyze_text(text_iterator: Iterator[str], config: Union[PatternSet, Dict[str, Any]],
+                 stats: Optional[Dict[str, Any]] = None,
+                 page_time_budget: Optional[float] = None) -> Iterator[Item]:
     """
     Analyzes a stream of text page by page using regex patterns from the config.
     Handles items that may span across page breaks in a memory-efficient way.
 
+    Pending pages are kept as a list of chunks and are only joined when the
+    'stream' pattern actually has to run. The stream pattern is re-run only
+    when a new page (plus the line it continues) contains the text its
+    trailing lookahead waits for, e.g. the next item number, so a long
+    explanation spanning many pages is scanned once instead of once per page.
+    An optional 'item_start' pattern in the config replaces that lookahead
+    as the probe, e.g. for a stream pattern without one. The scan resumes at
+    the earliest place an item can still start, so text such as front matter
+    is not rescanned on every page either.
+
+    The pending text is capped by the config's 'matching.max_buffer_chars'
+    and 'matching.max_buffer_pages'. When a cap is exceeded, the text is
+    flushed as an unterminated item, spilled to a file or skipped, according
+    to 'matching.overflow_policy', so memory per job has a fixed ceiling.
+
     Args:
         text_iterator: An iterator that yields text for each page.
-        config: A dictionary containing the regex patterns.
+        config: The PatternSet returned by load_config, or a dictionary
+                containing the regex patterns (compiled once and cached).
+        stats: Optional dictionary that receives 'peak_buffer_chars', the
+               largest amount of pending text held at once,
+               'quarantined_pages', the pages skipped for exceeding the
+               page time budget, 'buffer_overflows', how often each
+               overflow policy fired, and 'spilled_files'.
+        page_time_budget: Seconds the patterns may spend on one page before
+                          its pending text is quarantined and skipped.
+                          Defaults to the config's 'matching.page_time_budget'.
 
     Yields:
-        A dictionary for each found item.
+        An Item (see modules.items) for each found item. Items read like
+        dictionaries; item.as_dict() returns a plain one.
     """
-    prob_patterns = config.get('problem_patterns', {})
-    stream_pattern_str = prob_patterns.get('stream')
-    final_pattern_str = prob_patterns.get('final')
+    patterns = compile_patterns(config)
+    budget = page_time_budget if page_time_budget is not None else patterns.page_time_budget
+    for match, _ in _scan(text_iterator, patterns, stats, budget):
+        yield _build_item(match, patterns)
 
-    if not stream_pattern_str or not final_pattern_str:
-        raise ValueError("Configuration must contain 'stream' and 'final' problem patterns.")
 
-    STREAM_PATTERN = re.compile(stream_pattern_str, re.MULTILINE | re.DOTALL)
-    FINAL_PATTERN = re.compile(final_pattern_str, re.MULTILINE | re.DOTALL)
-    
-    buffer = ""
-    for page_text in text_iterator:
-        buffer += page_text
-        
-        last_match_end = 0
-        for match in STREAM_PATTERN.finditer(buffer):
-            data = match.groupdict()
-            parsed_explanation = _parse_explanation(data['explanation'], config)
-            
-            yield {
-                "number": data['number'].strip(),
-                "title": data['problem'].strip(),
-                "body": parsed_explanation['body'],
-                "explanation_items": parsed_explanation['explanation_items']
-            }
-            last_match_end = match.end()
+def analyze_text_with_spans(text_iterator: Iterator[str], config: Union[PatternSet, Dict[str, Any]]) -> Iterator[Tuple[Item, int, int, str]]:
+    """
+    Same as analyze_text, but also reports where each item came from.
 
-        if last_match_end > 0:
-            buffer = buffer[last_match_end:]
-
-    if buffer:
-        for match in FINAL_PATTERN.finditer(buffer):
-            data = match.groupdict()
-            parsed_explanation = _parse_explanation(data['explanation'], config)
-
-            yield {
-                "number": data['number'].strip(),
-                "title": data['problem'].strip(),
-                "body": parsed_explanation['body'],
-                "explanation_items": parsed_explanation['explanation_items']
-            }
+    Yields:
+        (item, start, end, source) tuples, where start and end are offsets into
+        the concatenation of all pages and source is the matched text.
+    """
+    patterns = compile_patterns(config)
+    for match, buffer_offset in _scan(text_iterator, patterns, page_time_budget=patterns.page_time_budget):
+        yield _build_item(match, patterns), buffer_offset + match.start(), buffer_offset + match.end(), match.group(0)
 
 if __name__ == '__main__':
     # Main block is now for demonstration and requires a config.
@@ -1,54 +1,118 @@
 import re
+import json
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+# Ligature glyphs that PDF text extraction commonly returns.
+DEFAULT_REPLACEMENTS = {
+    "ﬁ": "fi",
+    "ﬂ": "fl",
+    "ﬃ": "ffi",
+    "ﬄ": "ffl",
+    "ﬅ": "ft",
+    "ﬆ": "st",
+}
+
+_MULTIPLE_SPACES = re.compile(r' {2,}')
+_MULTIPLE_BLANK_LINES = re.compile(r'\n{3,}')
 
 def normalize_whitespace(text: str) -> str:
     """
-    Normalizes whitespace in a string by processing it line by line.
-    - Strips leading/trailing whitespace from the entire text.
+    Normalizes whitespace in a string while preserving its line structure.
+    - Strips leading/trailing whitespace from the entire text and from each line.
     - Replaces multiple horizontal whitespace characters (space, tab) with a single space.
     - Collapses multiple consecutive blank lines into a single blank line.
     """
-    # Split the text into lines, process each line, and filter out empty lines
-    # that result from stripping whitespace-only lines.
-    lines = (re.sub(r'[ \t]+', ' ', line).strip() for line in text.strip().split('\n'))
-
-    # Reconstruct the text, ensuring that multiple blank lines are collapsed
-    normalized_lines = []
-    last_line_was_blank = False
-    for line in lines:
-        if line:
-            normalized_lines.append(line)
-            last_line_was_blank = False
-        elif not last_line_was_blank:
-            normalized_lines.append("") # Add a single blank line
-            last_line_was_blank = True
-            
-    # Join the lines back, and handle the case where the text might end with newlines
-    result = '\n'.join(normalized_lines)
+    result = text.strip()
+    if '\t' in result:
+        result = result.replace('\t', ' ')
+
+    # Stripping every line also empties whitespace-only lines, so the blank
+    # line runs left behind can be collapsed on the joined text.
+    result = '\n'.join(map(str.strip, result.split('\n')))
+    if '  ' in result:
+        result = _MULTIPLE_SPACES.sub(' ', result)
+    if '\n\n\n' in result:
+        result = _MULTIPLE_BLANK_LINES.sub('\n\n', result)
+
     if text.endswith('\n\n'):
         # If the original text ended with a double newline, preserve one blank line
         if not result.endswith('\n\n'):
              result += '\n'
     return result
 
-def clean_text(text: str) -> str:
+class CleaningRules:
+    """
+    Compiled preprocessing rules: every replacement is applied in a single
+    regex pass, followed by optional whitespace normalization.
+    """
+    __slots__ = ('replacements', 'replacement_pattern', 'normalize_whitespace')
+
+    def __init__(self, replacements: Dict[str, str], normalize_whitespace: bool = True):
+        self.replacements = dict(replacements)
+        # Longest keys first, so overlapping rules prefer the longer match.
+        keys = sorted(self.replacements, key=len, reverse=True)
+        self.replacement_pattern = re.compile('|'.join(map(re.escape, keys))) if keys else None
+        self.normalize_whitespace = normalize_whitespace
+
+    def _replace(self, match: re.Match) -> str:
+        return self.replacements[match.group()]
+
+    def apply(self, text: str) -> str:
+        if self.replacement_pattern is not None:
+            text = self.replacement_pattern.sub(self._replace, text)
+        if self.normalize_whitespace:
+            text = normalize_whitespace(text)
+        return text
+
+_RULES_CACHE: Dict[str, CleaningRules] = {}
+
+def compile_cleaning_rules(section: Optional[Mapping] = None) -> CleaningRules:
+    """
+    Builds CleaningRules from the optional 'preprocessing' config section.
+
+    Supported keys:
+        replacements: A mapping of text to its replacement. Defaults to
+                      DEFAULT_REPLACEMENTS (common ligatures).
+        normalize_whitespace: Whether to normalize whitespace (default: True).
+
+    Raises:
+        ValueError: If the section is malformed.
+    """
+    section = section or {}
+    if not isinstance(section, Mapping):
+        raise ValueError("Section 'preprocessing' must be a dictionary")
+
+    replacements = section.get('replacements', DEFAULT_REPLACEMENTS)
+    normalize = section.get('normalize_whitespace', True)
+    if not isinstance(replacements, Mapping) or not all(
+            isinstance(key, str) and key and isinstance(value, str) for key, value in replacements.items()):
+        raise ValueError("'preprocessing.replacements' must map non-empty strings to strings")
+    if not isinstance(normalize, bool):
+        raise ValueError("'preprocessing.normalize_whitespace' must be true or false")
+
+    cache_key = json.dumps([dict(replacements), normalize], sort_keys=True, ensure_ascii=False)
+    rules = _RULES_CACHE.get(cache_key)
+    if rules is None:
+        rules = CleaningRules(replacements, normalize)
+        _RULES_CACHE[cache_key] = rules
+    return rules
+
+DEFAULT_RULES = compile_cleaning_rules()
+
+def clean_text(text: str, config: Optional[Mapping] = None) -> str:
     """
     Performs a series of cleaning operations on a string.
-    - Replaces common ligatures.
+    - Replaces common ligatures (or the configured replacements).
     - Normalizes whitespace in a structure-preserving way.
+
+    Args:
+        text: The page text to clean.
+        config: Optional loaded config. Its 'preprocessing' section selects
+                the rules; without one the defaults are used.
     """
-    # Ligature replacements
-    ligatures = {
-        "ﬁ": "fi",
-        "ﬂ": "fl",
-        "ﬃ": "ffi",
-        "ﬄ": "ffl",
-        "ﬅ": "ft",
-        "ﬆ": "st",
-    }
-    for lig, ascii_equiv in ligatures.items():
-        text = text.replace(lig, ascii_equiv)
-        
-    # Normalize whitespace
-    text = normalize_whitespace(text)
-    
-    return text 
\ No newline at end of file
+    if config is None:
+        rules = DEFAULT_RULES
+    else:
+        rules = getattr(config, 'cleaning_rules', None) or compile_cleaning_rules(config.get('preprocessing'))
+    return rules.apply(text)
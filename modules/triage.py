@@ -0,0 +1,168 @@
+import json
+from typing import Dict, Iterable, Iterator, Any, List, Optional, Sequence
+
+from modules.lazy_import import lazy_import
+
+fitz = lazy_import('fitz')  # PyMuPDF, loaded on first use
+
+# Pre-flight triage of a PDF from page metadata only: the fonts a page's
+# resources reference and the images it places, never its text. A scanned
+# page has no font at all, so get_text() can only return an empty string (or
+# the garbage of a stray stamp), and the analyzer quietly finds nothing in it.
+# Triage tells those pages apart before any text is extracted:
+#
+# - text: fonts and little or no image area,
+# - mixed: fonts and images covering at least image_coverage of the page,
+#   e.g. a figure page or a scan with an OCR text layer,
+# - image_only: images but no font, i.e. a scanned page that needs OCR,
+# - blank: neither.
+#
+# Image placement (get_image_info) is only looked up for pages whose
+# resources hold an image, so a plain text page costs two resource lookups.
+
+PAGE_KINDS = ('text', 'mixed', 'image_only', 'blank')
+# Kinds whose text layer get_text() can read.
+TEXT_KINDS = ('text', 'mixed')
+DEFAULT_IMAGE_COVERAGE = 0.5
+# Share of the non-blank pages that must be image-only for a scanned document.
+DEFAULT_SCANNED_SHARE = 0.5
+
+class PageTriage:
+    """
+    The triage result of one page.
+
+    Attributes:
+        page: 0-based page number.
+        kind: One of PAGE_KINDS.
+        fonts: Number of fonts the page references.
+        images: Number of images placed on the page.
+        image_coverage: Share of the page area covered by images (summed,
+                        capped at 1.0).
+    """
+    __slots__ = ('page', 'kind', 'fonts', 'images', 'image_coverage')
+
+    def __init__(self, page: int, kind: str, fonts: int, images: int, image_coverage: float):
+        self.page = page
+        self.kind = kind
+        self.fonts = fonts
+        self.images = images
+        self.image_coverage = image_coverage
+
+    @property
+    def has_text(self) -> bool:
+        return self.kind in TEXT_KINDS
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The report entry of the page; 'page' is 1-based like --pages."""
+        return {'page': self.page + 1, 'kind': self.kind, 'fonts': self.fonts,
+                'images': self.images, 'image_coverage': round(self.image_coverage, 3)}
+
+    def __repr__(self):
+        return f"PageTriage(page={self.page}, kind={self.kind!r}, image_coverage={self.image_coverage:.2f})"
+
+def triage_page(page: "fitz.Page", image_coverage: float = DEFAULT_IMAGE_COVERAGE) -> PageTriage:
+    """Classifies one page from its fonts and image placements."""
+    fonts = len(page.get_fonts())
+    images = coverage = 0
+    if page.get_images():
+        page_rect = page.rect
+        page_area = abs(page_rect)
+        placements = page.get_image_info()
+        images = len(placements)
+        if page_area > 0:
+            covered = sum(abs(fitz.Rect(placement['bbox']) & page_rect) for placement in placements)
+            coverage = min(covered / page_area, 1.0)
+
+    if fonts:
+        kind = 'mixed' if images and coverage >= image_coverage else 'text'
+    else:
+        kind = 'image_only' if images else 'blank'
+    return PageTriage(page.number, kind, fonts, images, coverage)
+
+def iter_triage(pdf_path: str, pages: Optional[Sequence[int]] = None,
+                image_coverage: float = DEFAULT_IMAGE_COVERAGE) -> Iterator[PageTriage]:
+    """
+    Triages the pages of a PDF (or the given 0-based pages, in that order)
+    without extracting any text.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        page_numbers: Iterable[int] = range(doc.page_count) if pages is None else pages
+        for page_number in page_numbers:
+            yield triage_page(doc.load_page(page_number), image_coverage)
+    finally:
+        doc.close()
+
+def triage_pdf(pdf_path: str, pages: Optional[Sequence[int]] = None,
+               image_coverage: float = DEFAULT_IMAGE_COVERAGE,
+               scanned_share: float = DEFAULT_SCANNED_SHARE) -> Dict[str, Any]:
+    """
+    Builds the triage report of a PDF.
+
+    Args:
+        pdf_path: The path to the PDF file.
+        pages: Optional 0-based pages to triage (default: all).
+        image_coverage: Image share of the page area from which a page with
+                        fonts counts as mixed.
+        scanned_share: Share of the non-blank pages that must be image-only
+                       for the document to count as scanned.
+
+    Returns:
+        A JSON-serializable dictionary with 'pdf', 'document' ('text',
+        'mixed' or 'scanned'), 'counts' (pages per kind), 'pages_without_text'
+        (1-based) and 'pages' (one PageTriage.as_dict() entry per page).
+    """
+    results = list(iter_triage(pdf_path, pages, image_coverage))
+    counts = {kind: 0 for kind in PAGE_KINDS}
+    for result in results:
+        counts[result.kind] += 1
+
+    content_pages = len(results) - counts['blank']
+    if counts['image_only'] == 0:
+        document = 'text'
+    elif counts['image_only'] >= scanned_share * content_pages:
+        document = 'scanned'
+    else:
+        document = 'mixed'
+    return {
+        'pdf': pdf_path,
+        'document': document,
+        'counts': counts,
+        'pages_without_text': [result.page + 1 for result in results if not result.has_text],
+        'pages': [result.as_dict() for result in results],
+    }
+
+def pages_with_text(report: Dict[str, Any]) -> List[int]:
+    """Returns the 0-based pages of a triage report that have a text layer."""
+    return [entry['page'] - 1 for entry in report['pages'] if entry['kind'] in TEXT_KINDS]
+
+def format_triage(report: Dict[str, Any]) -> List[str]:
+    """Formats a triage report as log lines."""
+    counts = report['counts']
+    lines = [f"Triage of {report['pdf']}: {report['document']} document, "
+             + ", ".join(f"{counts[kind]} {kind}" for kind in PAGE_KINDS) + " page(s)."]
+    if report['pages_without_text']:
+        lines.append(f"Pages without a text layer: {_page_ranges(report['pages_without_text'])}")
+    return lines
+
+def _page_ranges(pages: Sequence[int]) -> str:
+    """Formats page numbers compactly, e.g. '3-7,12' (the --pages syntax)."""
+    ranges = []
+    start = previous = None
+    for page in pages:
+        if previous is not None and page == previous + 1:
+            previous = page
+            continue
+        if start is not None:
+            ranges.append(f"{start}-{previous}" if previous != start else str(start))
+        start = previous = page
+    if start is not None:
+        ranges.append(f"{start}-{previous}" if previous != start else str(start))
+    return ','.join(ranges)
+
+def write_triage_reports(reports: Iterable[Dict[str, Any]], output_path: str):
+    """Writes triage reports as JSON Lines, one document per line."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for report in reports:
+            f.write(json.dumps(report, ensure_ascii=False))
+            f.write('\n')
@@ -0,0 +1,165 @@
+import asyncio
+import gzip
+import os
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.synthetic import BookSpec, generate_pages, write_pdf
+from modules.async_pipeline import (aextract_pages, aanalyze_text, asave_items, arun_pipeline, buffered,
+                                   DEFAULT_ASYNC_PAGE_TIME_BUDGET)
+from modules.config_loader import load_config
+from modules.output_writers import save_items
+from modules.pdf_extractor import extract_pages
+from modules.text_analyzer import analyze_text
+from modules.text_preprocessor import clean_text
+
+@pytest.fixture(scope="module")
+def book_pdf(tmp_path_factory):
+    pdf_path = str(tmp_path_factory.mktemp("async") / "book.pdf")
+    write_pdf(generate_pages(BookSpec(pages=12, items_per_page=2, spanning_items=1, span_pages=3)), pdf_path)
+    return pdf_path
+
+@pytest.fixture
+def executor():
+    # Serializes fitz calls like a one-process pool, without the start-up cost.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        yield pool
+
+async def _aiter(values):
+    for value in values:
+        yield value
+
+async def _collect(stream):
+    return [value async for value in stream]
+
+def test_aextract_pages_matches_extract_pages(book_pdf, executor):
+    pages = asyncio.run(_collect(aextract_pages(book_pdf, executor, chunk_size=5)))
+    assert pages == list(extract_pages(book_pdf))
+
+    selected = asyncio.run(_collect(aextract_pages(book_pdf, executor, pages=[3, 0, 7])))
+    assert selected == list(extract_pages(book_pdf, pages=[3, 0, 7]))
+
+def test_aanalyze_text_matches_analyze_text(book_pdf):
+    config = load_config()
+    pages = list(extract_pages(book_pdf))
+    stats = {}
+
+    items = asyncio.run(_collect(aanalyze_text(_aiter(pages), config, stats=stats)))
+
+    assert items == list(analyze_text(iter(pages), config))
+    assert stats['peak_buffer_chars'] > 0
+
+def test_aanalyze_text_caps_the_page_time_budget():
+    """
+    Tests that a backtracking page blocks the event loop for the async
+    budget, not for the config's 10s, before it is quarantined.
+    """
+    config = load_config().to_dict()
+    config["problem_patterns"]["stream"] = r'^(?P<number>\d+) (?P<problem>(?:\w+\s?)+)!\n(?P<explanation>.*?)(?=\n\d+ )'
+    config["problem_patterns"]["final"] = r'^(?P<number>\d+) (?P<problem>[^!\n]+)!\n(?P<explanation>.*?)(?=\n\d+ |\Z)'
+    config["problem_patterns"].pop("item_start", None)
+    config["matching"] = {"allow_risky_patterns": True}
+    pages = ["01 ok!\nexplanation one\n", "02 " + "a" * 40 + "\n99 \n", "03 fine!\nexplanation three\n04 last!\nend\n"]
+    stats = {}
+
+    start = time.perf_counter()
+    items = asyncio.run(_collect(aanalyze_text(_aiter(pages), config, stats=stats)))
+
+    assert time.perf_counter() - start < DEFAULT_ASYNC_PAGE_TIME_BUDGET + 2
+    assert stats['quarantined_pages'] == [1]
+    assert [item['number'] for item in items] == ['01', '03', '04']
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl"])
+def test_arun_pipeline_writes_same_output_as_sync_pipeline(book_pdf, executor, tmp_path, extension):
+    config = load_config()
+    sync_path = str(tmp_path / f"sync.{extension}")
+    async_path = str(tmp_path / f"async.{extension}")
+    save_items(analyze_text((clean_text(page, config) for page in extract_pages(book_pdf)), config), sync_path)
+
+    count = asyncio.run(arun_pipeline(book_pdf, async_path, config, preprocess=True, executor=executor, queue_size=2))
+
+    with open(sync_path, 'rb') as expected, open(async_path, 'rb') as actual:
+        assert actual.read() == expected.read()
+    assert count > 0
+
+def test_asave_items_writes_compressed_csv_with_ids(tmp_path):
+    items = list(analyze_text(generate_pages(BookSpec(pages=5)), load_config()))
+    for item_id, item in enumerate(items, 1):
+        item.item_id = item_id
+    sync_path = str(tmp_path / "sync.csv")
+    save_items(iter(items), sync_path)
+
+    count = asyncio.run(asave_items(_aiter(items), str(tmp_path / "async.csv.gz"), batch_size=4))
+
+    assert count == len(items)
+    assert sorted(os.listdir(tmp_path)) == ["async.csv.gz", "sync.csv"]
+    with open(sync_path, 'rb') as expected, gzip.open(tmp_path / "async.csv.gz", 'rb') as actual:
+        assert actual.read() == expected.read()
+
+def test_many_documents_share_one_loop(book_pdf, executor, tmp_path):
+    config = load_config()
+
+    async def run_all():
+        jobs = [arun_pipeline(book_pdf, str(tmp_path / f"out{index}.jsonl"), config, executor=executor)
+                for index in range(20)]
+        return await asyncio.gather(*jobs)
+
+    counts = asyncio.run(run_all())
+    assert len(set(counts)) == 1
+    assert len(os.listdir(tmp_path)) == 20
+
+def test_buffered_bounds_the_producer():
+    produced = []
+
+    async def stage():
+        for value in range(100):
+            produced.append(value)
+            yield value
+
+    async def consume():
+        stream = buffered(stage(), maxsize=3)
+        first = await stream.__anext__()
+        await asyncio.sleep(0.01)
+        ahead = len(produced)
+        await stream.aclose()
+        return first, ahead
+
+    first, ahead = asyncio.run(consume())
+    assert first == 0
+    # Queue capacity, plus one value the producer holds while blocked.
+    assert ahead <= 5
+
+def test_buffered_reraises_stage_errors():
+    async def stage():
+        yield 1
+        raise ValueError("broken page")
+
+    with pytest.raises(ValueError, match="broken page"):
+        asyncio.run(_collect(buffered(stage())))
+
+def test_cancelled_write_leaves_no_output(tmp_path):
+    output_path = str(tmp_path / "out.csv")
+    closed = []
+
+    async def slow_items():
+        try:
+            for index in range(1000):
+                await asyncio.sleep(0.001)
+                yield {'number': str(index), 'title': 't', 'body': 'b', 'explanation_items': []}
+        finally:
+            closed.append(True)
+
+    async def run():
+        task = asyncio.ensure_future(asave_items(slow_items(), output_path, batch_size=4))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert os.listdir(tmp_path) == []
+    assert closed == [True]
+
+def test_asave_items_rejects_unsupported_formats(tmp_path):
+    with pytest.raises(ValueError):
+        asyncio.run(asave_items(_aiter([]), str(tmp_path / "out.parquet")))
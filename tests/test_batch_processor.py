@@ -0,0 +1,140 @@
+import csv
+import os
+import pytest
+from modules import batch_processor
+from modules.batch_processor import collect_pdf_paths, run_batch, format_summary
+from modules.config_loader import load_config
+
+def _write_pdf(path, lines):
+    import fitz
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "\n".join(lines))
+    doc.save(str(path))
+    doc.close()
+
+@pytest.fixture
+def pdf_dir(tmp_path):
+    """A directory with two valid PDFs and one corrupt PDF."""
+    books = tmp_path / "books"
+    books.mkdir()
+    _write_pdf(books / "a.pdf", ["01 First", "Explanation one", "02 Second", "Explanation two"])
+    _write_pdf(books / "b.pdf", ["01 Only", "Single explanation"])
+    (books / "broken.pdf").write_bytes(b"this is not a pdf")
+    return books
+
+def test_collect_pdf_paths_directory(pdf_dir):
+    paths = collect_pdf_paths(str(pdf_dir))
+    assert [os.path.basename(p) for p in paths] == ["a.pdf", "b.pdf", "broken.pdf"]
+
+def test_collect_pdf_paths_glob(pdf_dir):
+    paths = collect_pdf_paths(str(pdf_dir / "[ab].pdf"))
+    assert [os.path.basename(p) for p in paths] == ["a.pdf", "b.pdf"]
+
+def test_collect_pdf_paths_manifest(pdf_dir):
+    manifest = pdf_dir / "manifest.txt"
+    manifest.write_text("# nightly run\nb.pdf\n\na.pdf\n", encoding="utf-8")
+    paths = collect_pdf_paths(str(manifest))
+    assert paths == [str(pdf_dir / "b.pdf"), str(pdf_dir / "a.pdf")]
+
+def test_collect_pdf_paths_no_match(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        collect_pdf_paths(str(tmp_path / "*.pdf"))
+
+def test_run_batch_one_csv_per_input_survives_bad_pdf(pdf_dir, tmp_path):
+    """
+    Tests that a corrupt PDF is reported as a failure without stopping the
+    other files.
+    """
+    out_dir = tmp_path / "out"
+    results = run_batch(collect_pdf_paths(str(pdf_dir)), str(out_dir), load_config(), jobs=2)
+
+    assert [r['items'] for r in results] == [2, 1, 0]
+    assert results[0]['error'] is None and results[1]['error'] is None
+    assert results[2]['error'] is not None
+    assert os.path.exists(out_dir / "a.csv")
+    assert os.path.exists(out_dir / "b.csv")
+
+    summary = format_summary(results)
+    assert len(summary) == 4
+    assert "FAILED" in summary[2]
+    assert "3 files, 3 items, 1 failed" in summary[3]
+
+def test_run_batch_combined_output(pdf_dir, tmp_path):
+    """Tests that combine mode writes one CSV with a source column."""
+    output_file = tmp_path / "all.csv"
+    results = run_batch(collect_pdf_paths(str(pdf_dir)), str(output_file), load_config(), jobs=2, combine=True)
+
+    with open(output_file, 'r', newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0] == ['source', 'number', 'problem', 'explanation']
+    assert [(row[0], row[1]) for row in rows[1:]] == [('a.pdf', '01'), ('a.pdf', '02'), ('b.pdf', '01')]
+    assert all(r['output_path'] == str(output_file) for r in results)
+    assert sorted(os.listdir(tmp_path)) == ['all.csv', 'books']
+
+def test_run_batch_combined_output_with_dedup_starting_with_empty_file(pdf_dir, tmp_path):
+    """
+    Tests that the combined header has the dedup ID columns even when the
+    first file yields no items.
+    """
+    _write_pdf(pdf_dir / "0_cover.pdf", ["Cover page without items"])
+    output_file = tmp_path / "all.csv"
+    paths = [str(pdf_dir / name) for name in ("0_cover.pdf", "a.pdf", "b.pdf")]
+    results = run_batch(paths, str(output_file), load_config(), jobs=1, combine=True,
+                        dedup_index=str(tmp_path / "index.sqlite"))
+
+    with open(output_file, 'r', newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+
+    assert [r['items'] for r in results] == [0, 2, 1]
+    assert rows[0] == ['source', 'number', 'problem', 'explanation', 'item_id', 'duplicate_of']
+    assert all(len(row) == len(rows[0]) for row in rows[1:])
+    assert [(row[0], row[1]) for row in rows[1:]] == [('a.pdf', '01'), ('a.pdf', '02'), ('b.pdf', '01')]
+
+def test_run_batch_combined_gzip_output(pdf_dir, tmp_path):
+    import gzip
+    output_file = tmp_path / "all.csv.gz"
+    run_batch(collect_pdf_paths(str(pdf_dir)), str(output_file), load_config(), jobs=1, combine=True)
+
+    with gzip.open(output_file, 'rt', newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['source', 'number', 'problem', 'explanation']
+    assert [(row[0], row[1]) for row in rows[1:]] == [('a.pdf', '01'), ('a.pdf', '02'), ('b.pdf', '01')]
+
+def test_run_batch_jsonl_outputs(pdf_dir, tmp_path):
+    out_dir = tmp_path / "out"
+    paths = [str(pdf_dir / "a.pdf")]
+    results = run_batch(paths, str(out_dir), load_config(), jobs=1, output_format='jsonl')
+
+    assert results[0]['error'] is None
+    assert results[0]['output_path'] == str(out_dir / "a.jsonl")
+    assert len((out_dir / "a.jsonl").read_text(encoding='utf-8').splitlines()) == 2
+
+    with pytest.raises(ValueError):
+        run_batch(paths, str(tmp_path / "all.jsonl"), load_config(), combine=True, output_format='jsonl')
+
+_process_pdf = batch_processor.process_pdf
+
+def _crash_on_bad(pdf_path, *args):
+    if os.path.basename(pdf_path) == "crash.pdf":
+        os._exit(1)
+    return _process_pdf(pdf_path, *args)
+
+def test_run_batch_survives_a_dying_worker(pdf_dir, tmp_path, monkeypatch):
+    """
+    Tests that a file whose worker process dies gets an error result while
+    the files that were in flight on the broken pool are run again.
+    """
+    import multiprocessing
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("needs the fork start method to patch the workers")
+    monkeypatch.setattr(batch_processor, "process_pdf", _crash_on_bad)
+    _write_pdf(pdf_dir / "crash.pdf", ["01 Never", "Read"])
+    paths = [str(pdf_dir / name) for name in ("a.pdf", "crash.pdf", "b.pdf", "broken.pdf")]
+    results = run_batch(paths, str(tmp_path / "out"), load_config(), jobs=2)
+
+    assert [r['items'] for r in results] == [2, 0, 1, 0]
+    assert results[0]['error'] is None and results[2]['error'] is None
+    assert "BrokenProcessPool" in results[1]['error']
+    assert results[3]['error'] is not None and "BrokenProcessPool" not in results[3]['error']
@@ -0,0 +1,92 @@
+import pytest
+from benchmarks.synthetic import BookSpec, generate_pages, count_items, write_pdf
+from benchmarks.run import run_scenario, compare_results
+from benchmarks.csv_write import run_csv_benchmark
+from benchmarks.clean_text import run_clean_benchmark
+from benchmarks.scaling import run_scaling_benchmark
+from benchmarks.startup import parse_importtime, measure_startup, check_startup, SCENARIOS as STARTUP_SCENARIOS
+from modules.pdf_extractor import extract_pages
+from modules.text_analyzer import analyze_text
+from modules.config_loader import load_config
+
+def test_generated_book_is_deterministic_and_parses_completely():
+    spec = BookSpec(pages=30, items_per_page=2, sub_item_ratio=1.0, spanning_items=2, span_pages=10)
+    pages = generate_pages(spec)
+
+    assert pages == generate_pages(spec)
+    assert len(pages) == 30
+    # Two runs of ten pages without any item start
+    assert sum(1 for page in pages if not page[:2].isdigit()) == 20
+
+    items = list(analyze_text(iter(pages), load_config()))
+    assert len(items) == count_items(pages) == 20
+    assert all(item['explanation_items'] for item in items)
+
+def test_write_pdf_round_trips_page_text(tmp_path):
+    pages = generate_pages(BookSpec(pages=3, explanation_lines=12))
+    pdf_path = str(tmp_path / "book.pdf")
+    write_pdf(pages, pdf_path)
+
+    assert list(extract_pages(pdf_path)) == pages
+
+def test_run_scenario_reports_every_stage(tmp_path):
+    results = run_scenario('tiny', BookSpec(pages=4), load_config(), str(tmp_path), repeat=1)
+
+    assert set(results) == {f"tiny/{stage}" for stage in
+                            ('extract_pages', 'clean_text', 'analyze_text', 'flatten_item_for_csv', 'save_to_csv', 'end_to_end')}
+    assert results['tiny/analyze_text']['items'] == 12
+    assert results['tiny/end_to_end']['seconds'] > 0
+
+def test_compare_results_flags_regressions():
+    baseline = {'results': {'a/analyze_text': {'seconds': 1.0}, 'a/clean_text': {'seconds': 1.0}}}
+    current = {'results': {'a/analyze_text': {'seconds': 1.5}, 'a/clean_text': {'seconds': 1.1},
+                           'a/new_stage': {'seconds': 9.0}}}
+
+    comparison = {entry['benchmark']: entry for entry in compare_results(current, baseline, threshold=0.25)}
+    assert comparison['a/analyze_text']['regression']
+    assert not comparison['a/clean_text']['regression']
+    assert 'a/new_stage' not in comparison
+
+def test_book_spec_validation():
+    with pytest.raises(ValueError):
+        BookSpec(sub_item_ratio=2.0)
+
+def test_parse_importtime():
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       100 |        100 |   _json\n"
+              "import time:       400 |        500 | json\n"
+              "import time:        50 |         50 | json\n"
+              "some other warning\n")
+    assert parse_importtime(stderr) == {'modules': {'_json': 100, 'json': 500}, 'total': 550}
+
+def test_cli_startup_imports_no_heavy_module():
+    """
+    Tests that importing the CLI loads no heavy dependency (PyMuPDF, yaml,
+    multiprocessing, sqlite3, ...). The wall-time budget is only checked by
+    benchmarks/startup.py, since it depends on the machine.
+    """
+    result = measure_startup(STARTUP_SCENARIOS['import'], repeat=1)
+    assert result['heavy_modules'] == []
+
+def test_check_startup_reports_heavy_modules_and_budget():
+    results = {'fast': {'seconds': 0.1, 'heavy_modules': []},
+               'slow': {'seconds': 0.5, 'heavy_modules': ['sqlite3']}}
+    assert check_startup(results, budget_ms=350) == ["slow: imports sqlite3 at startup",
+                                                     "slow: 500 ms exceeds the 350 ms budget"]
+
+def test_csv_benchmark_reports_every_mode():
+    results = run_csv_benchmark(BookSpec(pages=20), repeat=1)
+    assert set(results) == {'rowwise', 'csv', 'gzip', 'zstd'}
+    assert results['rowwise']['file_bytes'] == results['csv']['file_bytes']
+    assert 0 < results['gzip']['file_bytes'] < results['csv']['file_bytes']
+    assert all(result['rows_per_second'] > 0 for result in results.values() if result is not None)
+
+def test_clean_benchmark_reports_both_cleaners():
+    result = run_clean_benchmark(pages=5, repeat=1)
+    assert result['reference'] > 0 and result['fused'] > 0
+    assert result['speedup'] > 0
+
+def test_scaling_benchmark_runs_both_configs():
+    results = run_scaling_benchmark(page_counts=(5, 20), repeat=1)
+    assert set(results) == {'item_start', 'lookahead'}
+    assert all(set(result['seconds']) == {5, 20} and result['exponent'] is not None for result in results.values())
@@ -0,0 +1,107 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+from benchmarks.synthetic import BookSpec, generate_pages, write_pdf
+from modules import checkpoint
+from modules.checkpoint import run_checkpointed, checkpoint_path_for, load_checkpoint
+from modules.config_loader import load_config
+from modules.output_writers import save_items
+from modules.pdf_extractor import extract_pages
+from modules.text_analyzer import analyze_text
+
+@pytest.fixture(scope="module")
+def book_pdf(tmp_path_factory):
+    pdf_path = str(tmp_path_factory.mktemp("checkpoint") / "book.pdf")
+    write_pdf(generate_pages(BookSpec(pages=15, items_per_page=2, spanning_items=2, span_pages=3)), pdf_path)
+    return pdf_path
+
+def _interrupted_extract(after):
+    """An extract_pages that fails after yielding `after` pages, like a killed run."""
+    def extract(*args, **kwargs):
+        for index, page in enumerate(extract_pages(*args, **kwargs)):
+            if index == after:
+                raise RuntimeError("interrupted")
+            yield page
+    return extract
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl"])
+def test_checkpointed_run_matches_save_items(book_pdf, tmp_path, extension):
+    config = load_config()
+    expected = str(tmp_path / f"expected.{extension}")
+    save_items(analyze_text(extract_pages(book_pdf), config), expected)
+
+    output = str(tmp_path / f"out.{extension}")
+    stats = run_checkpointed(book_pdf, output, config, every=4)
+
+    assert _read(output) == _read(expected)
+    assert stats['pages'] == 15 and stats['checkpoints'] == 3 and stats['resumed_at'] == 0
+    assert not os.path.exists(checkpoint_path_for(output))
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl"])
+@pytest.mark.parametrize("interrupt_after", [5, 9, 14])
+def test_resumed_run_matches_uninterrupted_run(book_pdf, tmp_path, extension, interrupt_after):
+    config = load_config()
+    expected = str(tmp_path / f"expected.{extension}")
+    run_checkpointed(book_pdf, expected, config, preprocess=True, every=4)
+
+    output = str(tmp_path / f"out.{extension}")
+    with patch.object(checkpoint, 'extract_pages', _interrupted_extract(interrupt_after)):
+        with pytest.raises(RuntimeError):
+            run_checkpointed(book_pdf, output, config, preprocess=True, every=4)
+    saved = load_checkpoint(output)
+    assert saved['pages_done'] == interrupt_after // 4 * 4
+    # Rows written after the checkpoint are dropped again on resume.
+    assert os.path.getsize(output) >= saved['output_bytes']
+
+    stats = run_checkpointed(book_pdf, output, config, preprocess=True, every=None, resume=True)
+
+    assert _read(output) == _read(expected)
+    assert stats['resumed_at'] == saved['pages_done']
+    assert stats['pages'] == 15 - saved['pages_done']
+    assert not os.path.exists(checkpoint_path_for(output))
+
+def test_resume_with_page_selection(book_pdf, tmp_path):
+    config = load_config()
+    pages = [2, 3, 4, 5, 6, 7, 8, 9, 10]
+    expected = str(tmp_path / "expected.csv")
+    save_items(analyze_text(extract_pages(book_pdf, pages=pages), config), expected)
+
+    output = str(tmp_path / "out.csv")
+    with patch.object(checkpoint, 'extract_pages', _interrupted_extract(5)):
+        with pytest.raises(RuntimeError):
+            run_checkpointed(book_pdf, output, config, pages=pages, every=2)
+    run_checkpointed(book_pdf, output, config, pages=pages, resume=True)
+
+    assert _read(output) == _read(expected)
+
+def test_resume_rejects_a_different_run(book_pdf, tmp_path):
+    config = load_config()
+    output = str(tmp_path / "out.csv")
+    with pytest.raises(ValueError, match="No checkpoint"):
+        run_checkpointed(book_pdf, output, config, resume=True)
+
+    with patch.object(checkpoint, 'extract_pages', _interrupted_extract(6)):
+        with pytest.raises(RuntimeError):
+            run_checkpointed(book_pdf, output, config, every=3)
+    with pytest.raises(ValueError, match="preprocess"):
+        run_checkpointed(book_pdf, output, config, preprocess=True, resume=True)
+    with pytest.raises(ValueError, match="pages"):
+        run_checkpointed(book_pdf, output, config, pages=[0, 1, 2], resume=True)
+
+    with open(checkpoint_path_for(output), 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    with open(output, 'r+b') as f:
+        f.truncate(saved['output_bytes'] - 1)
+    with pytest.raises(ValueError, match="shorter"):
+        run_checkpointed(book_pdf, output, config, resume=True)
+
+def test_checkpointed_run_rejects_other_formats(book_pdf, tmp_path):
+    with pytest.raises(ValueError, match="parquet"):
+        run_checkpointed(book_pdf, str(tmp_path / "out.parquet"), load_config())
+    with pytest.raises(ValueError, match="compressed"):
+        run_checkpointed(book_pdf, str(tmp_path / "out.csv.gz"), load_config())
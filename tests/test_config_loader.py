@@ -1,7 +1,8 @@
 import pytest
 import yaml
 import os
-from modules.config_loader import load_config, DEFAULT_CONFIG_PATH
+import pickle
+from modules.config_loader import load_config, compile_patterns, PatternSet, DEFAULT_CONFIG_PATH, MAX_CACHED_PATTERN_SETS
 
 @pytest.fixture
 def create_test_config(tmp_path):
@@ -29,17 +30,17 @@ def test_load_config_custom_path_success(create_test_config):
     """
     content = """
     problem_patterns:
-      stream: 'custom_stream_pattern'
-      final: 'custom_final_pattern'
+      stream: 'custom_stream_(?P<number>1)(?P<problem>x)(?P<explanation>y)'
+      final: 'custom_final_(?P<number>1)(?P<problem>x)(?P<explanation>y)'
     explanation_patterns:
-      sub_item: 'custom_sub_item_pattern'
+      sub_item: 'custom_sub_item_(?P<label>a)(?P<text>b)'
       first_item_delimiter: 'custom_first_item_delimiter'
       item_split_delimiter: 'custom_item_split_delimiter'
     """
     custom_config_path = create_test_config("custom.yaml", content)
     config = load_config(custom_config_path)
-    assert config['problem_patterns']['stream'] == 'custom_stream_pattern'
-    assert config['explanation_patterns']['sub_item'] == 'custom_sub_item_pattern'
+    assert config['problem_patterns']['stream'] == 'custom_stream_(?P<number>1)(?P<problem>x)(?P<explanation>y)'
+    assert config['explanation_patterns']['sub_item'] == 'custom_sub_item_(?P<label>a)(?P<text>b)'
 
 def test_load_config_file_not_found():
     """
@@ -110,4 +111,169 @@ def test_load_config_default_path_not_found(monkeypatch):
     monkeypatch.setattr('os.path.exists', lambda path: False)
     with pytest.raises(FileNotFoundError) as excinfo:
         load_config()
-    assert "Default config file not found" in str(excinfo.value) 
\ No newline at end of file
+    assert "Default config file not found" in str(excinfo.value) 
+
+VALID_PATTERNS = """
+problem_patterns:
+  stream: '^(?P<number>\\d+)\\s+(?P<problem>.*?)\\n(?P<explanation>.*?)(?=\\n\\d+\\s)'
+  final: '^(?P<number>\\d+)\\s+(?P<problem>.*?)\\n(?P<explanation>.*?)(?=\\n\\d+\\s|\\Z)'
+explanation_patterns:
+  sub_item: '^(?P<label>[ㄱ-ㅎ])\\s*\\.\\s*(?P<text>.*)'
+  first_item_delimiter: '\\n(?=[ㄱ-ㅎ]\\s*\\.)'
+  item_split_delimiter: '\\n(?=[ㄱ-ㅎ]\\s*\\.)'
+"""
+
+def test_load_config_returns_compiled_pattern_set(create_test_config):
+    """
+    Tests that the loaded config exposes compiled patterns and is cached by content.
+    """
+    first = load_config(create_test_config("a.yaml", VALID_PATTERNS))
+    second = load_config(create_test_config("b.yaml", VALID_PATTERNS))
+
+    assert isinstance(first, PatternSet)
+    assert first is second
+    assert first.stream.pattern == first['problem_patterns']['stream']
+    assert first.item_start is None
+    assert first.sub_item.match("ㄱ. 내용").group('text') == "내용"
+    assert compile_patterns(first.to_dict()) is first
+
+def test_pattern_set_cache_is_bounded():
+    """Tests that only the most recently used configs stay cached."""
+    config = load_config().to_dict()
+    first = compile_patterns(config)
+    versions = []
+    for index in range(MAX_CACHED_PATTERN_SETS + 4):
+        version = load_config().to_dict()
+        version['problem_patterns']['item_start'] = rf'^{index}\s'
+        versions.append(compile_patterns(version))
+        # Keeps the first config in use, as a server does with its default.
+        assert compile_patterns(config) is first
+
+    assert compile_patterns(config) is first
+    assert compile_patterns(versions[-1].to_dict()) is versions[-1]
+    assert compile_patterns(versions[0].to_dict()) is not versions[0]
+
+def test_pattern_set_is_immutable_and_picklable(create_test_config):
+    config = load_config(create_test_config("c.yaml", VALID_PATTERNS))
+
+    with pytest.raises(AttributeError):
+        config.stream = None
+    with pytest.raises(TypeError):
+        config['problem_patterns']['stream'] = 'changed'
+
+    restored = pickle.loads(pickle.dumps(config))
+    assert restored.digest == config.digest
+    assert restored.stream.pattern == config.stream.pattern
+
+def test_load_config_invalid_regex(create_test_config):
+    invalid_path = create_test_config("bad_regex.yaml", VALID_PATTERNS.replace("(?=[ㄱ-ㅎ]", "(?=[ㄱ-ㅎ", 1))
+    with pytest.raises(ValueError) as excinfo:
+        load_config(invalid_path)
+    assert "Invalid regular expression for 'first_item_delimiter'" in str(excinfo.value)
+
+def test_load_config_missing_named_group(create_test_config):
+    invalid_path = create_test_config("no_group.yaml", VALID_PATTERNS.replace("(?P<label>[ㄱ-ㅎ])", "[ㄱ-ㅎ]"))
+    with pytest.raises(ValueError) as excinfo:
+        load_config(invalid_path)
+    assert "missing named group(s) ['label']" in str(excinfo.value)
+
+def test_load_config_preprocessing_rules(create_test_config):
+    content = VALID_PATTERNS + """
+preprocessing:
+  replacements:
+    '１': '1'
+  normalize_whitespace: false
+"""
+    config = load_config(create_test_config("pre.yaml", content))
+    assert config.cleaning_rules.replacements == {'１': '1'}
+    assert config.cleaning_rules.normalize_whitespace is False
+
+    invalid_path = create_test_config("bad_pre.yaml", VALID_PATTERNS + "preprocessing:\n  normalize_whitespace: maybe\n")
+    with pytest.raises(ValueError) as excinfo:
+        load_config(invalid_path)
+    assert "normalize_whitespace" in str(excinfo.value)
+
+RISKY_PATTERNS = VALID_PATTERNS.replace("(?P<problem>.*?)\\n(?P<explanation>.*?)(?=\\n\\d+\\s)'",
+                                        "(?P<problem>(?:\\w+\\s?)+)\\n(?P<explanation>.*?)(?=\\n\\d+\\s)'")
+POLYNOMIAL_PATTERNS = VALID_PATTERNS.replace("stream: '^(?P<number>\\d+)\\s+", "stream: '^(?P<number>\\d+)\\d*\\s+")
+
+def test_load_config_rejects_exponential_backtracking(create_test_config):
+    """
+    Tests that a pattern with nested quantifiers is rejected unless risky
+    patterns are explicitly allowed.
+    """
+    assert RISKY_PATTERNS != VALID_PATTERNS
+    with pytest.raises(ValueError) as excinfo:
+        load_config(create_test_config("risky.yaml", RISKY_PATTERNS))
+    assert "Pattern 'stream' in section 'problem_patterns'" in str(excinfo.value)
+    assert "allow_risky_patterns" in str(excinfo.value)
+
+    config = load_config(create_test_config("allowed.yaml", RISKY_PATTERNS + "matching:\n  allow_risky_patterns: true\n"))
+    assert [issue['pattern'] for issue in config.lint_issues] == ['problem_patterns.stream']
+    assert config.lint_issues[0]['severity'] == 'exponential'
+
+def test_load_config_warns_on_polynomial_backtracking(create_test_config, caplog):
+    """
+    Tests that a pattern with adjacent overlapping quantifiers loads with a warning.
+    """
+    assert POLYNOMIAL_PATTERNS != VALID_PATTERNS
+    config = load_config(create_test_config("poly.yaml", POLYNOMIAL_PATTERNS))
+
+    assert [issue['severity'] for issue in config.lint_issues] == ['polynomial']
+    assert "can backtrack polynomially" in caplog.text
+
+def test_load_config_matching_defaults():
+    """
+    Tests that the default config lints clean and has the default page budget.
+    """
+    config = load_config()
+    assert config.lint_issues == ()
+    assert config.page_time_budget == 10.0
+
+def test_load_config_matching_section_validation(create_test_config):
+    """
+    Tests the validation of the matching section.
+    """
+    config = load_config(create_test_config("off.yaml", VALID_PATTERNS + "matching:\n  page_time_budget: null\n"))
+    assert config.page_time_budget is None
+
+    with pytest.raises(ValueError) as excinfo:
+        load_config(create_test_config("bad_budget.yaml", VALID_PATTERNS + "matching:\n  page_time_budget: -1\n"))
+    assert "page_time_budget" in str(excinfo.value)
+
+    with pytest.raises(ValueError) as excinfo:
+        load_config(create_test_config("bad_flag.yaml", VALID_PATTERNS + "matching:\n  allow_risky_patterns: 'yes'\n"))
+    assert "allow_risky_patterns" in str(excinfo.value)
+
+    with pytest.raises(ValueError) as excinfo:
+        load_config(create_test_config("bad_prefilter.yaml", VALID_PATTERNS + "matching:\n  prefilter: 1\n"))
+    assert "prefilter" in str(excinfo.value)
+
+def test_load_config_prefilters(create_test_config):
+    """
+    Tests that prefilters are derived from the patterns and can be turned off.
+    """
+    config = load_config()
+    assert config.stream_scanner is not config.stream
+    assert config.explanation_prefilter.literals == ('\n', '.')
+
+    config = load_config(create_test_config("plain.yaml", VALID_PATTERNS + "matching:\n  prefilter: false\n"))
+    assert config.stream_scanner is config.stream
+    assert config.explanation_prefilter is None
+
+@pytest.mark.parametrize("matching, message", [
+    ("max_buffer_chars: 0", "max_buffer_chars"),
+    ("max_buffer_pages: 2.5", "max_buffer_pages"),
+    ("overflow_policy: truncate", "overflow_policy"),
+    ("spill_dir: 3", "spill_dir"),
+])
+def test_load_config_buffer_limit_validation(create_test_config, matching, message):
+    with pytest.raises(ValueError) as excinfo:
+        load_config(create_test_config("limits.yaml", VALID_PATTERNS + f"matching:\n  {matching}\n"))
+    assert message in str(excinfo.value)
+
+def test_load_config_buffer_limit_defaults(create_test_config):
+    config = load_config(create_test_config("defaults.yaml", VALID_PATTERNS))
+    assert config.max_buffer_chars == 4_000_000
+    assert config.max_buffer_pages is None
+    assert config.overflow_policy == 'flush'
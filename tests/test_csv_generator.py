@@ -72,4 +72,41 @@ def test_save_to_csv_empty_iterator(tmp_path):
         # Check header
         assert rows[0] == ['number', 'problem', 'explanation']
         # Check no data rows
-        assert len(rows) == 1 
\ No newline at end of file
+        assert len(rows) == 1 
+
+
+def test_save_to_csv_batches_and_compression(tmp_path, monkeypatch):
+    """
+    Tests that batched writing and gzip output produce the same CSV bytes
+    as a single batch of plain CSV.
+    """
+    import gzip
+    import modules.csv_generator as csv_generator
+    items = [{'number': f"{n:02d}", 'title': f'Problem "{n}", part', 'body': 'Body\nline',
+              'explanation_items': [{'label': 'ㄱ', 'text': 'Choice'}] * (n % 3)} for n in range(1, 8)]
+
+    save_to_csv(iter(items), str(tmp_path / "single.csv"))
+    monkeypatch.setattr(csv_generator, 'CSV_BATCH_ROWS', 3)
+    save_to_csv(iter(items), str(tmp_path / "batched.csv"))
+    save_to_csv(iter(items), str(tmp_path / "batched.csv.gz"))
+
+    expected = (tmp_path / "single.csv").read_bytes()
+    assert expected.startswith(b'\xef\xbb\xbf')
+    assert (tmp_path / "batched.csv").read_bytes() == expected
+    with gzip.open(tmp_path / "batched.csv.gz", 'rb') as f:
+        assert f.read() == expected
+
+def test_csv_output_paths_and_zstd(tmp_path):
+    from modules.csv_generator import csv_compression, csv_output_path
+    assert csv_output_path("out") == "out.csv"
+    assert csv_output_path("out.CSV.GZ") == "out.CSV.GZ"
+    assert csv_output_path("out.gz") == "out.gz.csv"
+    assert [csv_compression(p) for p in ("a.csv", "a.csv.gz", "a.csv.zst")] == [None, 'gzip', 'zstd']
+
+    output_file = tmp_path / "out.csv.zst"
+    try:
+        save_to_csv(iter([{'number': '01', 'title': 'P', 'body': 'B'}]), str(output_file))
+    except ImportError as e:
+        assert "zstandard" in str(e)
+    else:
+        assert output_file.read_bytes()[:4] == b'\x28\xb5\x2f\xfd'  # zstd frame magic
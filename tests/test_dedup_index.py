@@ -0,0 +1,134 @@
+import csv
+import json
+import time
+from modules.dedup_index import DedupIndex, deduplicate, item_digest, normalize_item
+from modules.batch_processor import process_pdf
+from modules.config_loader import load_config
+from modules.output_writers import save_items
+
+ITEM = {'number': '01', 'title': '생물의 특성', 'body': '석순은 생물이 아니다.',
+        'explanation_items': [{'label': 'ㄱ', 'text': '물질대사'}]}
+
+def _item(number, title, body="본문"):
+    return {'number': number, 'title': title, 'body': body, 'explanation_items': []}
+
+def test_digest_ignores_number_layout_and_ligatures():
+    reprinted = {'number': '17', 'title': '  생물의 특성 ', 'body': '석순은 생물이\n아니다.',
+                 'explanation_items': [{'label': 'ㄱ', 'text': '물질대사'}]}
+    changed = {**ITEM, 'body': '석순은 생물이다.'}
+
+    assert item_digest(reprinted) == item_digest(ITEM)
+    assert item_digest(changed) != item_digest(ITEM)
+    assert normalize_item({'title': 'ﬁnal Answer'}) == 'final answer'
+    assert len(item_digest(ITEM)) == 16
+
+def test_index_persists_canonical_ids(tmp_path):
+    path = str(tmp_path / "index" / "items.sqlite")
+    with DedupIndex(path) as index:
+        first_id, is_new = index.add(item_digest(ITEM), 'book1.pdf', '01')
+        assert is_new
+        assert index.add(item_digest(ITEM), 'book1.pdf', '05') == (first_id, False)
+
+    with DedupIndex(path) as index:
+        assert index.lookup(item_digest(ITEM)) == first_id
+        assert index.lookup(b'\0' * 16) is None
+        assert len(index) == 1
+
+def test_deduplicate_references_items_from_earlier_documents(tmp_path):
+    stats = {}
+    with DedupIndex(str(tmp_path / "items.sqlite")) as index:
+        first = list(deduplicate(iter([_item('1', 'A'), _item('2', 'B')]), index, 'book1.pdf'))
+        second = list(deduplicate(iter([_item('7', 'B'), _item('8', 'C'), _item('9', 'C')]), index, 'book2.pdf',
+                                  stats=stats))
+
+    assert [item['duplicate_of'] for item in first] == [None, None]
+    b_id = first[1]['item_id']
+    assert second[0] == {'number': '7', 'title': '', 'body': '', 'explanation_items': [],
+                         'item_id': b_id, 'duplicate_of': b_id}
+    assert second[1]['title'] == 'C' and second[1]['duplicate_of'] is None
+    assert second[2]['duplicate_of'] == second[1]['item_id']
+    assert stats == {'unique_items': 1, 'duplicate_items': 2}
+
+def test_writers_keep_dedup_ids(tmp_path):
+    items = [{**_item('1', 'A'), 'item_id': 1, 'duplicate_of': None},
+             {**_item('2', ''), 'body': '', 'item_id': 1, 'duplicate_of': 1}]
+    csv_path = str(tmp_path / "out.csv")
+    jsonl_path = str(tmp_path / "out.jsonl")
+    save_items(iter(items), csv_path)
+    save_items(iter(items), jsonl_path)
+
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ['number', 'problem', 'explanation', 'item_id', 'duplicate_of']
+    assert (rows[1]['item_id'], rows[1]['duplicate_of']) == ('1', '1')
+    assert rows[0]['duplicate_of'] == ''
+    with open(jsonl_path, encoding='utf-8') as f:
+        assert [json.loads(line)['duplicate_of'] for line in f] == [None, 1]
+
+def test_process_pdf_with_shared_index(tmp_path):
+    """
+    Tests that a second edition of a book only references the first one's items.
+    """
+    from benchmarks.synthetic import BookSpec, generate_pages, write_pdf
+    pdf_path = str(tmp_path / "book.pdf")
+    write_pdf(generate_pages(BookSpec(pages=4)), pdf_path)
+    index_path = str(tmp_path / "items.sqlite")
+    config = load_config()
+
+    first = process_pdf(pdf_path, str(tmp_path / "first.csv"), config, dedup_index=index_path)
+    second = process_pdf(pdf_path, str(tmp_path / "second.csv"), config, dedup_index=index_path)
+
+    assert first['error'] is None and second['error'] is None
+    assert first['items'] == second['items'] > 0
+    with open(str(tmp_path / "second.csv"), newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    assert all(row['duplicate_of'] and not row['explanation'] for row in rows)
+
+def test_lookups_stay_fast_on_a_large_index(tmp_path):
+    path = str(tmp_path / "items.sqlite")
+    with DedupIndex(path) as index:
+        digests = [i.to_bytes(16, 'big') for i in range(50000)]
+        # Filled in one transaction; add() commits every new digest.
+        with index.connection:
+            index.connection.execute("BEGIN")
+            index.connection.executemany("INSERT INTO items (digest) VALUES (?)", [(d,) for d in digests])
+
+        start = time.perf_counter()
+        for digest in digests[::10]:
+            assert index.lookup(digest) is not None
+        per_lookup = (time.perf_counter() - start) / len(digests[::10])
+
+    assert per_lookup < 0.001
+
+def _add_digests(path, start, count, barrier):
+    barrier.wait()
+    ids = []
+    with DedupIndex(path, timeout=0.5) as index:
+        for i in range(start, start + count):
+            ids.append(index.add(i.to_bytes(16, 'big'), 'worker')[0])
+            # Analysis time between two items of a document.
+            time.sleep(0.005)
+    return ids
+
+def test_concurrent_writers_share_an_index(tmp_path):
+    """
+    Tests that two processes registering overlapping digests at the same
+    time, each for longer than the lock timeout, neither hit 'database is
+    locked' nor disagree on a canonical ID.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    path = str(tmp_path / "items.sqlite")
+    DedupIndex(path).close()
+
+    manager = multiprocessing.Manager()
+    barrier = manager.Barrier(2)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(_add_digests, path, 0, 200, barrier)
+        second = executor.submit(_add_digests, path, 100, 200, barrier)
+        first_ids, second_ids = first.result(), second.result()
+    manager.shutdown()
+
+    assert first_ids[100:] == second_ids[:100]
+    with DedupIndex(path) as index:
+        assert len(index) == 300
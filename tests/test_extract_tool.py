@@ -1,19 +1,49 @@
+import json
 import pytest
 from unittest.mock import patch, MagicMock, call, ANY
 from extract_tool import main
+from modules.page_cache import default_cache_dir
+
+def make_mock_args():
+    """Builds mock CLI arguments with every option at its default value."""
+    mock_args = MagicMock()
+    mock_args.config = None
+    mock_args.preprocess = False
+    mock_args.workers = 1
+    mock_args.batch = False
+    mock_args.jobs = None
+    mock_args.combine = False
+    mock_args.cache_dir = None
+    mock_args.no_cache = False
+    mock_args.incremental = False
+    mock_args.format = None
+    mock_args.metrics = False
+    mock_args.metrics_json = None
+    mock_args.layout = False
+    mock_args.pages = None
+    mock_args.sample = None
+    mock_args.answer_section = False
+    mock_args.dedup_index = None
+    mock_args.checkpoint_every = None
+    mock_args.resume = False
+    mock_args.triage = None
+    mock_args.triage_report = None
+    mock_args.triage_only = False
+    mock_args.analysis_workers = 1
+    return mock_args
 
 # Mock the config loader to avoid file system dependency in these tests
 @patch('extract_tool.load_config', return_value={"mock_config": True})
 @patch('extract_tool.argparse.ArgumentParser')
-@patch('extract_tool.save_to_csv')
+@patch('extract_tool.save_items')
 @patch('extract_tool.analyze_text')
 @patch('extract_tool.extract_pages')
-def test_main_flow_success_no_preprocessing(mock_extract_pages, mock_analyze_text, mock_save_to_csv, mock_argparse, mock_load_config):
+def test_main_flow_success_no_preprocessing(mock_extract_pages, mock_analyze_text, mock_save_items, mock_argparse, mock_load_config):
     """
     Tests the main successful execution flow of the script without preprocessing.
     """
     # --- Setup Mocks ---
-    mock_args = MagicMock()
+    mock_args = make_mock_args()
     mock_args.pdf_path = 'input.pdf'
     mock_args.output_path = 'output.csv'
     mock_args.preprocess = False # Explicitly disable preprocessing
@@ -31,22 +61,22 @@ def test_main_flow_success_no_preprocessing(mock_extract_pages, mock_analyze_tex
 
     # --- Assertions ---
     mock_load_config.assert_called_once()
-    mock_extract_pages.assert_called_once_with('input.pdf')
+    mock_extract_pages.assert_called_once_with('input.pdf', workers=1, cache_dir=default_cache_dir(), pages=None)
     # Here, we expect the original stream object and any config object
-    mock_analyze_text.assert_called_once_with(mock_page_stream, ANY)
-    mock_save_to_csv.assert_called_once_with(mock_item_stream, 'output.csv')
+    mock_analyze_text.assert_called_once_with(mock_page_stream, ANY, stats=None)
+    mock_save_items.assert_called_once_with(mock_item_stream, 'output.csv', None)
 
 @patch('extract_tool.load_config', return_value={"mock_config": True})
 @patch('extract_tool.argparse.ArgumentParser')
-@patch('extract_tool.save_to_csv')
+@patch('extract_tool.save_items')
 @patch('extract_tool.analyze_text')
 @patch('extract_tool.extract_pages')
-def test_main_flow_with_preprocessing(mock_extract_pages, mock_analyze_text, mock_save_to_csv, mock_argparse, mock_load_config):
+def test_main_flow_with_preprocessing(mock_extract_pages, mock_analyze_text, mock_save_items, mock_argparse, mock_load_config):
     """
     Tests the main flow when the --preprocess flag is enabled.
     """
     # --- Setup Mocks ---
-    mock_args = MagicMock()
+    mock_args = make_mock_args()
     mock_args.pdf_path = 'input.pdf'
     mock_args.output_path = 'output.csv'
     mock_args.preprocess = True  # Enable preprocessing
@@ -63,22 +93,22 @@ def test_main_flow_with_preprocessing(mock_extract_pages, mock_analyze_text, moc
 
     # --- Assertions ---
     mock_load_config.assert_called_once()
-    mock_extract_pages.assert_called_once_with('input.pdf')
+    mock_extract_pages.assert_called_once_with('input.pdf', workers=1, cache_dir=default_cache_dir(), pages=None)
     # When preprocessing, analyze_text is called with a generator and a config.
-    mock_analyze_text.assert_called_once_with(ANY, ANY)
-    mock_save_to_csv.assert_called_once_with(mock_item_stream, 'output.csv')
+    mock_analyze_text.assert_called_once_with(ANY, ANY, stats=None)
+    mock_save_items.assert_called_once_with(mock_item_stream, 'output.csv', None)
 
 @patch('extract_tool.load_config', return_value={"mock_config": True})
 @patch('extract_tool.argparse.ArgumentParser')
-@patch('extract_tool.save_to_csv')
+@patch('extract_tool.save_items')
 @patch('extract_tool.analyze_text')
 @patch('extract_tool.extract_pages')
-def test_main_flow_no_items_found(mock_extract_pages, mock_analyze_text, mock_save_to_csv, mock_argparse, mock_load_config):
+def test_main_flow_no_items_found(mock_extract_pages, mock_analyze_text, mock_save_items, mock_argparse, mock_load_config):
     """
     Tests the flow where text is extracted but no items are analyzed.
     """
     # --- Setup Mocks ---
-    mock_args = MagicMock()
+    mock_args = make_mock_args()
     mock_args.pdf_path = 'test.pdf'
     mock_args.output_path = 'output.csv'
     mock_args.preprocess = False # Explicitly disable preprocessing
@@ -95,23 +125,23 @@ def test_main_flow_no_items_found(mock_extract_pages, mock_analyze_text, mock_sa
 
     # --- Assertions ---
     mock_load_config.assert_called_once()
-    mock_extract_pages.assert_called_once_with('test.pdf')
-    mock_analyze_text.assert_called_once_with(mock_page_stream, ANY)
-    # save_to_csv is still called, but with an empty iterator
-    mock_save_to_csv.assert_called_once()
-    assert list(mock_save_to_csv.call_args[0][0]) == []
+    mock_extract_pages.assert_called_once_with('test.pdf', workers=1, cache_dir=default_cache_dir(), pages=None)
+    mock_analyze_text.assert_called_once_with(mock_page_stream, ANY, stats=None)
+    # save_items is still called, but with an empty iterator
+    mock_save_items.assert_called_once()
+    assert list(mock_save_items.call_args[0][0]) == []
 
 @patch('extract_tool.load_config', side_effect=FileNotFoundError("Config not found"))
 @patch('extract_tool.argparse.ArgumentParser')
-@patch('extract_tool.save_to_csv')
+@patch('extract_tool.save_items')
 @patch('extract_tool.analyze_text')
 @patch('extract_tool.extract_pages')
-def test_main_flow_error_handling(mock_extract_pages, mock_analyze_text, mock_save_to_csv, mock_argparse, mock_load_config):
+def test_main_flow_error_handling(mock_extract_pages, mock_analyze_text, mock_save_items, mock_argparse, mock_load_config):
     """
     Tests that an exception during processing is logged correctly.
     """
     # --- Setup Mocks ---
-    mock_args = MagicMock()
+    mock_args = make_mock_args()
     mock_args.pdf_path = 'error.pdf'
     mock_args.output_path = 'output.csv'
     mock_args.preprocess = False
@@ -128,18 +158,18 @@ def test_main_flow_error_handling(mock_extract_pages, mock_analyze_text, mock_sa
         # Ensure the subsequent steps were not called
         mock_extract_pages.assert_not_called()
         mock_analyze_text.assert_not_called()
-        mock_save_to_csv.assert_not_called()
+        mock_save_items.assert_not_called()
 
 @patch('extract_tool.load_config')
 @patch('extract_tool.argparse.ArgumentParser')
-@patch('extract_tool.save_to_csv')
+@patch('extract_tool.save_items')
 @patch('extract_tool.analyze_text')
 @patch('extract_tool.extract_pages')
-def test_main_flow_custom_config(mock_extract_pages, mock_analyze_text, mock_save_to_csv, mock_argparse, mock_load_config):
+def test_main_flow_custom_config(mock_extract_pages, mock_analyze_text, mock_save_items, mock_argparse, mock_load_config):
     """
     Tests that a custom config path is correctly passed to the loader.
     """
-    mock_args = MagicMock()
+    mock_args = make_mock_args()
     mock_args.pdf_path = 'input.pdf'
     mock_args.output_path = 'output.csv'
     mock_args.preprocess = False
@@ -150,4 +180,275 @@ def test_main_flow_custom_config(mock_extract_pages, mock_analyze_text, mock_sav
     main()
 
     # --- Assertions ---
-    mock_load_config.assert_called_once_with('custom_path.yaml')
\ No newline at end of file
+    mock_load_config.assert_called_once_with('custom_path.yaml')
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.save_items')
+@patch('extract_tool.analyze_text')
+@patch('extract_tool.extract_pages')
+def test_main_flow_with_workers(mock_extract_pages, mock_analyze_text, mock_save_items, mock_argparse, mock_load_config):
+    """
+    Tests that the --workers option is passed through to the extractor.
+    """
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'input.pdf'
+    mock_args.output_path = 'output.csv'
+    mock_args.preprocess = False
+    mock_args.workers = 4
+    mock_argparse.return_value.parse_args.return_value = mock_args
+
+    main()
+
+    mock_extract_pages.assert_called_once_with('input.pdf', workers=4, cache_dir=default_cache_dir(), pages=None)
+    mock_analyze_text.assert_called_once_with(mock_extract_pages.return_value, ANY, stats=None)
+
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.run_batch')
+@patch('extract_tool.collect_pdf_paths', return_value=['a.pdf', 'b.pdf'])
+@patch('extract_tool.extract_pages')
+def test_main_batch_mode(mock_extract_pages, mock_collect_pdf_paths, mock_run_batch, mock_argparse, mock_load_config):
+    """
+    Tests that --batch loads the config once and hands every file to run_batch.
+    """
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'books/'
+    mock_args.output_path = 'out/'
+    mock_args.batch = True
+    mock_args.jobs = 3
+    mock_argparse.return_value.parse_args.return_value = mock_args
+    mock_run_batch.return_value = [
+        {'pdf_path': 'a.pdf', 'output_path': 'out/a.csv', 'items': 2, 'seconds': 0.1, 'error': None},
+        {'pdf_path': 'b.pdf', 'output_path': 'out/b.csv', 'items': 0, 'seconds': 0.1, 'error': 'broken'},
+    ]
+
+    with patch('extract_tool.logging') as mock_logging:
+        main()
+
+    mock_load_config.assert_called_once()
+    mock_collect_pdf_paths.assert_called_once_with('books/')
+    mock_run_batch.assert_called_once_with(['a.pdf', 'b.pdf'], 'out/', {"mock_config": True},
+                                           jobs=3, preprocess=False, combine=False,
+                                           cache_dir=default_cache_dir(), output_format='csv',
+                                           dedup_index=None)
+    mock_extract_pages.assert_not_called()
+    assert "1 of 2 files failed" in mock_logging.error.call_args[0][0]
+
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.save_items')
+@patch('extract_tool.analyze_text')
+@patch('extract_tool.extract_pages')
+def test_main_flow_cache_options(mock_extract_pages, mock_analyze_text, mock_save_items, mock_argparse, mock_load_config):
+    """
+    Tests that --cache-dir selects the cache directory and --no-cache disables it.
+    """
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'input.pdf'
+    mock_args.output_path = 'output.csv'
+    mock_args.cache_dir = 'my_cache'
+    mock_argparse.return_value.parse_args.return_value = mock_args
+
+    main()
+    mock_extract_pages.assert_called_once_with('input.pdf', workers=1, cache_dir='my_cache', pages=None)
+
+    mock_extract_pages.reset_mock()
+    mock_args.no_cache = True
+    main()
+    mock_extract_pages.assert_called_once_with('input.pdf', workers=1, cache_dir=None, pages=None)
+
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.run_incremental')
+@patch('extract_tool.extract_pages')
+def test_main_incremental_mode(mock_extract_pages, mock_run_incremental, mock_argparse, mock_load_config):
+    """
+    Tests that --incremental delegates to run_incremental instead of the full pipeline.
+    """
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'input.pdf'
+    mock_args.output_path = 'output.csv'
+    mock_args.incremental = True
+    mock_argparse.return_value.parse_args.return_value = mock_args
+    mock_run_incremental.return_value = {'mode': 'incremental', 'pages': 10, 'pages_extracted': 2,
+                                         'items': 20, 'items_reparsed': 3}
+
+    main()
+
+    mock_run_incremental.assert_called_once_with('input.pdf', 'output.csv', {"mock_config": True}, preprocess=False,
+                                                 workers=1, cache_dir=default_cache_dir())
+    mock_extract_pages.assert_not_called()
+
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.save_items')
+@patch('extract_tool.analyze_text')
+@patch('extract_tool.extract_pages')
+def test_main_flow_output_format(mock_extract_pages, mock_analyze_text, mock_save_items, mock_argparse, mock_load_config):
+    """
+    Tests that --format is passed to the writer.
+    """
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'input.pdf'
+    mock_args.output_path = 'output'
+    mock_args.format = 'jsonl'
+    mock_argparse.return_value.parse_args.return_value = mock_args
+    mock_item_stream = iter([])
+    mock_analyze_text.return_value = mock_item_stream
+
+    main()
+
+    mock_save_items.assert_called_once_with(mock_item_stream, 'output', 'jsonl')
+
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.save_items')
+@patch('extract_tool.analyze_text')
+@patch('extract_tool.extract_pages')
+def test_main_flow_metrics_json(mock_extract_pages, mock_analyze_text, mock_save_items, mock_argparse, mock_load_config, tmp_path):
+    """
+    Tests that --metrics-json wraps every stage and writes the report.
+    """
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'input.pdf'
+    mock_args.output_path = 'output.csv'
+    mock_args.preprocess = True
+    mock_args.metrics_json = str(tmp_path / "metrics.json")
+    mock_argparse.return_value.parse_args.return_value = mock_args
+    mock_extract_pages.return_value = iter(["01 Page", "Page 2"])
+    mock_analyze_text.side_effect = lambda pages, config, stats: iter([{'number': page} for page in pages])
+    mock_save_items.side_effect = lambda items, path, output_format: list(items)
+
+    main()
+
+    assert isinstance(mock_analyze_text.call_args.kwargs['stats'], dict)
+    with open(mock_args.metrics_json, encoding='utf-8') as f:
+        report = json.load(f)
+    assert [stage['stage'] for stage in report['stages']] == ['extract', 'preprocess', 'analyze', 'write']
+    assert [stage['count'] for stage in report['stages']] == [2, 2, 2, 2]
+
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.save_items')
+@patch('extract_tool.analyze_text')
+@patch('extract_tool.get_page_count', return_value=400)
+@patch('extract_tool.find_answer_section', return_value=299)
+@patch('extract_tool.extract_pages')
+def test_main_flow_page_selection(mock_extract_pages, mock_find_answer_section, mock_get_page_count,
+                                  mock_analyze_text, mock_save_items, mock_argparse, mock_load_config):
+    """
+    Tests that --pages, --answer-section and --sample select the pages passed to extract_pages.
+    """
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'input.pdf'
+    mock_args.output_path = 'output.csv'
+    mock_args.pages = '120-340'
+    mock_argparse.return_value.parse_args.return_value = mock_args
+
+    main()
+    assert mock_extract_pages.call_args.kwargs['pages'] == list(range(119, 340))
+    mock_find_answer_section.assert_not_called()
+
+    mock_args.answer_section = True
+    main()
+    assert mock_extract_pages.call_args.kwargs['pages'] == list(range(299, 340))
+
+    mock_args.sample = 5
+    main()
+    sample = mock_extract_pages.call_args.kwargs['pages']
+    assert len(sample) == 5 and sample == sorted(sample) and sample[0] >= 299
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.run_checkpointed')
+@patch('extract_tool.save_items')
+@patch('extract_tool.extract_pages')
+def test_main_checkpointed_run(mock_extract_pages, mock_save_items, mock_run_checkpointed, mock_argparse, mock_load_config):
+    """
+    Tests that --checkpoint-every and --resume delegate to run_checkpointed,
+    and that unsupported combinations are rejected.
+    """
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'input.pdf'
+    mock_args.output_path = 'output.jsonl'
+    mock_args.resume = True
+    mock_argparse.return_value.parse_args.return_value = mock_args
+    mock_run_checkpointed.return_value = {'pages': 8, 'items': 30, 'resumed_at': 40, 'checkpoints': 0}
+
+    main()
+
+    mock_run_checkpointed.assert_called_once_with('input.pdf', 'output.jsonl', {"mock_config": True}, preprocess=False,
+                                                  output_format=None, pages=None, workers=1,
+                                                  cache_dir=default_cache_dir(), every=None, resume=True)
+    mock_extract_pages.assert_not_called()
+    mock_save_items.assert_not_called()
+
+    mock_run_checkpointed.reset_mock()
+    mock_args.output_path = 'output.parquet'
+    main()
+    mock_args.output_path = 'output.csv'
+    mock_args.dedup_index = 'index.sqlite'
+    main()
+    mock_run_checkpointed.assert_not_called()
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.save_items')
+@patch('extract_tool.analyze_text')
+@patch('extract_tool.triage_pdf')
+@patch('extract_tool.extract_pages')
+def test_main_flow_triage(mock_extract_pages, mock_triage_pdf, mock_analyze_text, mock_save_items,
+                          mock_argparse, mock_load_config):
+    """
+    Tests that --triage skip leaves pages without a text layer out of the
+    extraction, while --triage flag only reports them.
+    """
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'input.pdf'
+    mock_args.output_path = 'output.csv'
+    mock_args.triage = 'skip'
+    mock_argparse.return_value.parse_args.return_value = mock_args
+    mock_triage_pdf.return_value = {
+        'pdf': 'input.pdf', 'document': 'mixed',
+        'counts': {'text': 2, 'mixed': 0, 'image_only': 1, 'blank': 0},
+        'pages_without_text': [2],
+        'pages': [{'page': 1, 'kind': 'text'}, {'page': 2, 'kind': 'image_only'}, {'page': 3, 'kind': 'text'}],
+    }
+
+    main()
+    mock_triage_pdf.assert_called_once_with('input.pdf', None)
+    assert mock_extract_pages.call_args.kwargs['pages'] == [0, 2]
+
+    mock_args.triage = 'flag'
+    main()
+    assert mock_extract_pages.call_args.kwargs['pages'] is None
+
+@patch('extract_tool.load_config', return_value={"mock_config": True})
+@patch('extract_tool.argparse.ArgumentParser')
+@patch('extract_tool.collect_pdf_paths', return_value=['a.pdf', 'b.pdf'])
+@patch('extract_tool.triage_pdf')
+@patch('extract_tool.extract_pages')
+def test_main_triage_only_batch(mock_extract_pages, mock_triage_pdf, mock_collect_pdf_paths,
+                                mock_argparse, mock_load_config, tmp_path):
+    """Tests that --triage-only --batch writes one report line per PDF and extracts nothing."""
+    mock_args = make_mock_args()
+    mock_args.pdf_path = 'books/'
+    mock_args.output_path = str(tmp_path / "triage.jsonl")
+    mock_args.batch = True
+    mock_args.triage_only = True
+    mock_argparse.return_value.parse_args.return_value = mock_args
+    mock_triage_pdf.side_effect = lambda path: {'pdf': path, 'document': 'text', 'pages_without_text': [],
+                                                'counts': {'text': 1, 'mixed': 0, 'image_only': 0, 'blank': 0}}
+
+    main()
+
+    lines = (tmp_path / "triage.jsonl").read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['pdf'] for line in lines] == ['a.pdf', 'b.pdf']
+    mock_extract_pages.assert_not_called()
@@ -0,0 +1,130 @@
+import csv
+import json
+import pytest
+from modules.incremental import run_incremental, manifest_path_for
+from modules.config_loader import load_config
+
+def _page_lines(page_number, fixed=False):
+    """Two items per page; the odd-numbered ones run over to the next page."""
+    first = page_number * 2 + 1
+    word = "corrected" if fixed else "original"
+    return [
+        f"continued explanation from page {page_number}",
+        f"{first:02d} Problem {first}",
+        f"Explanation {first} is {word} text.",
+        f"{first + 1:02d} Problem {first + 1}",
+        f"Explanation {first + 1} starts here and",
+    ]
+
+def _write_book(path, page_count, fixed_pages=()):
+    import fitz
+    doc = fitz.open()
+    for page_number in range(page_count):
+        page = doc.new_page()
+        page.insert_text((72, 72), "\n".join(_page_lines(page_number, page_number in fixed_pages)))
+    doc.save(str(path))
+    doc.close()
+
+def _read_rows(path):
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        return list(csv.reader(f))
+
+@pytest.fixture
+def config():
+    return load_config()
+
+def test_incremental_matches_full_run_after_page_fix(tmp_path, config):
+    """
+    Tests that only the pages around a corrected page are re-extracted and the
+    spliced CSV equals a full run on the corrected PDF.
+    """
+    book = tmp_path / "book.pdf"
+    output = str(tmp_path / "out.csv")
+    _write_book(book, 20)
+    first = run_incremental(str(book), output, config)
+    assert first['mode'] == 'full'
+    assert first['items'] == 40
+
+    _write_book(book, 20, fixed_pages={9})
+    stats = run_incremental(str(book), output, config)
+
+    reference = str(tmp_path / "reference.csv")
+    run_incremental(str(book), reference, config)
+
+    assert stats['mode'] == 'incremental'
+    assert stats['pages_extracted'] <= 4
+    assert stats['items_reparsed'] < 10
+    assert _read_rows(output) == _read_rows(reference)
+    assert "corrected" in _read_rows(output)[19][2]
+    with open(manifest_path_for(output), encoding='utf-8') as f, open(manifest_path_for(reference), encoding='utf-8') as g:
+        assert json.load(f) == json.load(g)
+
+def test_incremental_fix_on_first_and_last_pages(tmp_path, config):
+    book = tmp_path / "book.pdf"
+    output = str(tmp_path / "out.csv")
+    _write_book(book, 6)
+    run_incremental(str(book), output, config)
+
+    _write_book(book, 6, fixed_pages={0, 5})
+    stats = run_incremental(str(book), output, config)
+
+    reference = str(tmp_path / "reference.csv")
+    run_incremental(str(book), reference, config)
+    assert stats['mode'] == 'incremental'
+    assert _read_rows(output) == _read_rows(reference)
+
+def test_incremental_unchanged_pdf(tmp_path, config):
+    book = tmp_path / "book.pdf"
+    output = str(tmp_path / "out.csv")
+    _write_book(book, 3)
+    run_incremental(str(book), output, config)
+
+    stats = run_incremental(str(book), output, config)
+    assert stats['mode'] == 'unchanged'
+    assert stats['pages_extracted'] == 0
+
+def test_incremental_falls_back_to_full_run(tmp_path, config):
+    """Tests that a different config or page count forces a full run."""
+    book = tmp_path / "book.pdf"
+    output = str(tmp_path / "out.csv")
+    _write_book(book, 3)
+    run_incremental(str(book), output, config)
+
+    assert run_incremental(str(book), output, config, preprocess=True)['mode'] == 'full'
+
+    _write_book(book, 4)
+    assert run_incremental(str(book), output, config, preprocess=True)['mode'] == 'full'
+
+def _write_form_book(path, text, image_shade=None):
+    """One page whose text sits in a Form XObject, optionally over an image."""
+    import fitz
+    source = fitz.open()
+    source.new_page().insert_text((72, 72), text)
+    doc = fitz.open()
+    page = doc.new_page()
+    page.show_pdf_page(page.rect, source, 0)
+    if image_shade is not None:
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), False)
+        pixmap.clear_with(image_shade)
+        page.insert_image(fitz.Rect(300, 300, 340, 340), stream=pixmap.tobytes('png'))
+    doc.save(str(path))
+    doc.close()
+    source.close()
+
+def test_fingerprints_cover_referenced_resources(tmp_path):
+    """
+    Tests that a change inside a Form XObject or an image changes the page
+    fingerprint, although the page's own content stream stays the same.
+    """
+    from modules.pdf_extractor import page_fingerprints
+    paths = [tmp_path / f"{name}.pdf" for name in ("old", "new", "old_again", "light", "dark")]
+    _write_form_book(paths[0], "01 Old text")
+    _write_form_book(paths[1], "01 New text")
+    _write_form_book(paths[2], "01 Old text")
+    _write_form_book(paths[3], "01 Old text", image_shade=200)
+    _write_form_book(paths[4], "01 Old text", image_shade=20)
+
+    old, new, old_again, light, dark = (page_fingerprints(str(path)) for path in paths)
+    assert old != new
+    assert old == old_again
+    assert light != dark
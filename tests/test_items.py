@@ -0,0 +1,56 @@
+import json
+from modules.items import Item, SubItem, as_item
+from modules.csv_generator import _flatten_item_for_csv
+from modules.output_writers import _structured_item
+from modules.text_analyzer import analyze_text
+from modules.config_loader import load_config
+
+ITEM_DICT = {'number': '01', 'title': '생물의 특성', 'body': '석순은 생물이 아니다.',
+             'explanation_items': [{'label': 'ㄱ', 'text': '물질대사'}, {'label': 'ㄴ', 'text': '광합성'}]}
+
+def test_sub_item_slices_its_text_on_demand():
+    source = "ㄱ.  물질대사는 생물의 특성이다."
+    sub_item = SubItem('ㄱ', source, 4, len(source))
+
+    assert sub_item.text == "물질대사는 생물의 특성이다."
+    assert sub_item.source is source
+    assert SubItem('ㄴ', '광합성').text == '광합성'
+    assert not hasattr(sub_item, '__dict__')
+
+def test_item_reads_like_the_item_dictionary():
+    item = as_item(ITEM_DICT)
+
+    assert isinstance(item.explanation_items[0], SubItem)
+    assert item == ITEM_DICT
+    assert item.as_dict() == ITEM_DICT
+    assert type(item.as_dict()['explanation_items'][0]) is dict
+    assert item['number'] == '01' and item.get('missing', 'x') == 'x'
+    assert 'item_id' not in item
+    assert json.loads(json.dumps(item.as_dict(), ensure_ascii=False)) == ITEM_DICT
+    assert not hasattr(item, '__dict__')
+
+def test_item_dedup_ids_become_keys_once_set():
+    item = Item('07', '', '', None, item_id=3, duplicate_of=3)
+
+    assert item.explanation_items == []
+    assert item['duplicate_of'] == 3
+    assert item.as_dict() == {'number': '07', 'title': '', 'body': '', 'explanation_items': [],
+                              'item_id': 3, 'duplicate_of': 3}
+
+def test_writers_format_items_and_dicts_alike():
+    item = as_item(ITEM_DICT)
+    assert _flatten_item_for_csv(item) == _flatten_item_for_csv(ITEM_DICT)
+    assert _structured_item(item) == _structured_item(ITEM_DICT)
+
+    deduplicated = Item('07', '', '', None, item_id=3, duplicate_of=3)
+    assert _flatten_item_for_csv(deduplicated) == _flatten_item_for_csv(deduplicated.as_dict())
+
+def test_analyze_text_yields_items_with_offset_sub_items():
+    text = "01 생물의 특성\n본문\nㄱ.  물질대사 \nㄴ. 광합성\n02 다음\n끝\n"
+    items = list(analyze_text(iter([text]), load_config()))
+
+    assert all(type(item) is Item for item in items)
+    sub_item = items[0].explanation_items[0]
+    assert (sub_item.label, sub_item.text) == ('ㄱ', '물질대사')
+    assert sub_item.source == "ㄱ.  물질대사"
+    assert items[0].as_dict()['explanation_items'] == [{'label': 'ㄱ', 'text': '물질대사'}, {'label': 'ㄴ', 'text': '광합성'}]
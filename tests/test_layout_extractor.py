@@ -0,0 +1,136 @@
+import pytest
+import fitz
+from modules.layout_extractor import LineRecord, extract_lines, find_headers, analyze_lines, lines_to_text
+from modules.pdf_extractor import extract_pages
+from modules.text_analyzer import analyze_text
+
+MOCK_CONFIG = {
+    "problem_patterns": {
+        "stream": r'^(?P<number>\d+)\s+(?P<problem>.*?)\n(?P<explanation>.*?)(?=\n\d+\s)',
+        "final": r'^(?P<number>\d+)\s+(?P<problem>.*?)\n(?P<explanation>.*?)(?=\n\d+\s|\Z)',
+    },
+    "explanation_patterns": {
+        "sub_item": r'^(?P<label>[ㄱ-ㅎ])\s*\.\s*(?P<text>.*)',
+        "first_item_delimiter": r'\n(?=[ㄱ-ㅎ]\s*\.)',
+        "item_split_delimiter": r'\n(?=[ㄱ-ㅎ]\s*\.)',
+    },
+}
+
+def _write(page, x, y, lines, header_lines=()):
+    """Writes lines top-down; the indices in header_lines are set in a larger font."""
+    for index, text in enumerate(lines):
+        page.insert_text((x, y), text, fontname='korea', fontsize=12 if index in header_lines else 9)
+        y += 16
+
+@pytest.fixture
+def two_column_pdf(tmp_path):
+    """A page with a full-width title and two columns; item 2 continues from the left column into the right one."""
+    pdf_path = str(tmp_path / "two_column.pdf")
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    page.insert_text((40, 40), "생명과학 정답과 해설 - 전체 제목이 페이지 가운데를 가로지른다 (2024)", fontname='korea', fontsize=10)
+    left = ["1 세포의 특성", "세포는 생명의 기본 단위이다.", "ㄱ. 맞다", "2 효소", "효소는 촉매이다."]
+    right = ["기질 특이성이 있다.", "ㄱ. 옳다", "ㄴ. 틀리다", "3 호흡", "3개의 단계로 일어난다."]
+    _write(page, 40, 80, left, header_lines={0, 3})
+    _write(page, 320, 80, right, header_lines={3})
+    doc.save(pdf_path)
+    doc.close()
+    return pdf_path
+
+def _record(text, x0=40.0, size=9.0, bold=False, column=0):
+    return LineRecord(0, x0, 0.0, x0 + 100, 10.0, size, bold, text, column)
+
+def test_extract_lines_reads_columns_in_order(two_column_pdf):
+    """
+    Tests that a two-column page is read column by column after its full-width title.
+    """
+    pages = list(extract_lines(two_column_pdf))
+
+    assert len(pages) == 1
+    texts = [line.text for line in pages[0]]
+    assert texts[0].startswith("생명과학 정답과 해설")
+    assert texts[1:6] == ["1 세포의 특성", "세포는 생명의 기본 단위이다.", "ㄱ. 맞다", "2 효소", "효소는 촉매이다."]
+    assert texts[6:] == ["기질 특이성이 있다.", "ㄱ. 옳다", "ㄴ. 틀리다", "3 호흡", "3개의 단계로 일어난다."]
+    assert [line.column for line in pages[0]] == [0] * 6 + [1] * 5
+    assert not hasattr(pages[0][0], '__dict__')
+
+def test_find_headers_uses_font_and_position():
+    """
+    Tests that only numbered lines at the column edge set in a larger or bold font are headers.
+    """
+    lines = [
+        _record("1 세포", size=12),
+        _record("세포는 생명의 기본 단위이다. 긴 본문 줄이 이어진다."),
+        _record("2 개의 핵이 있다."),  # body font: a wrapped body line
+        _record("3 효소", x0=60, size=12),  # indented
+        _record("4 호흡", bold=True),
+        _record("5 확인", x0=320, size=12, column=1),
+    ]
+
+    assert find_headers(lines) == [True, False, False, False, True, True]
+
+def test_find_headers_accepts_a_title_right_after_the_period():
+    """Tests that '1.생물의 특성', without a space after the period, is a header like '1. 생물의 특성'."""
+    for header in ("1.생물의 특성", "1. 생물의 특성"):
+        lines = [_record(header, size=14, bold=True), _record("생물은 물질대사를 한다.", size=10),
+                 _record("세포로 이루어져 있다.", size=10)]
+        assert find_headers(lines) == [True, False, False]
+        items = list(analyze_lines(iter([lines]), MOCK_CONFIG))
+        assert [(item['number'], item['title']) for item in items] == [('1', "생물의 특성")]
+
+def test_find_headers_uniform_font_falls_back_to_position():
+    """
+    Tests that a page set in one font finds headers by the line start and shape alone.
+    """
+    lines = [_record("01 세포"), _record("본문"), _record("02. 효소"), _record("  3 mol", x0=50),
+             _record("12"), _record("13.")]  # page numbers
+    assert find_headers(lines) == [True, False, True, False, False, False]
+
+def test_analyze_lines_builds_items_across_columns_and_pages(two_column_pdf):
+    """
+    Tests that items are delimited by headers, including one continuing into the next column and page.
+    """
+    continuation = [_record("다음 페이지의 해설"), _record("ㄷ. 추가")]
+    pages = list(extract_lines(two_column_pdf)) + [continuation]
+    stats = {}
+
+    items = list(analyze_lines(iter(pages), MOCK_CONFIG, stats=stats))
+
+    assert [item['number'] for item in items] == ['1', '2', '3']
+    assert items[0]['explanation_items'] == [{'label': 'ㄱ', 'text': '맞다'}]
+    assert items[1]['body'] == "효소는 촉매이다.\n기질 특이성이 있다."
+    assert [sub['label'] for sub in items[1]['explanation_items']] == ['ㄱ', 'ㄴ']
+    # '3개의' starts with a digit but is body text
+    assert items[2]['title'] == "호흡"
+    assert items[2]['body'] == "3개의 단계로 일어난다.\n다음 페이지의 해설"
+    assert stats['peak_buffer_chars'] > 0
+
+@pytest.mark.parametrize("policy, numbers", [("flush", ['1', '2']), ("skip", ['2'])])
+def test_analyze_lines_caps_a_runaway_explanation(policy, numbers):
+    """
+    Tests that an explanation without a following header is cut at max_buffer_chars by the overflow policy.
+    """
+    config = dict(MOCK_CONFIG, matching={"max_buffer_chars": 40, "overflow_policy": policy})
+    pages = [[_record("1 세포", size=12), _record("세포의 짧은 해설")],
+             [_record("본문 " * 10)] * 3,
+             [_record("2 효소", size=12), _record("효소의 해설이 이어진다.")]]
+    stats = {}
+
+    items = list(analyze_lines(iter(pages), config, stats=stats))
+
+    assert [item['number'] for item in items] == numbers
+    assert stats['buffer_overflows'] == {policy: 1}
+
+def test_layout_mode_text_matches_regex_analysis(two_column_pdf):
+    """
+    Tests that extract_pages in layout mode feeds the regex analyzer the columns in reading order.
+    """
+    pages = list(extract_pages(two_column_pdf, mode='layout'))
+
+    assert pages == [lines_to_text(next(extract_lines(two_column_pdf)))]
+    items = list(analyze_text(iter(pages), MOCK_CONFIG))
+    assert [item['number'] for item in items] == ['1', '2', '3']
+
+def test_extract_pages_rejects_unknown_mode(two_column_pdf):
+    with pytest.raises(ValueError):
+        list(extract_pages(two_column_pdf, mode='html'))
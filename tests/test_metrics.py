@@ -0,0 +1,57 @@
+import json
+import time
+from modules.metrics import PipelineMetrics, instrument, measure_sink, text_size, item_size
+
+def _slow(iterator, seconds):
+    for value in iterator:
+        time.sleep(seconds)
+        yield value
+
+def test_stage_times_exclude_upstream_time(tmp_path):
+    """
+    Tests that time spent in an upstream generator is attributed to that
+    stage only, not to the stages pulling from it.
+    """
+    metrics = PipelineMetrics()
+    pages = metrics.stage('extract', _slow(iter(["가나다", "abc"] * 5), 0.02), 'pages', text_size)
+    items = metrics.stage('analyze', _slow(pages, 0.005), 'items')
+    with metrics.sink('write'):
+        for _ in items:
+            time.sleep(0.01)
+
+    stages = {stage['stage']: stage for stage in metrics.report()['stages']}
+    assert stages['extract']['count'] == 10
+    assert stages['extract']['bytes'] == 5 * (9 + 3)
+    assert 0.18 <= stages['extract']['wall_seconds'] < 0.4
+    assert 0.04 <= stages['analyze']['wall_seconds'] < 0.15
+    assert 0.09 <= stages['write']['wall_seconds'] < 0.25
+    assert stages['write']['count'] == 10
+    # Sleeping costs no CPU time
+    assert stages['extract']['cpu_seconds'] < 0.1
+
+    path = tmp_path / "metrics.json"
+    metrics.write_json(str(path))
+    report = json.loads(path.read_text(encoding='utf-8'))
+    assert [stage['stage'] for stage in report['stages']] == ['extract', 'analyze', 'write']
+    assert report['stages'][0]['per_second'] > 0
+    assert report['total_wall_seconds'] >= 0.3
+
+def test_extra_stage_statistics_are_reported():
+    metrics = PipelineMetrics()
+    stats = {}
+    list(metrics.stage('analyze', iter([1, 2]), extra=stats))
+    stats['peak_buffer_chars'] = 42
+
+    assert metrics.report()['stages'][0]['peak_buffer_chars'] == 42
+    assert "peak buffer 42 chars" in metrics.summary_lines()[0]
+
+def test_disabled_metrics_leave_stages_untouched():
+    pages = iter(["page"])
+    assert instrument(None, 'extract', pages) is pages
+    with measure_sink(None, 'write') as record:
+        assert record is None
+
+def test_item_size():
+    item = {'number': '01', 'title': '생물', 'body': 'b',
+            'explanation_items': [{'label': 'ㄱ', 'text': 'xy'}]}
+    assert item_size(item) == 2 + 6 + 1 + 3 + 2
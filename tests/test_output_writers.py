@@ -0,0 +1,69 @@
+import json
+import sys
+import pytest
+from unittest.mock import patch
+from modules.output_writers import save_items, save_to_jsonl, save_to_parquet, resolve_output_format
+
+ITEMS = [
+    {
+        'number': '01',
+        'title': '생물의 특성',
+        'body': 'This is the body of problem 1.',
+        'explanation_items': [
+            {'label': 'ㄱ', 'text': '물질대사'},
+            {'label': 'ㄴ', 'text': 'Choice B'},
+        ]
+    },
+    {
+        'number': '02',
+        'title': 'Problem 2',
+        'body': 'This is the body of problem 2.',
+        'explanation_items': []
+    }
+]
+
+@pytest.mark.parametrize("path, output_format, expected", [
+    ("out.jsonl", None, 'jsonl'),
+    ("out.NDJSON", None, 'jsonl'),
+    ("out.parquet", None, 'parquet'),
+    ("out.feather", None, 'arrow'),
+    ("out.csv", None, 'csv'),
+    ("out", None, 'csv'),
+    ("out.csv", 'jsonl', 'jsonl'),
+])
+def test_resolve_output_format(path, output_format, expected):
+    assert resolve_output_format(path, output_format) == expected
+
+def test_resolve_output_format_unknown():
+    with pytest.raises(ValueError):
+        resolve_output_format("out.csv", "xlsx")
+
+def test_save_to_jsonl_keeps_sub_items(tmp_path):
+    output_file = tmp_path / "items.jsonl"
+
+    save_to_jsonl(iter(ITEMS), str(output_file))
+
+    with open(output_file, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line) for line in lines] == ITEMS
+    assert '생물의 특성' in lines[0]  # Written as UTF-8, not escaped
+
+def test_save_items_format_adds_extension(tmp_path):
+    save_items(iter(ITEMS), str(tmp_path / "items"), 'jsonl')
+    assert (tmp_path / "items.jsonl").exists()
+
+def test_save_to_parquet_without_pyarrow(tmp_path):
+    with patch.dict(sys.modules, {'pyarrow': None}):
+        with pytest.raises(ImportError, match="pyarrow"):
+            save_to_parquet(iter(ITEMS), str(tmp_path / "items.parquet"))
+
+def test_save_to_parquet_row_groups(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    output_file = tmp_path / "items.parquet"
+
+    save_to_parquet(iter(ITEMS * 5), str(output_file), batch_size=4)
+
+    parquet_file = pq.ParquetFile(str(output_file))
+    assert parquet_file.metadata.num_row_groups == 3
+    assert parquet_file.read().to_pylist() == ITEMS * 5
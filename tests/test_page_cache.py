@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+import pytest
+from unittest.mock import patch
+from modules.page_cache import PageCache, CACHE_EXTENSION
+from modules.pdf_extractor import extract_pages
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """Creates a small real PDF with one numbered line per page."""
+    import fitz
+    pdf_path = tmp_path / "sample.pdf"
+    doc = fitz.open()
+    for page_number in range(3):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"{page_number + 1:02d} Problem {page_number + 1}")
+    doc.save(str(pdf_path))
+    doc.close()
+    return str(pdf_path)
+
+def test_cache_hit_does_not_open_pdf(sample_pdf, tmp_path):
+    """
+    Tests that the second extraction is served from the cache without fitz.
+    """
+    cache_dir = str(tmp_path / "cache")
+    first = list(extract_pages(sample_pdf, cache_dir=cache_dir))
+
+    with patch('modules.pdf_extractor.fitz.open') as mock_open:
+        second = list(extract_pages(sample_pdf, cache_dir=cache_dir))
+        mock_open.assert_not_called()
+
+    assert second == first
+    assert len(first) == 3
+
+def test_cache_hit_does_not_import_pymupdf(sample_pdf, tmp_path):
+    """
+    Tests in a fresh interpreter that a cache hit never loads PyMuPDF, which
+    costs more than the whole cached run.
+    """
+    cache_dir = str(tmp_path / "cache")
+    list(extract_pages(sample_pdf, cache_dir=cache_dir))
+    script = ("import sys\n"
+              "from modules.pdf_extractor import extract_pages\n"
+              "from modules.lazy_import import is_loaded\n"
+              "pages = list(extract_pages(sys.argv[1], cache_dir=sys.argv[2]))\n"
+              "print(len(pages), is_loaded('fitz'), 'pymupdf' in sys.modules)\n")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run([sys.executable, '-c', script, sample_pdf, cache_dir], cwd=root,
+                               capture_output=True, text=True, check=True)
+    assert completed.stdout.split() == ['3', 'False', 'False']
+
+def test_cache_roundtrip_unicode_and_empty_pages(tmp_path):
+    cache = PageCache(str(tmp_path))
+    pages = ["01 생물의 특성\nㄱ. 물질대사", "", "마지막 ﬁ 페이지\n"]
+
+    assert list(cache.write_through("key", iter(pages))) == pages
+    assert list(cache.read("key")) == pages
+    assert cache.read("missing") is None
+
+def test_cache_key_depends_on_content_and_options(sample_pdf, tmp_path):
+    cache = PageCache(str(tmp_path / "cache"))
+    key = cache.key_for(sample_pdf, {'mode': 'text'})
+
+    assert cache.key_for(sample_pdf, {'mode': 'text'}) == key
+    assert cache.key_for(sample_pdf, {'mode': 'layout'}) != key
+
+    with open(sample_pdf, 'ab') as f:
+        f.write(b'\n% edited')
+    assert cache.key_for(sample_pdf, {'mode': 'text'}) != key
+
+def test_interrupted_extraction_is_not_cached(tmp_path):
+    cache = PageCache(str(tmp_path))
+    stream = cache.write_through("key", iter(["page 1", "page 2"]))
+    next(stream)
+    stream.close()
+
+    assert cache.read("key") is None
+    assert os.listdir(tmp_path) == []
+
+def test_corrupt_entry_is_treated_as_miss(tmp_path):
+    cache = PageCache(str(tmp_path))
+    (tmp_path / ("key" + CACHE_EXTENSION)).write_bytes(b"garbage")
+
+    assert cache.read("key") is None
+    assert os.listdir(tmp_path) == []
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=250)
+    page = "x" * 60
+
+    list(cache.write_through("old", iter([page])))
+    list(cache.write_through("used", iter([page])))
+    os.utime(tmp_path / ("old" + CACHE_EXTENSION), (1, 1))
+    os.utime(tmp_path / ("used" + CACHE_EXTENSION), (2, 2))
+    list(cache.read("used"))  # Marks 'used' as most recently used
+    list(cache.write_through("new", iter([page])))
+
+    assert cache.read("old") is None
+    assert list(cache.read("used")) == [page]
+    assert list(cache.read("new")) == [page]
+
+def test_cache_serves_selected_pages_without_storing_partial_documents(sample_pdf, tmp_path):
+    """
+    Tests that a page selection reads a cached document randomly and never
+    caches a partial one.
+    """
+    cache_dir = str(tmp_path / "cache")
+    partial = list(extract_pages(sample_pdf, cache_dir=cache_dir, pages=[2, 0]))
+    assert not os.path.exists(cache_dir) or not os.listdir(cache_dir)
+
+    full = list(extract_pages(sample_pdf, cache_dir=cache_dir))
+    with patch('modules.pdf_extractor.fitz.open') as mock_open:
+        cached = list(extract_pages(sample_pdf, cache_dir=cache_dir, pages=[2, 0]))
+        mock_open.assert_not_called()
+
+    assert cached == partial == [full[2], full[0]]
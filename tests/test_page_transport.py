@@ -0,0 +1,84 @@
+import pytest
+from concurrent.futures import Future
+from unittest.mock import patch
+from modules.page_transport import PageRing, write_pages
+from modules.pdf_extractor import extract_pages
+
+def test_pages_round_trip_through_a_slot():
+    pages = ["01 생물의 특성\nㄱ. 세포", "", "page three ✓"]
+    with PageRing(slots=2, slot_size=1024) as ring:
+        slot = ring.acquire()
+        lengths, overflow = write_pages(ring.name, slot, ring.slot_size, pages)
+
+        assert overflow == []
+        assert lengths == [len(page.encode('utf-8')) for page in pages]
+        assert list(ring.read_pages(slot, lengths)) == pages
+
+def test_pages_that_do_not_fit_are_returned_inline():
+    pages = ["가" * 10, "b" * 10, "c" * 5]
+    with PageRing(slots=1, slot_size=35) as ring:
+        lengths, overflow = write_pages(ring.name, 0, ring.slot_size, pages)
+
+        assert lengths == [30]
+        assert overflow == ["b" * 10, "c" * 5]
+        assert list(ring.read_pages(0, lengths)) == pages[:1]
+
+def test_ring_capacity_is_bounded():
+    with PageRing(slots=2, slot_size=16) as ring:
+        first, second = ring.acquire(), ring.acquire()
+        with pytest.raises(IndexError):
+            ring.acquire()
+        ring.release(first)
+        assert ring.acquire() == first
+    assert ring.memory is None
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    import fitz
+    pdf_path = tmp_path / "sample.pdf"
+    doc = fitz.open()
+    for page_number in range(7):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"{page_number + 1:02d} 문제 {page_number + 1}")
+    doc.save(str(pdf_path))
+    doc.close()
+    return str(pdf_path)
+
+def test_parallel_extraction_transports_match(sample_pdf):
+    expected = list(extract_pages(sample_pdf))
+    assert list(extract_pages(sample_pdf, workers=2, chunk_size=2, transport='shm')) == expected
+    assert list(extract_pages(sample_pdf, workers=2, chunk_size=2, transport='pickle')) == expected
+    with pytest.raises(ValueError):
+        list(extract_pages(sample_pdf, workers=2, transport='queue'))
+
+class _InlineExecutor:
+    """Runs tasks at submit time in this process and records how many were submitted."""
+    submitted = 0
+
+    def __init__(self, max_workers):
+        pass
+
+    def submit(self, function, *args):
+        _InlineExecutor.submitted += 1
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+def test_slow_consumer_holds_back_the_extractors(sample_pdf):
+    """
+    Tests that no more chunks are submitted than the ring has slots until
+    the consumer has taken the pages of the oldest one.
+    """
+    _InlineExecutor.submitted = 0
+    with patch('concurrent.futures.ProcessPoolExecutor', _InlineExecutor):
+        pages = extract_pages(sample_pdf, workers=2, chunk_size=1)
+        first = next(pages)
+        # Two slots per worker.
+        assert _InlineExecutor.submitted == 4
+        rest = list(pages)
+
+    assert _InlineExecutor.submitted == 7
+    assert [first] + rest == list(extract_pages(sample_pdf))
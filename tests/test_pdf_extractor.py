@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import MagicMock, patch
-from modules.pdf_extractor import extract_pages
+from modules.pdf_extractor import extract_pages, parse_page_ranges, sample_pages, find_answer_section, pymupdf_version
 
 @pytest.fixture
 def mock_fitz_open():
@@ -56,4 +56,101 @@ def test_extract_pages_empty_pdf(mock_fitz_open):
     
     result = extract_pages(pdf_path)
     
-    assert list(result) == [] 
\ No newline at end of file
+    assert list(result) == [] 
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """Creates a small real PDF with one numbered line per page."""
+    import fitz
+    pdf_path = tmp_path / "sample.pdf"
+    doc = fitz.open()
+    for page_number in range(7):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"{page_number + 1:02d} Problem {page_number + 1}")
+    doc.save(str(pdf_path))
+    doc.close()
+    return str(pdf_path)
+
+def test_extract_pages_parallel_preserves_page_order(sample_pdf):
+    """
+    Tests that parallel extraction yields the same pages, in the same order,
+    as serial extraction.
+    """
+    serial = list(extract_pages(sample_pdf))
+    parallel = list(extract_pages(sample_pdf, workers=2, chunk_size=2))
+
+    assert len(serial) == 7
+    assert parallel == serial
+    assert "07 Problem 7" in parallel[-1]
+
+def test_extract_pages_selected_pages(sample_pdf):
+    """
+    Tests that only the selected pages are extracted, serially and in parallel.
+    """
+    serial = list(extract_pages(sample_pdf))
+    selected = [1, 2, 5]
+
+    assert list(extract_pages(sample_pdf, pages=selected)) == [serial[i] for i in selected]
+    assert list(extract_pages(sample_pdf, workers=2, chunk_size=1, pages=selected)) == [serial[i] for i in selected]
+
+@pytest.mark.parametrize("spec, expected", [
+    ("3", [2]),
+    ("2-4", [1, 2, 3]),
+    ("1-2,6-", [0, 1, 5, 6]),
+    ("-2, 2-3", [0, 1, 2]),
+    ("5,1", [0, 4]),
+])
+def test_parse_page_ranges(spec, expected):
+    assert parse_page_ranges(spec, 7) == expected
+
+@pytest.mark.parametrize("spec", ["0-3", "4-2", "a-b", "6-9", ",", "1-2-3"])
+def test_parse_page_ranges_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_page_ranges(spec, 7)
+
+def test_sample_pages_is_sorted_and_reproducible():
+    pages = list(range(100, 200))
+    sample = sample_pages(pages, 10)
+
+    assert len(sample) == 10
+    assert sample == sorted(sample)
+    assert set(sample) <= set(pages)
+    assert sample_pages(pages, 10) == sample
+    assert sample_pages(pages, 500) == pages
+
+def test_find_answer_section_uses_outline(sample_pdf, tmp_path):
+    """
+    Tests that the answer section is found from the table of contents, and None without one.
+    """
+    import fitz
+    assert find_answer_section(sample_pdf) is None
+
+    doc = fitz.open(sample_pdf)
+    doc.set_toc([[1, "I. 생명 과학의 이해", 1], [2, "01 생물의 특성", 2], [1, "정답과 해설", 5], [2, "01", 5]])
+    outlined_path = str(tmp_path / "outlined.pdf")
+    doc.save(outlined_path)
+    doc.close()
+
+    assert find_answer_section(outlined_path) == 4
+
+def test_find_answer_section_prefers_specific_titles(sample_pdf, tmp_path):
+    """
+    Tests that a concept chapter titled with a generic word does not win over
+    a later '정답과 해설' entry.
+    """
+    import fitz
+    doc = fitz.open(sample_pdf)
+    while doc.page_count < 8:
+        doc.new_page()
+    doc.set_toc([[1, "I. 생명 과학의 이해", 1], [2, "01 개념 해설", 2], [2, "02 기출 문제", 3], [1, "정답과 해설", 8]])
+    outlined_path = str(tmp_path / "outlined.pdf")
+    doc.save(outlined_path)
+    doc.close()
+
+    assert find_answer_section(outlined_path) == 7
+    # Without a specific title, the generic word is used.
+    assert find_answer_section(outlined_path, keywords=('정답 및 해설', '해설')) == 1
+
+def test_pymupdf_version_matches_fitz():
+    import fitz
+    assert pymupdf_version() == fitz.VersionBind
@@ -0,0 +1,119 @@
+import re
+import random
+import time
+import pytest
+from modules.prefilter import literal_prefilter, anchored_scanner
+
+STREAM = r'^(?P<number>\d+)\s+(?P<problem>.*?)\n(?P<explanation>.*?)(?=\n\d+\s)'
+
+@pytest.mark.parametrize("pattern, flags, literals", [
+    (r'\n(?=[ㄱ-ㅎ]\s*\.)', 0, ('\n', '.')),
+    (r'해설\s*(?P<n>\d+)쪽', 0, ('해설', '쪽')),
+    (r'(?:정답)+ 및 해설', 0, (' 및 해설', '정답')),
+    (r'a?bc', 0, ('bc',)),
+    (r'(?<=ab)c', 0, ('ab', 'c')),
+])
+def test_literal_prefilter_collects_required_literals(pattern, flags, literals):
+    assert literal_prefilter(re.compile(pattern, flags)).literals == literals
+
+@pytest.mark.parametrize("pattern, flags", [
+    (r'(?:ab|cd)', 0),
+    (r'(?!x)\d+', 0),
+    (r'[ㄱ-ㅎ]', 0),
+    (r'abc', re.IGNORECASE),
+    (r'(?:abc)?', 0),
+])
+def test_literal_prefilter_skips_patterns_without_required_literals(pattern, flags):
+    assert literal_prefilter(re.compile(pattern, flags)) is None
+
+def test_literal_prefilter_never_rejects_a_match():
+    pattern = re.compile(r'\n(?=[ㄱ-ㅎ]\s*\.)')
+    prefilter = literal_prefilter(pattern)
+    for text in ["본문\nㄱ. 항목", "본문 ㄱ. 한 줄", "본문\n둘째 줄", "ㄱ\n.", "\nㄴ ."]:
+        if pattern.search(text):
+            assert prefilter.may_match(text)
+    assert not prefilter.may_match("본문 ㄱ. 한 줄")
+    assert not prefilter.may_match("본문\n둘째 줄")
+
+@pytest.mark.parametrize("pattern, flags", [
+    (r'\d+\s', 0),  # not anchored
+    (r'^\d+\s', 0),  # ^ without MULTILINE only matches at 0
+    (r'^(?:\d+)?x', re.MULTILINE),  # first character is optional
+    (r'^(?=\d)\d+', re.MULTILINE),
+])
+def test_anchored_scanner_skips_unsupported_patterns(pattern, flags):
+    assert anchored_scanner(re.compile(pattern, flags)) is None
+
+def _random_text(rng, length):
+    pieces = ['\n', '1', '02', ' ', 'ㄱ', '.', 'a', '해설', '\n3 ', '\n04\t']
+    return ''.join(rng.choice(pieces) for _ in range(length))
+
+@pytest.mark.parametrize("pattern, flags", [
+    (STREAM, re.MULTILINE | re.DOTALL),
+    (r'^(?P<number>\d+)\s+(?P<problem>.*?)\n(?P<explanation>.*?)(?=\n\d+\s|\Z)', re.MULTILINE | re.DOTALL),
+    (r'^\d+\s', re.MULTILINE),
+    (r'^(?P<label>[ㄱ-ㅎ])\s*\.\s*(?P<text>.*)', re.MULTILINE | re.DOTALL),
+    (r'^\d(?<!\n\d)[^\n]*(?=\n\d)', re.MULTILINE),
+    (r'^(\d)+.*?(?=\1)', re.MULTILINE | re.DOTALL),
+    (r'^.\d', re.MULTILINE | re.DOTALL),
+    (r'^[\n\d]\d*\s', re.MULTILINE),
+])
+def test_anchored_scanner_matches_finditer(pattern, flags):
+    """
+    Tests on random line soup that the scanner finds exactly the matches of finditer.
+    """
+    compiled = re.compile(pattern, flags)
+    scanner = anchored_scanner(compiled)
+    assert scanner is not None
+    rng = random.Random(7)
+    for _ in range(300):
+        text = _random_text(rng, rng.randrange(0, 60))
+        expected = [(match.span(), match.groups()) for match in compiled.finditer(text)]
+        assert [(match.span(), match.groups()) for match in scanner.finditer(text)] == expected, text
+        pos = rng.randrange(0, len(text) + 1)
+        expected = [(match.span(), match.groups()) for match in compiled.finditer(text, pos)]
+        assert [(match.span(), match.groups()) for match in scanner.finditer(text, pos)] == expected, (text, pos)
+        starts = [start for start in range(pos, len(text) + 1) if compiled.match(text, start)]
+        assert not starts or scanner.next_start(text, pos) <= starts[0]
+
+def test_anchored_scanner_atom_matching_newline():
+    """
+    Tests that line starts right after one another are all tried when the
+    first atom can match the newline of the next line.
+    """
+    pattern = re.compile(r'^.x', re.MULTILINE | re.DOTALL)
+    scanner = anchored_scanner(pattern)
+    assert [match.span() for match in scanner.finditer("\n\n\nx")] == [(2, 4)]
+
+def test_anchored_scanner_does_not_retry_unterminated_item():
+    """
+    Tests that a start with no terminator after it is not tried at all, so
+    even a catastrophically backtracking pattern returns at once.
+    """
+    pattern = re.compile(r'^(?P<number>\d+) (?P<problem>(?:\w+\s?)+)!\n(?P<explanation>.*?)(?=\n\d+ )', re.MULTILINE | re.DOTALL)
+    scanner = anchored_scanner(pattern)
+    text = "01 ok!\nexplanation\n02 " + "a" * 40 + "\n"
+
+    start = time.perf_counter()
+    matches = list(scanner.finditer(text))
+
+    assert time.perf_counter() - start < 1
+    assert [match.group('number') for match in matches] == ['01']
+
+@pytest.mark.parametrize("lookahead, probes", [
+    (r'(?=\n\d+\s)', True),
+    (r'(?=\n\d+ )', True),
+    (r'(?=문제)', True),
+    (r'(?=\n\n\d)', False),  # a later newline can continue into the next page
+    (r'(?=\n\d+\s\w)', False),
+    (r'(?=\n\d+\s|\Z)', False),  # no terminator at all
+])
+def test_anchored_scanner_line_probe(lookahead, probes):
+    """
+    Tests that the terminator is offered as a line probe only when a match of
+    it cannot run on past a newline other than its first character.
+    """
+    scanner = anchored_scanner(re.compile(r'^(?P<number>\d+)(?P<rest>.*?)' + lookahead, re.MULTILINE | re.DOTALL))
+    assert (scanner.line_probe is not None) == probes
+    if probes:
+        assert scanner.line_probe is scanner.terminator
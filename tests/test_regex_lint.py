@@ -0,0 +1,37 @@
+import re
+import pytest
+from modules.regex_lint import lint_pattern
+
+@pytest.mark.parametrize("pattern, flags", [
+    (r'^(?P<number>\d+)\s+(?P<problem>.*?)\n(?P<explanation>.*?)(?=\n\d+\s)', re.MULTILINE | re.DOTALL),
+    (r'^(?P<label>[ㄱ-ㅎ])\s*\.\s*(?P<text>.*)', re.MULTILINE | re.DOTALL),
+    (r'\n(?=[ㄱ-ㅎ]\s*\.)', 0),
+    (r'(\w+\s)+', 0),
+    (r'(?:\r\n|\n)+', 0),
+    (r'(?:\w++\s?)+', 0),
+    (r'(?>\w+\s?)+', 0),
+])
+def test_safe_patterns(pattern, flags):
+    assert lint_pattern(pattern, flags) == []
+
+@pytest.mark.parametrize("pattern", [
+    r'(a+)+$',
+    r'(\w+\s?)+$',
+    r'^(?P<title>(?:[^\n]+\n?)+)',
+    r'(\w|\d\w)+$',
+    r'(?:\w+|\d)+x',
+])
+def test_exponential_patterns(pattern):
+    assert 'exponential' in [issue['severity'] for issue in lint_pattern(pattern)]
+
+@pytest.mark.parametrize("pattern, flags", [
+    (r'\d+\d+', 0),
+    (r'.*.*x', re.DOTALL),
+    (r'(?P<a>\w+)\s*(?P<b>\w+)!', 0),
+])
+def test_polynomial_patterns(pattern, flags):
+    assert [issue['severity'] for issue in lint_pattern(pattern, flags)] == ['polynomial']
+
+def test_whitespace_overlap_is_not_reported():
+    # \s+ and .*? only overlap on whitespace, whose runs are short in real text
+    assert lint_pattern(r'\s+.*?x') == []
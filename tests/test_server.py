@@ -0,0 +1,157 @@
+import http.client
+import json
+import threading
+import pytest
+from modules.server import (ExtractionService, ServiceBusy, make_unix_server, make_http_server, request_extraction,
+                            MAX_CACHED_CONFIGS)
+from modules.pdf_extractor import extract_pages
+from modules.text_analyzer import analyze_text
+from modules.text_preprocessor import clean_text
+from modules.config_loader import load_config
+
+def _write_pdf(path, page_count):
+    import fitz
+    doc = fitz.open()
+    for page_number in range(page_count):
+        page = doc.new_page()
+        first = page_number * 2 + 1
+        page.insert_text((72, 72), f"{first:02d} Problem {first}\nExplanation {first}\n"
+                                   f"{first + 1:02d} Problem {first + 1}\nExplanation {first + 1}")
+    doc.save(str(path))
+    doc.close()
+
+@pytest.fixture(scope="module")
+def service():
+    service = ExtractionService(workers=1, max_pending=1)
+    yield service
+    service.close()
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    pdf_path = tmp_path / "sample.pdf"
+    _write_pdf(pdf_path, 3)
+    return str(pdf_path)
+
+@pytest.fixture
+def unix_socket(service, tmp_path):
+    socket_path = str(tmp_path / "service.sock")
+    server = make_unix_server(service, socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+
+def test_unix_socket_streams_same_items_as_pipeline(unix_socket, sample_pdf):
+    messages = list(request_extraction(unix_socket, sample_pdf))
+    expected = list(analyze_text(extract_pages(sample_pdf), load_config()))
+
+    assert [m['item'] for m in messages[:-1]] == expected
+    assert messages[-1]['type'] == 'done'
+    assert messages[-1]['items'] == 6
+
+def test_job_errors_are_reported_and_worker_is_reused(unix_socket, sample_pdf, tmp_path):
+    messages = list(request_extraction(unix_socket, str(tmp_path / "missing.pdf")))
+    assert messages[0]['type'] == 'error'
+    assert messages[0]['error'].startswith("FileNotFoundError")
+
+    messages = list(request_extraction(unix_socket, sample_pdf))
+    assert messages[-1]['type'] == 'done'
+
+def test_timeout_replaces_worker(service, sample_pdf):
+    service.job_timeout = 0.0
+    try:
+        with service.job({'pdf_path': sample_pdf}) as messages:
+            assert list(messages) == [{'type': 'error', 'error': 'Job exceeded 0s'}]
+    finally:
+        service.job_timeout = 60.0
+
+    with service.job({'pdf_path': sample_pdf}) as messages:
+        assert list(messages)[-1]['type'] == 'done'
+
+def test_abandoned_job_releases_worker(service, sample_pdf):
+    with service.job({'pdf_path': sample_pdf}) as messages:
+        assert next(messages)['type'] == 'item'
+
+    assert service.status()['active_jobs'] == 0
+    with service.job({'pdf_path': sample_pdf}) as messages:
+        assert list(messages)[-1]['items'] == 6
+
+def test_queue_limit(service, sample_pdf):
+    with service.job({'pdf_path': sample_pdf}), service.job({'pdf_path': sample_pdf}):
+        with pytest.raises(ServiceBusy):
+            with service.job({'pdf_path': sample_pdf}):
+                pass
+
+def test_invalid_job(service):
+    with pytest.raises(ValueError):
+        with service.job({'preprocess': True}):
+            pass
+
+def test_worker_wait_is_bounded(service, sample_pdf):
+    with service.job({'pdf_path': sample_pdf}) as running:
+        assert next(running)['type'] == 'item'
+        service.job_timeout = 0.1
+        try:
+            with service.job({'pdf_path': sample_pdf}) as messages:
+                assert list(messages) == [{'type': 'error', 'error': 'No worker became free within 0.1s'}]
+        finally:
+            service.job_timeout = 60.0
+    assert service.status()['active_jobs'] == 0
+
+def test_config_cache_is_bounded(service, tmp_path):
+    with open("config/default_config.yaml", "rb") as f:
+        default = f.read()
+    for index in range(MAX_CACHED_CONFIGS + 4):
+        path = tmp_path / f"config_{index}.yaml"
+        path.write_bytes(default)
+        service.config_for(str(path))
+    assert len(service._configs) == MAX_CACHED_CONFIGS
+    assert str(tmp_path / "config_0.yaml") not in service._configs
+
+def test_unreadable_config_is_reported(unix_socket, service, sample_pdf, tmp_path):
+    broken = tmp_path / "broken.yaml"
+    broken.write_text("problem_patterns: [unclosed\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        with service.job({'pdf_path': sample_pdf, 'config': str(broken)}):
+            pass
+
+    messages = list(request_extraction(unix_socket, sample_pdf, config=str(broken)))
+    assert messages[0]['type'] == 'error'
+    messages = list(request_extraction(unix_socket, sample_pdf, config=str(tmp_path)))
+    assert messages[0]['type'] == 'error'
+
+def test_http_streams_ndjson(service, sample_pdf, tmp_path):
+    server = make_http_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=60)
+        connection.request('POST', '/extract', body=json.dumps({'pdf_path': sample_pdf, 'preprocess': True}))
+        response = connection.getresponse()
+        assert response.status == 200
+        messages = [json.loads(line) for line in response.read().splitlines()]
+        config = load_config()
+        expected = list(analyze_text((clean_text(page, config) for page in extract_pages(sample_pdf)), config))
+        assert [m['item'] for m in messages[:-1]] == expected
+        assert messages[-1]['type'] == 'done'
+
+        connection.request('POST', '/extract', body=b'not json')
+        response = connection.getresponse()
+        assert response.status == 400
+        response.read()
+
+        broken = tmp_path / "broken.yaml"
+        broken.write_text("problem_patterns: [unclosed\n", encoding="utf-8")
+        for config, status in ((str(broken), 400), (str(tmp_path), 500)):
+            connection.request('POST', '/extract', body=json.dumps({'pdf_path': sample_pdf, 'config': config}))
+            response = connection.getresponse()
+            assert response.status == status
+            assert json.loads(response.read())['type'] == 'error'
+
+        connection.request('GET', '/health')
+        assert json.loads(connection.getresponse().read())['workers'] == 1
+        connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,92 @@
+import random
+import pytest
+from concurrent.futures import Future
+from modules.text_analyzer import analyze_text
+from modules.sharded_analyzer import analyze_text_sharded
+from benchmarks.synthetic import BookSpec, generate_pages
+
+CONFIG = {
+    "problem_patterns": {
+        "stream": r'^(?P<number>\d+)\s+(?P<problem>.*?)\n(?P<explanation>.*?)(?=\n\d+\s)',
+        "final": r'^(?P<number>\d+)\s+(?P<problem>.*?)\n(?P<explanation>.*?)(?=\n\d+\s|\Z)'
+    },
+    "explanation_patterns": {
+        "sub_item": r'^(?P<label>[ㄱ-ㅎ])\s*\.\s*(?P<text>.*)',
+        "first_item_delimiter": r'\n(?=[ㄱ-ㅎ]\s*\.)',
+        "item_split_delimiter": r'\n(?=[ㄱ-ㅎ]\s*\.)'
+    }
+}
+
+class _InlineExecutor:
+    """Runs tasks at submit time in this process."""
+
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+def _random_config(rng):
+    config = {section: dict(patterns) for section, patterns in CONFIG.items()}
+    if rng.random() < 0.5:
+        config["problem_patterns"]["item_start"] = r'^\d+\s'
+    if rng.random() < 0.4:
+        config["matching"] = {"max_buffer_chars": rng.choice([300, 800, 2000]),
+                              "overflow_policy": rng.choice(["flush", "skip"])}
+    return config
+
+def _random_pages(rng):
+    """A random book, re-cut at random points so items and lines straddle page breaks."""
+    spec = BookSpec(pages=rng.randint(1, 30), items_per_page=rng.randint(1, 4),
+                    explanation_lines=rng.randint(0, 8), sub_item_ratio=rng.random(),
+                    spanning_items=rng.randint(0, 3), span_pages=rng.randint(1, 6), seed=rng.randrange(1000))
+    text = "".join(generate_pages(spec))
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(0, 60))))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+@pytest.mark.parametrize("seed", range(60))
+def test_sharded_analysis_matches_sequential(seed):
+    """
+    Property test: on random books, page cuts, shard sizes and configs, the
+    stitched shards yield exactly the items and stats of the sequential analysis.
+    """
+    rng = random.Random(seed)
+    pages = _random_pages(rng)
+    config = _random_config(rng)
+    shard_pages = rng.randint(1, 8)
+
+    expected_stats, stats = {}, {}
+    expected = list(analyze_text(iter(pages), config, stats=expected_stats))
+    result = list(analyze_text_sharded(iter(pages), config, workers=rng.randint(1, 3),
+                                       shard_pages=shard_pages, executor=_InlineExecutor(), stats=stats))
+    assert result == expected
+    assert stats == expected_stats
+
+def test_sharded_analysis_in_worker_processes():
+    pages = generate_pages(BookSpec(pages=40, items_per_page=2, spanning_items=3, span_pages=5))
+    expected = list(analyze_text(iter(pages), CONFIG))
+    assert list(analyze_text_sharded(iter(pages), CONFIG, workers=2, shard_pages=4)) == expected
+
+def test_sharded_analysis_edge_cases():
+    assert list(analyze_text_sharded(iter([]), CONFIG, executor=_InlineExecutor())) == []
+    with pytest.raises(ValueError):
+        list(analyze_text_sharded(iter(["01 a\nb"]), CONFIG, shard_pages=0))
+
+def test_sharded_analysis_keeps_quarantine_stats():
+    """
+    Tests that a page quarantined by a worker whose items are taken over is
+    reported in the stats, as in the sequential analysis.
+    """
+    config = {section: dict(patterns) for section, patterns in CONFIG.items()}
+    config["problem_patterns"]["stream"] = r'^(?P<number>\d+) (?P<problem>(?:\w+\s?)+)!\n(?P<explanation>.*?)(?=\n\d+ )'
+    config["problem_patterns"]["final"] = r'^(?P<number>\d+) (?P<problem>[^!\n]+)!\n(?P<explanation>.*?)(?=\n\d+ |\Z)'
+    config["matching"] = {"allow_risky_patterns": True, "page_time_budget": 0.2}
+    pages = ["01 ok!\nexplanation one\n", "02 ok!\nexplanation two\n", "03 " + "a" * 40 + "\n99 \n",
+             "04 fine!\nexplanation four\n05 last!\nend\n"]
+
+    expected_stats, stats = {}, {}
+    expected = list(analyze_text(iter(pages), config, stats=expected_stats))
+    result = list(analyze_text_sharded(iter(pages), config, shard_pages=3, executor=_InlineExecutor(), stats=stats))
+
+    assert result == expected
+    assert expected_stats['quarantined_pages'] == [2]
+    assert stats == expected_stats
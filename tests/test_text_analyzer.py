@@ -1,5 +1,9 @@
 import pytest
-from modules.text_analyzer import analyze_text
+import time
+import json
+from modules.config_loader import compile_patterns
+from modules.text_analyzer import analyze_text, _StreamScanner
+from benchmarks.synthetic import BookSpec, generate_pages
 
 @pytest.fixture
 def mock_config():
@@ -148,4 +152,200 @@ def test_analyze_text_with_sub_items(realistic_data, mock_config):
     assert '튤립이 갖는 특징' in items[1]['text']
     
     assert items[2]['label'] == 'ㄷ'
-    assert '생장에 해당하지 않는다.' in items[2]['text'] 
\ No newline at end of file
+    assert '생장에 해당하지 않는다.' in items[2]['text'] 
+
+@pytest.fixture
+def incremental_config(mock_config):
+    """The mock config with the optional 'item_start' pattern enabled."""
+    config = {section: dict(patterns) for section, patterns in mock_config.items()}
+    config["problem_patterns"]["item_start"] = r'^\d+\s'
+    return config
+
+def test_analyze_text_item_start_matches_full_rescan(realistic_data, mock_config, incremental_config):
+    """
+    Tests that skipping pages without an item start gives the same items as
+    rescanning the buffer on every page, for every possible page split.
+    """
+    expected = list(analyze_text(iter([realistic_data]), mock_config))
+
+    for page_size in (1, 2, 7, 40, 128):
+        pages = [realistic_data[i:i + page_size] for i in range(0, len(realistic_data), page_size)]
+        assert list(analyze_text(iter(pages), incremental_config)) == expected
+        assert list(analyze_text(iter(pages), mock_config)) == expected
+
+class _CountingScanner(_StreamScanner):
+    """Counts the characters the patterns are run over."""
+
+    scanned = 0
+
+    def _find_all(self, pattern, buffer, pos=0):
+        self.scanned += len(buffer) - pos
+        return super()._find_all(pattern, buffer, pos)
+
+def test_stream_scan_reads_a_long_explanation_once(mock_config, incremental_config):
+    """
+    Tests that an explanation running over many pages is scanned a bounded
+    number of times, not once per page, with and without 'item_start'.
+    The wall-clock scaling is checked by benchmarks/scaling.py.
+    """
+    page = "해설이 다음 페이지로 계속 이어지는 긴 본문입니다. ㄱ과 ㄴ을 비교한다.\n" * 40
+    for config in (mock_config, incremental_config):
+        for page_count in (10, 80):
+            pages = ["01 긴 해설 문제\n"] + [page] * page_count + ["02 마지막 문제\n끝.\n"]
+            scanner = _CountingScanner(compile_patterns(config))
+            found = [match for text in pages for match, _ in scanner.feed(text)]
+            found += [match for match, _ in scanner.finish()]
+            assert [match.group('number') for match in found] == ['01', '02']
+            # Rescanning on every page would read ~page_count / 2 times the text.
+            assert scanner.scanned < 3 * len("".join(pages))
+
+def test_stream_scan_resumes_after_front_matter(mock_config, incremental_config):
+    """
+    Tests that front matter without an item start is not rescanned on every
+    page, with and without the 'item_start' pattern.
+    """
+    page = "머리말과 차례가 이어지는 앞부분입니다.\n" * 20
+    items = ["01 첫 문제\n해설.\n", "02 둘째 문제\n끝.\n"]
+    for config in (mock_config, incremental_config):
+        scanner = _CountingScanner(compile_patterns(config))
+        found = [match for text in [page] * 50 + items for match, _ in scanner.feed(text)]
+        found += [match for match, _ in scanner.finish()]
+        assert [match.group('number') for match in found] == ['01', '02']
+        assert scanner.scanned < 3 * len("".join(items))
+
+def test_analyze_text_reports_peak_buffer(mock_config):
+    """Tests that the optional stats dictionary receives the largest pending buffer."""
+    pages = ["01 A\nexplanation\n", "continues " * 10 + "\n", "02 B\nexplanation\n"]
+    stats = {}
+    items = list(analyze_text(iter(pages), mock_config, stats=stats))
+
+    assert len(items) == 2
+    assert stats['peak_buffer_chars'] >= len(pages[1])
+    assert stats['peak_buffer_chars'] <= sum(len(page) for page in pages)
+
+def test_analyze_text_quarantines_slow_page(mock_config):
+    """
+    Tests that a page on which the stream pattern backtracks catastrophically
+    is skipped once the time budget runs out, and analysis continues.
+    """
+    config = {section: dict(patterns) for section, patterns in mock_config.items()}
+    config["problem_patterns"]["stream"] = r'^(?P<number>\d+) (?P<problem>(?:\w+\s?)+)!\n(?P<explanation>.*?)(?=\n\d+ )'
+    config["problem_patterns"]["final"] = r'^(?P<number>\d+) (?P<problem>[^!\n]+)!\n(?P<explanation>.*?)(?=\n\d+ |\Z)'
+    config["matching"] = {"allow_risky_patterns": True}
+    # The '99 ' line lets the stream lookahead match after item 02, so the
+    # prefilter does not rule the backtracking attempt out.
+    pages = ["01 ok!\nexplanation one\n", "02 " + "a" * 40 + "\n99 \n", "03 fine!\nexplanation three\n04 last!\nend\n"]
+    stats = {}
+
+    start = time.perf_counter()
+    items = list(analyze_text(iter(pages), config, stats=stats, page_time_budget=0.2))
+
+    assert time.perf_counter() - start < 5
+    assert [item['number'] for item in items] == ['01', '03', '04']
+    assert stats['quarantined_pages'] == [1]
+
+def test_page_timer_leaves_the_callers_alarm_alone(realistic_data, mock_config):
+    """
+    Tests that the page timer holds no handler or timer between pages, and
+    that a caller's own SIGALRM handler and timer keep working.
+    """
+    import signal
+    pages = [realistic_data[i:i + 40] for i in range(0, len(realistic_data), 40)]
+    items = analyze_text(iter(pages), mock_config, page_time_budget=5)
+    next(items)
+    assert signal.getsignal(signal.SIGALRM) is signal.SIG_DFL
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    list(items)
+
+    fired = []
+    previous = signal.signal(signal.SIGALRM, lambda signum, frame: fired.append(signum))
+    try:
+        signal.setitimer(signal.ITIMER_REAL, 0.5)
+        assert len(list(analyze_text(iter(pages), mock_config, page_time_budget=5))) == 3
+        assert signal.getitimer(signal.ITIMER_REAL)[0] > 0
+        deadline = time.monotonic() + 5
+        while not fired and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert fired == [signal.SIGALRM]
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+RUNAWAY_PAGES = ["01 first\nexplanation one\n", "02 runaway\n"] + ["no numbering here\n" * 10] * 20 + ["03 recovered\nend\n"]
+
+@pytest.mark.parametrize("policy, numbers", [
+    ("flush", ['01', '02', '03']),
+    ("spill", ['01', '03']),
+    ("skip", ['01', '03']),
+])
+def test_analyze_text_caps_runaway_buffer(mock_config, tmp_path, policy, numbers):
+    """
+    Tests that pending text without an item end is capped, handled by the
+    overflow policy and counted, and that analysis recovers afterwards.
+    """
+    config = {**mock_config, "matching": {"max_buffer_chars": 500, "overflow_policy": policy, "spill_dir": str(tmp_path)}}
+    stats = {}
+
+    items = list(analyze_text(iter(RUNAWAY_PAGES), config, stats=stats))
+
+    assert [item['number'] for item in items] == numbers
+    # The runaway item and then the orphaned text after it overflow the
+    # 500 character cap every third page.
+    assert stats['buffer_overflows'] == {policy: 6}
+    assert stats['peak_buffer_chars'] <= 500 + len(RUNAWAY_PAGES[2])
+    if policy == 'flush':
+        assert items[1]['body'].startswith("no numbering here")
+    spilled = list(tmp_path.iterdir())
+    if policy == 'spill':
+        assert sorted(str(path) for path in spilled) == sorted(stats['spilled_files'])
+        assert open(stats['spilled_files'][0], encoding='utf-8').read().startswith("\n02 runaway")
+    else:
+        assert spilled == []
+
+def test_analyze_text_caps_buffer_by_pages(mock_config):
+    config = {**mock_config, "matching": {"max_buffer_pages": 5, "overflow_policy": "skip"}}
+    stats = {}
+
+    items = list(analyze_text(iter(RUNAWAY_PAGES), config, stats=stats))
+
+    assert [item['number'] for item in items] == ['01', '03']
+    assert stats['buffer_overflows'] == {'skip': 3}
+
+def test_analyze_text_prefilter_keeps_results(realistic_data, mock_config):
+    """
+    Tests that the prefilters give the same items as running the patterns
+    as-is, on every page split of the realistic data and on synthetic books.
+    """
+    plain = {section: dict(patterns) for section, patterns in mock_config.items()}
+    plain["matching"] = {"prefilter": False}
+
+    for page_size in (1, 7, 40, 128):
+        pages = [realistic_data[i:i + page_size] for i in range(0, len(realistic_data), page_size)]
+        assert list(analyze_text(iter(pages), mock_config)) == list(analyze_text(iter(pages), plain))
+
+    for spec in (BookSpec(pages=20, sub_item_ratio=0.5), BookSpec(pages=20, explanation_lines=30, spanning_items=2)):
+        pages = generate_pages(spec)
+        stats, plain_stats = {}, {}
+        assert list(analyze_text(iter(pages), mock_config, stats)) == list(analyze_text(iter(pages), plain, plain_stats))
+        assert stats == plain_stats
+
+def test_stream_scanner_state_round_trip(realistic_data, incremental_config):
+    """
+    Tests that a scanner restored from a (JSON round-tripped) state() taken
+    between two pages finds the same matches as one that saw every page.
+    """
+    patterns = compile_patterns(incremental_config)
+    pages = [realistic_data[i:i + 40] for i in range(0, len(realistic_data), 40)]
+
+    def spans(scanner, pages):
+        found = [match for page in pages for match in scanner.feed(page)] + list(scanner.finish())
+        return [(offset + match.start(), match.group(0)) for match, offset in found]
+
+    expected = spans(_StreamScanner(patterns), pages)
+    for split in range(1, len(pages)):
+        first = _StreamScanner(patterns)
+        before = [(offset + match.start(), match.group(0))
+                                 for page in pages[:split] for match, offset in first.feed(page)]
+        restored = _StreamScanner(patterns)
+        restored.restore(json.loads(json.dumps(first.state())))
+        assert before + spans(restored, pages[split:]) == expected
@@ -1,5 +1,7 @@
 import pytest
-from modules.text_preprocessor import normalize_whitespace, clean_text
+import random
+from benchmarks.clean_text import reference_clean_text, KOREAN_EXAM_PAGE
+from modules.text_preprocessor import normalize_whitespace, clean_text, compile_cleaning_rules
 
 @pytest.mark.skip(reason="Whitespace normalization logic is complex and needs review")
 def test_normalize_whitespace_structure_preserving():
@@ -47,4 +49,32 @@ def test_clean_text_combined():
     """Tests a combination of cleaning operations."""
     original = "  \tﬁnal\n\n\n\n  oﬃce test   "
     expected = "final\n\noffice test"
-    assert clean_text(original) == expected 
\ No newline at end of file
+    assert clean_text(original) == expected
+
+
+def test_clean_text_matches_reference_on_random_text():
+    """
+    Tests that the fused cleaner is byte-identical to the original implementation.
+    """
+    rng = random.Random(7)
+    alphabet = ["가", "ㄱ", "a", "1", ".", "ﬁ", "ﬃ", " ", " ", "\t", "\n", "\n", "\r", "\u00a0", "\u3000", "\x1c", "\u2028"]
+    samples = [KOREAN_EXAM_PAGE, "", "\n\n", "   \n\n", "a\n\n", "\u3000a \u00a0 b\t\t\n"]
+    samples += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60))) for _ in range(3000)]
+
+    for sample in samples:
+        assert clean_text(sample) == reference_clean_text(sample), repr(sample)
+
+def test_clean_text_configured_rules():
+    """Tests replacements and normalization configured in the 'preprocessing' section."""
+    config = {"preprocessing": {"replacements": {"１": "1", "\u00a0": " ", "ﬁ": "fi"}}}
+    assert clean_text("１\u00a0 ﬁ  \n\n\n x", config) == "1 fi\n\nx"
+
+    config = {"preprocessing": {"replacements": {}, "normalize_whitespace": False}}
+    assert clean_text(" ﬁ  \n", config) == " ﬁ  \n"
+
+def test_compile_cleaning_rules_validation():
+    with pytest.raises(ValueError):
+        compile_cleaning_rules({"replacements": {"": "x"}})
+    with pytest.raises(ValueError):
+        compile_cleaning_rules({"normalize_whitespace": "yes"})
+    assert compile_cleaning_rules({"replacements": {"a": "b"}}) is compile_cleaning_rules({"replacements": {"a": "b"}})
@@ -0,0 +1,63 @@
+import json
+import pytest
+from unittest.mock import patch
+from modules.triage import triage_pdf, pages_with_text, format_triage, write_triage_reports, _page_ranges
+
+@pytest.fixture(scope="module")
+def mixed_pdf(tmp_path_factory):
+    """A text page, a scanned page, a page with text over a large figure and a blank page."""
+    import fitz
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 300), False)
+    pixmap.clear_with(200)
+    image = pixmap.tobytes('png')
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "01 Problem")
+    page = doc.new_page()
+    page.insert_image(page.rect, stream=image)
+    page = doc.new_page()
+    page.insert_text((72, 72), "02 Figure")
+    page.insert_image(fitz.Rect(0, 100, page.rect.width, page.rect.height), stream=image)
+    doc.new_page()
+    page = doc.new_page()
+    page.insert_text((72, 72), "03 Logo")
+    page.insert_image(fitz.Rect(500, 20, 560, 60), stream=image)
+
+    pdf_path = str(tmp_path_factory.mktemp("triage") / "mixed.pdf")
+    doc.save(pdf_path)
+    doc.close()
+    return pdf_path
+
+def test_triage_classifies_pages(mixed_pdf):
+    report = triage_pdf(mixed_pdf)
+
+    assert [entry['kind'] for entry in report['pages']] == ['text', 'image_only', 'mixed', 'blank', 'text']
+    assert report['counts'] == {'text': 2, 'mixed': 1, 'image_only': 1, 'blank': 1}
+    assert report['pages_without_text'] == [2, 4]
+    assert report['document'] == 'mixed'
+    assert report['pages'][1]['image_coverage'] > 0.9
+    assert pages_with_text(report) == [0, 2, 4]
+
+def test_triage_does_not_extract_text(mixed_pdf):
+    import fitz
+    with patch.object(fitz.Page, 'get_text', side_effect=AssertionError("text extracted")):
+        triage_pdf(mixed_pdf)
+
+def test_triage_of_selected_pages_and_scanned_document(mixed_pdf):
+    report = triage_pdf(mixed_pdf, pages=[1, 3])
+    assert [entry['page'] for entry in report['pages']] == [2, 4]
+    assert report['document'] == 'scanned'
+
+    assert triage_pdf(mixed_pdf, pages=[0, 2])['document'] == 'text'
+
+def test_format_and_write_triage_reports(mixed_pdf, tmp_path):
+    report = triage_pdf(mixed_pdf)
+    lines = format_triage(report)
+    assert "mixed document" in lines[0]
+    assert lines[1].endswith("2,4")
+    assert _page_ranges([1, 2, 3, 7, 9, 10]) == "1-3,7,9-10"
+
+    output = tmp_path / "triage.jsonl"
+    write_triage_reports([report, report], str(output))
+    assert [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()] == [report, report]